@@ -0,0 +1,329 @@
+"""
+Adaptive question selection for Alex LGS
+
+Uses the two-parameter logistic (2PL) item response model: a student of
+ability θ answers a question of difficulty b and discrimination a correctly
+with probability 1 / (1 + exp(-a (θ - b))). Every answer moves the student's
+ability in the subject and the question's parameters one gradient step
+towards the observed outcome. Steps shrink as a student or question collects
+answers, so the estimates settle without a batch fit. Questions that have
+never been answered start at a difficulty derived from their 1-5 level in
+the question bank.
+
+``AdaptiveSelector`` keeps each topic's questions in a bucket sorted by
+difficulty. To pick the next question it bisects to the difficulty that
+gives the student the target success rate of their mode (see
+ProgressTracker._find_optimal_difficulty). It then walks outwards past
+questions the student has already answered and serves the most informative
+of the nearest few.
+
+``fit_rasch`` calibrates difficulties offline from the whole answer history
+(see Database.calibrate_questions). It fits the one-parameter (Rasch) model
+to a sparse response matrix built chunk by chunk with ``ResponseCells``.
+"""
+import math
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from cache import TTLCache
+from question_bank import DEFAULT_DIFFICULTY, Question
+
+if TYPE_CHECKING:
+    from curriculum import Curriculum
+    from database import Database
+
+DIFFICULTY_SCALE = 0.75  # Logits between two question bank levels
+MAX_LOGIT = 4.0  # Abilities and difficulties are kept in [-4, 4]
+MIN_DISCRIMINATION, MAX_DISCRIMINATION = 0.3, 2.5
+
+# Step sizes: base rate, answers after which it has halved, floor
+ABILITY_STEP = (0.6, 10, 0.05)  # The floor keeps following a student who improves
+DIFFICULTY_STEP = (0.4, 20, 0.02)
+DISCRIMINATION_STEP = (0.05, 20, 0.005)
+
+# Success probability each difficulty mode aims for
+MODE_SUCCESS = {
+    "challenge_mode": 0.5,  # Most informative, hardest
+    "optimal_zone": 0.7,
+    "support_mode": 0.85,
+}
+DEFAULT_MODE = "optimal_zone"
+
+CANDIDATES = 8  # Unseen questions nearest the target compared by information
+BUCKET_TTL = 300.0  # Seconds before a bucket picks up updated question parameters
+SEEN_TTL = 300.0  # Seconds before a student's answered set is re-read (answers made on other workers)
+
+PRIOR_PRECISION = 0.25  # Batch fits: parameters without an earlier estimate start at N(0, 2²)
+
+
+class Response(NamedTuple):
+    ability: float
+    difficulty: float
+    discrimination: float
+    probability: float  # Predicted chance of the answer being right, before the update
+
+
+def probability(ability, difficulty, discrimination=1.0):
+    """Chance of a right answer (works on scalars and numpy arrays)"""
+    return 1.0 / (1.0 + np.exp(-discrimination * (ability - difficulty)))
+
+
+def information(ability, difficulty, discrimination=1.0):
+    """Fisher information of a question at an ability: a² p (1 - p)"""
+    p = probability(ability, difficulty, discrimination)
+    return discrimination * discrimination * p * (1.0 - p)
+
+
+def prior_difficulty(level: Optional[int]) -> float:
+    """Starting difficulty of a question from its 1-5 question bank level"""
+    return (float(level or DEFAULT_DIFFICULTY) - DEFAULT_DIFFICULTY) * DIFFICULTY_SCALE
+
+
+def target_difficulty(ability: float, mode: str) -> float:
+    """Difficulty a question of average discrimination needs for the mode's success rate"""
+    success = MODE_SUCCESS.get(mode, MODE_SUCCESS[DEFAULT_MODE])
+    return ability - math.log(success / (1.0 - success))
+
+
+def update(ability: float, ability_answers: int, difficulty: float, discrimination: float,
+           question_answers: int, is_correct: bool) -> Response:
+    """Ability and question parameters after one answer (one step up the log-likelihood)"""
+    p = float(probability(ability, difficulty, discrimination))
+    residual = (1.0 if is_correct else 0.0) - p
+    return Response(
+        _clamp(ability + _step(ABILITY_STEP, ability_answers) * discrimination * residual, -MAX_LOGIT, MAX_LOGIT),
+        _clamp(difficulty - _step(DIFFICULTY_STEP, question_answers) * discrimination * residual,
+               -MAX_LOGIT, MAX_LOGIT),
+        _clamp(discrimination + _step(DISCRIMINATION_STEP, question_answers) * residual * (ability - difficulty),
+               MIN_DISCRIMINATION, MAX_DISCRIMINATION),
+        p
+    )
+
+
+def _step(schedule: tuple, answers: int) -> float:
+    rate, half_life, floor = schedule
+    return max(rate / (1.0 + answers / half_life), floor)
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return min(max(value, low), high)
+
+
+class ResponseCells:
+    """Answers folded into (person, question) cells: a sparse response matrix
+
+    Persons and questions get dense indexes in order of appearance; each cell
+    holds the number of answers and right answers of one pair. Memory grows
+    with the distinct pairs, not with the answers added, and pending chunks
+    are merged once they outgrow the cells (so merging stays O(n log n)).
+    """
+
+    def __init__(self):
+        self.persons: Dict[Hashable, int] = {}
+        self.items: Dict[Hashable, int] = {}
+        self._keys = np.empty(0, dtype=np.int64)
+        self._answers = np.empty(0, dtype=np.int64)
+        self._right = np.empty(0, dtype=np.int64)
+        self._pending: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._pending_rows = 0
+
+    def __len__(self) -> int:
+        self._merge()
+        return len(self._keys)
+
+    def add(self, persons: Sequence[Hashable], items: Sequence[Hashable], correct: Sequence[Any]):
+        """Add one chunk of answers (parallel sequences)"""
+        person_index = np.fromiter((self.persons.setdefault(key, len(self.persons)) for key in persons),
+                                   dtype=np.int64, count=len(persons))
+        item_index = np.fromiter((self.items.setdefault(key, len(self.items)) for key in items),
+                                 dtype=np.int64, count=len(items))
+        self._pending.append(((person_index << 32) | item_index, np.asarray(correct, dtype=np.int8)))
+        self._pending_rows += len(persons)
+        if self._pending_rows >= max(len(self._keys), 1 << 16):
+            self._merge()
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(person index, item index, answers, right answers) per cell"""
+        self._merge()
+        return (self._keys >> 32, self._keys & 0xFFFFFFFF,
+                self._answers.astype(np.float64), self._right.astype(np.float64))
+
+    def totals(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(answers per person, answers per item, right answers per item)"""
+        person, item, answers, right = self.arrays()
+        return (np.bincount(person, weights=answers, minlength=len(self.persons)),
+                np.bincount(item, weights=answers, minlength=len(self.items)),
+                np.bincount(item, weights=right, minlength=len(self.items)))
+
+    def _merge(self):
+        if not self._pending:
+            return
+        merged = len(self._keys)
+        keys = np.concatenate([self._keys] + [chunk for chunk, _ in self._pending])
+        correct = np.concatenate([correct for _, correct in self._pending])
+        self._pending, self._pending_rows = [], 0
+        self._keys, inverse = np.unique(keys, return_inverse=True)
+        # Cells merged before are distinct keys, so their counts carry over by plain indexing
+        answers = np.bincount(inverse[merged:], minlength=len(self._keys))
+        right = np.bincount(inverse[merged:], weights=correct, minlength=len(self._keys)).astype(np.int64)
+        answers[inverse[:merged]] += self._answers
+        right[inverse[:merged]] += self._right
+        self._answers, self._right = answers, right
+
+
+class RaschFit(NamedTuple):
+    ability: np.ndarray
+    difficulty: np.ndarray
+    ability_information: np.ndarray  # Precision of each estimate (Fisher information plus the prior's)
+    difficulty_information: np.ndarray
+    log_likelihood: float
+    iterations: int
+
+
+def fit_rasch(cells: ResponseCells,
+              ability_prior: Optional[Sequence[float]] = None, ability_precision: Optional[Sequence[float]] = None,
+              difficulty_prior: Optional[Sequence[float]] = None, difficulty_precision: Optional[Sequence[float]] = None,
+              max_iterations: int = 100, tolerance: float = 1e-4) -> RaschFit:
+    """Rasch (a = 1) abilities and difficulties for a response matrix
+
+    Alternates one Newton step for every ability with one for every
+    difficulty, each a few vectorised passes over the cells. Every parameter
+    has a normal prior: its previous estimate weighted by the information
+    behind it, or PRIOR_PRECISION around 0. The prior keeps questions that
+    everyone (or no one) got right finite and makes incremental fits on new
+    answers alone continue from earlier ones.
+    """
+    person, item, answers, right = cells.arrays()
+    persons, items = len(cells.persons), len(cells.items)
+    ability_prior = np.zeros(persons) if ability_prior is None else np.asarray(ability_prior, dtype=np.float64)
+    difficulty_prior = np.zeros(items) if difficulty_prior is None else np.asarray(difficulty_prior, dtype=np.float64)
+    ability_precision = (np.full(persons, PRIOR_PRECISION) if ability_precision is None
+                         else np.asarray(ability_precision, dtype=np.float64))
+    difficulty_precision = (np.full(items, PRIOR_PRECISION) if difficulty_precision is None
+                            else np.asarray(difficulty_precision, dtype=np.float64))
+    ability, difficulty = ability_prior.copy(), difficulty_prior.copy()
+
+    def newton_step(index, size, value, prior, precision, sign):
+        p = probability(ability[person], difficulty[item])
+        gradient = sign * np.bincount(index, weights=right - answers * p, minlength=size) - precision * (value - prior)
+        hessian = np.bincount(index, weights=answers * p * (1.0 - p), minlength=size) + precision
+        updated = np.clip(value + np.clip(gradient / hessian, -1.0, 1.0), -MAX_LOGIT, MAX_LOGIT)
+        change = float(np.abs(updated - value).max(initial=0.0))
+        value[:] = updated
+        return change
+
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        ability_change = newton_step(person, persons, ability, ability_prior, ability_precision, 1.0)
+        difficulty_change = newton_step(item, items, difficulty, difficulty_prior, difficulty_precision, -1.0)
+        # Shifting every ability and difficulty together leaves the likelihood unchanged, so
+        # alternating steps crawl along that direction; jump to the shift the priors prefer
+        shift = -(np.dot(ability_precision, ability - ability_prior) +
+                  np.dot(difficulty_precision, difficulty - difficulty_prior)) / (
+                  ability_precision.sum() + difficulty_precision.sum())
+        np.clip(ability + shift, -MAX_LOGIT, MAX_LOGIT, out=ability)
+        np.clip(difficulty + shift, -MAX_LOGIT, MAX_LOGIT, out=difficulty)
+        if max(ability_change, difficulty_change) < tolerance:
+            break
+
+    p = probability(ability[person], difficulty[item])
+    information = answers * p * (1.0 - p)
+    log_likelihood = float(np.sum(right * np.log(p) + (answers - right) * np.log1p(-p)))
+    return RaschFit(
+        ability, difficulty,
+        np.bincount(person, weights=information, minlength=persons) + ability_precision,
+        np.bincount(item, weights=information, minlength=items) + difficulty_precision,
+        log_likelihood, iterations
+    )
+
+
+class ItemBucket:
+    """Questions of one topic (or subject) sorted by difficulty"""
+
+    __slots__ = ("ids", "difficulty", "discrimination")
+
+    def __init__(self, ids: List[str], difficulty: np.ndarray, discrimination: np.ndarray):
+        self.ids = ids
+        self.difficulty = difficulty
+        self.discrimination = discrimination
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def nearest(self, target: float, exclude: Set[str], count: int) -> List[int]:
+        """Positions of up to ``count`` questions closest in difficulty to target, skipping excluded ids"""
+        difficulty = self.difficulty
+        hi = int(np.searchsorted(difficulty, target))
+        lo = hi - 1
+        found = []
+        while len(found) < count and (lo >= 0 or hi < len(difficulty)):
+            if hi >= len(difficulty) or (lo >= 0 and target - difficulty[lo] <= difficulty[hi] - target):
+                position, lo = lo, lo - 1
+            else:
+                position, hi = hi, hi + 1
+            if self.ids[position] not in exclude:
+                found.append(position)
+        return found
+
+
+class AdaptiveSelector:
+    """Serves the next question for a student's ability and records their answers"""
+
+    def __init__(self, database: "Database", curriculum: "Curriculum"):
+        self.db = database
+        self.curriculum = curriculum
+        self.buckets = TTLCache("item_buckets", max_entries=512, ttl=BUCKET_TTL)
+        self.seen = TTLCache("seen_questions", max_entries=4096, ttl=SEEN_TTL)
+
+    def next_question(self, username: str, subject: str, topic: str, mode: str = DEFAULT_MODE) -> Question:
+        """Most informative unanswered question near the difficulty the mode aims for"""
+        bucket = self.bucket(subject, topic)
+        if not len(bucket):
+            bucket = self.bucket(subject, None)
+        ability = self.db.get_ability(username, subject)['ability']
+        positions = bucket.nearest(
+            target_difficulty(ability, mode), self.seen_questions(username, subject), CANDIDATES
+        )
+        if not positions:
+            # Everything answered already (or no questions at all): fall back to a random one
+            return self.curriculum.get_question(subject, topic)
+
+        positions = np.array(positions)
+        scores = information(ability, bucket.difficulty[positions], bucket.discrimination[positions])
+        question = self.curriculum.get_question_by_id(bucket.ids[positions[int(np.argmax(scores))]])
+        return question or self.curriculum.get_question(subject, topic)
+
+    def record_answer(self, username: str, question: Question, is_correct: bool) -> Optional[Dict[str, Any]]:
+        """Update the student's ability and the question's parameters (None for questions outside the bank)"""
+        if self.curriculum.get_question_by_id(question['id']) is None:
+            return None
+        result = self.db.record_response(
+            username, question['subject'], question['topic'], question['id'], is_correct,
+            prior_difficulty(question.get('difficulty'))
+        )
+        seen = self.seen.get((username, question['subject']))
+        if seen is not None:
+            seen.add(question['id'])
+        return result
+
+    def seen_questions(self, username: str, subject: str) -> set:
+        """Questions of a subject the student has answered: read once, then extended by record_answer"""
+        return self.seen.get_or_set((username, subject), lambda: set(self.db.get_seen_questions(username, subject)))
+
+    def bucket(self, subject: str, topic: Optional[str]) -> ItemBucket:
+        return self.buckets.get_or_set((subject, topic), lambda: self._build_bucket(subject, topic))
+
+    def _build_bucket(self, subject: str, topic: Optional[str]) -> ItemBucket:
+        items = self.curriculum.question_bank.items(subject, topic)
+        # Shuffled first so that questions of equal difficulty are served in a random order
+        order = np.random.permutation(len(items))
+        ids = [items[i][0] for i in order]
+        levels = [items[i][1] for i in order]
+        calibrated = self.db.get_item_parameters(subject, topic)
+        difficulty = np.array([calibrated[q][0] if q in calibrated else prior_difficulty(level)
+                               for q, level in zip(ids, levels)], dtype=np.float64)
+        discrimination = np.array([calibrated[q][1] if q in calibrated else 1.0 for q in ids], dtype=np.float64)
+
+        by_difficulty = np.argsort(difficulty, kind="stable")
+        return ItemBucket([ids[i] for i in by_difficulty], difficulty[by_difficulty], discrimination[by_difficulty])
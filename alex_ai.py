@@ -2,9 +2,11 @@ import openai
 import os
 import json
 import random
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from cache import get_shared_cache
 from config import config
 from logger import get_logger
+from spaced_repetition import FSRS, GOOD
 
 class AlexAI:
     def __init__(self):
@@ -25,6 +27,9 @@ class AlexAI:
             self.client = None
             self.demo_mode = True
         
+        # Identical requests (same prompt and data) reuse the earlier answer
+        self.response_cache = get_shared_cache("ai", max_bytes=config.CACHE_MAX_MB * 1024 * 1024)
+        
         # the newest OpenAI model is "gpt-5" which was released August 7, 2025.
         # do not change this unless explicitly requested by the user
         self.model = "gpt-5"
@@ -179,17 +184,17 @@ class AlexAI:
         return mnemonics.get(subject, f"🎨 {topic} için görsel hikaye yarat!")
 
     def create_spaced_repetition_schedule(self, topic, difficulty_level=1):
-        """Aralıklı tekrar programı oluştur"""
-        base_intervals = [1, 3, 7, 14, 30, 90]  # günler
-
-        # Zorluk seviyesine göre ayarla
-        adjusted_intervals = [interval * difficulty_level for interval in base_intervals]
+        """Aralıklı tekrar programı oluştur (her tekrar doğru cevaplanırsa FSRS aralıkları)"""
+        # Zorluk seviyesine göre ayarla: seviye arttıkça FSRS zorluğu artar, aralıklar kısalır
+        scheduler = FSRS()
+        difficulty = scheduler.initial_difficulty(GOOD) + (difficulty_level - 1) * 1.5
+        intervals = scheduler.projected_intervals(6, min(max(difficulty, 1.0), 10.0))
 
         schedule = []
-        current_date = datetime.date.today()
+        next_review = date.today()
 
-        for interval in adjusted_intervals:
-            next_review = current_date + datetime.timedelta(days=interval)
+        for interval in intervals:
+            next_review = next_review + timedelta(days=interval)
             schedule.append({
                 "date": next_review.strftime("%d.%m.%Y"),
                 "topic": topic,
@@ -255,22 +260,37 @@ class AlexAI:
             - Başarıları da överek öner
             """
 
+            content = self._complete(
+                "Sen Alex, destekleyici bir matematik mühendisi AI koçusun.",
+                prompt, max_tokens=400, temperature=0.7
+            )
+
+            self.logger.info("Successfully generated study recommendation")
+            return content
+
+        except Exception as e:
+            self.logger.error(f"Error generating study recommendation: {e}")
+            return "Bu hafta matematik ve Türkçe'ye odaklan. Fenerbahçe maçları gibi düzenli antrenman yap! ⚽"
+
+    def _complete(self, system_prompt, prompt, max_tokens, temperature):
+        """Chat completion, reused by every worker for identical requests within AI_CACHE_TTL_SECONDS"""
+        def request():
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": "Sen Alex, destekleyici bir matematik mühendisi AI koçusun."},
+                    {"role": "system", "content": system_prompt},
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=400,
-                temperature=0.7
+                max_tokens=max_tokens,
+                temperature=temperature
             )
-
-            self.logger.info("Successfully generated study recommendation")
             return response.choices[0].message.content
 
-        except Exception as e:
-            self.logger.error(f"Error generating study recommendation: {e}")
-            return "Bu hafta matematik ve Türkçe'ye odaklan. Fenerbahçe maçları gibi düzenli antrenman yap! ⚽"
+        # Failed requests raise and are not cached
+        return self.response_cache.get_or_set(
+            (self.model, system_prompt, prompt, max_tokens, temperature), request,
+            ttl=config.AI_CACHE_TTL_SECONDS, tags=("ai_responses",)
+        )
 
     def get_advanced_learning_tip(self):
         """Generate advanced learning tips using cutting-edge techniques"""
@@ -309,18 +329,13 @@ class AlexAI:
             Dil: Türkçe
             """
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "Sen Alex, profesyonel bir AI eğitim koçusun."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=600,
-                temperature=0.6
+            content = self._complete(
+                "Sen Alex, profesyonel bir AI eğitim koçusun.",
+                prompt, max_tokens=600, temperature=0.6
             )
 
             self.logger.info("Successfully generated parent report")
-            return response.choices[0].message.content
+            return content
 
         except Exception as e:
             self.logger.error(f"Error generating parent report: {e}")
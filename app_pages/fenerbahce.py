@@ -0,0 +1,71 @@
+"""Fenerbahçe integration page"""
+import datetime
+import streamlit as st
+
+from services import get_alex, get_fenerbahce, get_gamification, get_voice
+
+alex = get_alex()
+gamification = get_gamification()
+fenerbahce = get_fenerbahce()
+voice = get_voice()
+
+st.markdown('<div class="fenerbahce-page-bg"></div>', unsafe_allow_html=True)
+st.markdown('<div class="main-header"><h2>⚽ FENERBAHÇE - FORZA FB! 💛💙</h2></div>', unsafe_allow_html=True)
+
+# Team colors
+st.markdown('<div class="fenerbahce-colors"></div>', unsafe_allow_html=True)
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.markdown("### 📅 Maç Takvimi")
+    fixtures = fenerbahce.get_fixtures()
+
+    for match in fixtures[:5]:  # Show next 5 matches
+        match_date = datetime.datetime.strptime(match['date'], "%Y-%m-%d")
+        is_today = match_date.date() == datetime.date.today()
+
+        if is_today:
+            st.markdown(f"🔥 **BUGÜN:** {match['opponent']}")
+        else:
+            st.markdown(f"📅 {match['date']} - {match['opponent']}")
+
+        st.markdown(f"⏰ {match['time']} | 🏟️ {match['venue']}")
+
+        # Watch permission
+        can_watch = gamification.can_watch_full_match("tuna")
+        if can_watch:
+            st.success("✅ Tam maç izleme hakkın var!")
+        else:
+            remaining_tasks = gamification.get_remaining_tasks("tuna")
+            st.warning(f"⚠️ {remaining_tasks} görev daha tamamla!")
+
+        st.markdown("---")
+
+with col2:
+    st.markdown("### 🏆 Fenerbahçe Motivasyonu")
+
+    fb_motivation = alex.get_fenerbahce_motivation()
+    st.markdown(f"💛💙 **Alex:** {fb_motivation}")
+
+    if st.button("🔊 Motivasyon Konuşması"):
+        voice.speak(fb_motivation)
+
+    # FB themed challenges
+    st.markdown("### ⚽ Fenerbahçe Görevleri")
+    fb_challenges = [
+        "⚽ Matematik'te 10 gol at (10 soru çöz)",
+        "🥅 Türkçe defansını geç (5 paragraf oku)",
+        "🏃‍♂️ Fen'de hızlı koş (15 dk çalış)",
+        "👥 Takım oyunu: Tüm dersleri tamamla"
+    ]
+
+    for challenge in fb_challenges:
+        st.markdown(f"• {challenge}")
+
+    # Match day special
+    if fenerbahce.is_match_day():
+        st.markdown("### 🔥 MAÇ GÜNÜ ÖZEL!")
+        st.markdown("Bugün tüm görevleri tamamlarsan:")
+        st.markdown("🎁 Çifte puan kazanırsın!")
+        st.markdown("🍿 Maç öncesi özel atıştırma hakkı!")
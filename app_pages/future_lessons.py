@@ -0,0 +1,106 @@
+"""Future skills and career mentoring"""
+import datetime
+import streamlit as st
+
+from services import get_database, get_gamification
+
+db = get_database()
+gamification = get_gamification()
+
+st.markdown('<div class="main-header"><h2>🚀 Gelecek Dersleri - Ufuk Açıyoruz!</h2></div>', unsafe_allow_html=True)
+
+# Weekly future lesson
+st.markdown("### 📅 Bu Haftanın Gelecek Dersi")
+
+future_topics = [
+    {"title": "🐍 Python Programlama", "duration": "15 dk", "level": "Başlangıç"},
+    {"title": "🎮 Oyun Geliştirme", "duration": "15 dk", "level": "Başlangıç"},
+    {"title": "🤖 Yapay Zeka Nedir?", "duration": "15 dk", "level": "Keşif"},
+    {"title": "📊 Veri Bilimi", "duration": "15 dk", "level": "Keşif"},
+    {"title": "🌍 Geleceğin Meslekleri", "duration": "15 dk", "level": "Keşif"}
+]
+
+current_week = datetime.datetime.now().isocalendar()[1]
+current_topic = future_topics[current_week % len(future_topics)]
+
+col1, col2 = st.columns([2, 1])
+
+with col1:
+    st.markdown(f"#### {current_topic['title']}")
+    st.markdown(f"⏱️ **Süre:** {current_topic['duration']}")
+    st.markdown(f"📊 **Seviye:** {current_topic['level']}")
+
+    # Lesson content based on topic
+    if "Python" in current_topic['title']:
+        st.markdown("""
+        **Bu hafta Python ile tanışıyoruz!**
+
+        Python, dünyanın en popüler programlama dillerinden biri. Neden?
+        - 🐍 Kolay öğrenilir
+        - 🌍 Her yerde kullanılır (Instagram, YouTube, Netflix)
+        - 🤖 Yapay zeka için birinci seçim
+        - 📊 Veri analizi için mükemmel
+
+        **İlk Python kodum:**
+        ```python
+        print("Merhaba, ben Tuna!")
+        print("LGS'yi kazanacağım!")
+        ```
+        """)
+
+    elif "Oyun" in current_topic['title']:
+        st.markdown("""
+        **Oyun nasıl yapılır?**
+
+        Sevdiğin oyunlar nasıl yapılıyor merak ettin mi?
+        - 🎨 Grafik tasarımı
+        - 🎵 Ses ve müzik
+        - 💻 Programlama
+        - 🎮 Oyun mekaniği
+
+        **Basit oyun örneği:**
+        - Tahmin oyunu
+        - Matematik yarışması
+        - Kelime bulmaca
+        """)
+
+    elif "Yapay Zeka" in current_topic['title']:
+        st.markdown("""
+        **Yapay Zeka - AI nedir?**
+
+        Ben Alex de bir yapay zeka örneğiyim! 🤖
+        - 🧠 Bilgisayarlar nasıl "düşünür"?
+        - 📱 Telefonundaki Siri, Google Assistant
+        - 🚗 Otonom arabalar
+        - 🎯 Kişiselleştirilmiş öneriler
+
+        **Yapay zeka kullandığın yerler:**
+        - YouTube önerileri
+        - Harita uygulamaları
+        - Fotoğraf tanıma
+        - Çeviri uygulamaları
+        """)
+
+with col2:
+    st.markdown("### 🎯 Gelecek Hedefleri")
+
+    if st.button("▶️ Dersi Başlat"):
+        st.success("🎉 Gelecek dersi başladı!")
+        # Add 15 minutes to study time
+        db.log_study_time("tuna", "Gelecek Dersleri", 15)
+        gamification.add_points("tuna", 20, "future_lesson")
+
+    st.markdown("### 📚 Tamamlanan Dersler")
+    completed_lessons = db.get_completed_future_lessons("tuna")
+
+    for lesson in completed_lessons:
+        st.markdown(f"✅ {lesson['title']}")
+
+    st.markdown("### 🌟 Gelecek Vizyonu")
+    st.markdown("""
+    **LGS sonrası yolculuk:**
+    - 🏫 İyi bir lise
+    - 💻 Teknoloji becerileri
+    - 🌍 Global perspektif
+    - 🚀 Hayal gücün sınırsız!
+    """)
@@ -0,0 +1,65 @@
+"""Gamification page with rewards and challenges"""
+import streamlit as st
+
+from services import get_gamification
+
+gamification = get_gamification()
+
+st.markdown('<div class="games-page-bg"></div>', unsafe_allow_html=True)
+st.markdown('<div class="main-header"><h2>🎮 Oyunlar ve Ödüller</h2></div>', unsafe_allow_html=True)
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.markdown("### 🏆 Puan Durumu")
+    user_stats = gamification.get_user_stats("tuna")
+
+    st.metric("💰 Toplam Puanın", user_stats['total_points'])
+    st.metric("🔥 Günlük Seri", user_stats['streak'])
+    st.metric("⭐ Seviye", user_stats['level'])
+
+    # Progress bar to next level
+    current_xp = user_stats['total_points']
+    next_level_xp = user_stats['level'] * 100
+    progress = min(100, (current_xp % 100))
+    st.progress(progress / 100)
+    st.caption(f"Sonraki seviyeye {100 - progress} puan kaldı!")
+
+    # Daily challenges
+    st.markdown("### 🎯 Günlük Görevler")
+    challenges = gamification.get_daily_challenges("tuna")
+
+    for challenge in challenges:
+        status = "✅" if challenge['completed'] else "⏳"
+        st.markdown(f"{status} {challenge['description']} - {challenge['reward']} puan")
+
+with col2:
+    st.markdown("### 🛍️ Ödül Mağazası")
+
+    # Alex customization
+    st.markdown("#### 🤖 Alex'i Özelleştir")
+    alex_items = [
+        {"name": "Fenerbahçe Forması", "cost": 50, "type": "outfit"},
+        {"name": "Matematik Kaskı", "cost": 30, "type": "accessory"},
+        {"name": "Özel Ses Paketi", "cost": 100, "type": "voice"},
+    ]
+
+    for item in alex_items:
+        col_item, col_buy = st.columns([3, 1])
+        with col_item:
+            st.markdown(f"👕 {item['name']} - {item['cost']} puan")
+        with col_buy:
+            if st.button("Satın Al", key=f"buy_{item['name']}"):
+                if gamification.spend_points("tuna", item['cost'], f"store:{item['type']}"):
+                    st.success(f"🎉 {item['name']} satın alındı!")
+                else:
+                    st.error("💸 Yeterli puanın yok!")
+
+    # Game time rewards
+    st.markdown("#### 🎮 Oyun Zamanı")
+    if st.button("🕹️ Serbest Oyun Saati (100 puan)"):
+        if gamification.spend_points("tuna", 100, "free_play_hour"):
+            st.success("🎉 1 saat serbest oyun hakkın açıldı!")
+            st.balloons()
+        else:
+            st.error("💸 Yeterli puanın yok!")
@@ -0,0 +1,84 @@
+"""Home page with daily overview"""
+import streamlit as st
+
+from services import get_alex, get_fenerbahce, get_gamification, get_study_planner
+
+alex = get_alex()
+gamification = get_gamification()
+fenerbahce = get_fenerbahce()
+planner = get_study_planner()
+
+st.markdown('<div class="main-header"><h2>🏠 Hoş Geldin Tuna!</h2></div>', unsafe_allow_html=True)
+
+# Alex greeting with auto-speech
+col1, col2 = st.columns([1, 2])
+with col1:
+    st.markdown('<div class="alex-avatar"></div>', unsafe_allow_html=True)
+with col2:
+    greeting = alex.get_daily_greeting()
+    st.markdown(f'<div class="alex-speech-bubble">{greeting}</div>', unsafe_allow_html=True)
+
+    # Auto-speak on page load
+    if 'home_greeted' not in st.session_state:
+        st.session_state.home_greeted = True
+        # Trigger auto-speech
+        auto_speech_js = f"""
+        <script>
+        setTimeout(function() {{
+            if ('speechSynthesis' in window) {{
+                var utterance = new SpeechSynthesisUtterance('{greeting}');
+                utterance.lang = 'tr-TR';
+                utterance.rate = 0.9;
+                utterance.pitch = 1.1;
+                window.speechSynthesis.speak(utterance);
+            }}
+        }}, 1000);
+        </script>
+        """
+        st.components.v1.html(auto_speech_js, height=0)
+
+st.markdown('<div class="fenerbahce-colors"></div>', unsafe_allow_html=True)
+
+# Daily plan
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    st.markdown('<div class="progress-card"><h4>📅 Bugünkü Plan</h4>', unsafe_allow_html=True)
+    daily_plan = planner.get_daily_plan("tuna")
+    for task in daily_plan:
+        status = "✅" if task['completed'] else "⏳"
+        st.markdown(f"{status} {task['subject']} - {task['duration']} dk")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+with col2:
+    st.markdown('<div class="progress-card"><h4>⚽ Fenerbahçe</h4>', unsafe_allow_html=True)
+    next_match = fenerbahce.get_next_match()
+    if next_match:
+        st.markdown(f"🏆 **Sonraki Maç:** {next_match['opponent']}")
+        st.markdown(f"📅 **Tarih:** {next_match['date']}")
+        st.markdown(f"⏰ **Saat:** {next_match['time']}")
+
+        # Match reward status
+        if gamification.can_watch_full_match("tuna"):
+            st.markdown("🎉 **Tam maç izleme hakkın var!**")
+        else:
+            st.markdown("⚠️ **Görevlerini tamamla, maçı tam izle!**")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+with col3:
+    st.markdown('<div class="progress-card"><h4>🏆 Başarılarım</h4>', unsafe_allow_html=True)
+    achievements = gamification.get_achievements("tuna")
+    for achievement in achievements[-3:]:  # Show last 3 achievements
+        st.markdown(f'<div class="achievement-badge">{achievement["name"]}</div>', unsafe_allow_html=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# Quick study buttons
+st.markdown("### 🚀 Hızlı Çalışma")
+col1, col2, col3, col4 = st.columns(4)
+
+subjects = ["Matematik", "Türkçe", "Fen", "İnkılap"]
+for i, subject in enumerate(subjects):
+    with [col1, col2, col3, col4][i]:
+        if st.button(f"📚 {subject}", key=f"quick_{subject}"):
+            st.session_state.current_subject = subject
+            st.rerun()
@@ -0,0 +1,79 @@
+"""Parent dashboard and reports"""
+import datetime
+import streamlit as st
+import pandas as pd
+
+from services import get_alex, get_parent_dashboard
+
+alex = get_alex()
+parent_dashboard = get_parent_dashboard()
+
+st.markdown('<div class="main-header"><h2>👨‍👩‍👧‍👦 Aile Paneli</h2></div>', unsafe_allow_html=True)
+
+# Authentication for parents
+parent_auth = st.text_input("Ebeveyn Şifresi:", type="password")
+
+if parent_auth == "ebeveyn2026":  # Simple password for demo
+
+    # Weekly report
+    st.markdown("### 📊 Haftalık Rapor")
+
+    weekly_data = parent_dashboard.get_weekly_report("tuna")
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("⏱️ Toplam Çalışma", f"{weekly_data['study_hours']} saat")
+    with col2:
+        st.metric("✅ Başarı Oranı", f"{weekly_data['success_rate']}%")
+    with col3:
+        st.metric("🎯 Tamamlanan Görev", weekly_data['completed_tasks'])
+    with col4:
+        st.metric("🏆 Kazanılan Puan", weekly_data['points_earned'])
+
+    # Detailed breakdown
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("### 📈 Günlük Çalışma Grafiği")
+        daily_study = weekly_data['daily_breakdown']
+        df_daily = pd.DataFrame(list(daily_study.items()), columns=['Gün', 'Dakika'])
+        st.line_chart(df_daily.set_index('Gün'))
+
+        st.markdown("### 🎯 Ders Bazında Performans")
+        subject_performance = weekly_data['subject_performance']
+        df_subjects = pd.DataFrame(list(subject_performance.items()), columns=['Ders', 'Doğruluk %'])
+        st.bar_chart(df_subjects.set_index('Ders'))
+
+    with col2:
+        st.markdown("### 📝 Hata Analizi")
+        mistakes = weekly_data['common_mistakes']
+
+        for mistake in mistakes:
+            st.markdown(f"**{mistake['subject']} - {mistake['topic']}**")
+            st.caption(f"Hata sayısı: {mistake['count']} | Öneri: {mistake['suggestion']}")
+            st.markdown("---")
+
+        st.markdown("### 🔮 Alex'in Değerlendirmesi")
+        alex_evaluation = alex.get_parent_report("tuna", weekly_data)
+        st.info(alex_evaluation)
+
+    # Recommendations
+    st.markdown("### 💡 Öneriler")
+    recommendations = parent_dashboard.get_recommendations("tuna")
+
+    for rec in recommendations:
+        st.markdown(f"• **{rec['area']}:** {rec['suggestion']}")
+
+    # Download report
+    if st.button("📥 Raporu İndir"):
+        report_text = parent_dashboard.generate_report_text("tuna", weekly_data)
+        st.download_button(
+            label="📄 PDF Rapor",
+            data=report_text,
+            file_name=f"tuna_haftalik_rapor_{datetime.date.today()}.txt",
+            mime="text/plain"
+        )
+
+else:
+    st.warning("🔐 Ebeveyn paneline erişim için şifre gereklidir.")
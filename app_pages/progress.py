@@ -0,0 +1,62 @@
+"""Progress tracking and analytics"""
+import streamlit as st
+import pandas as pd
+
+from services import get_alex, get_progress_tracker
+
+alex = get_alex()
+progress_tracker = get_progress_tracker()
+
+st.markdown('<div class="progress-page-bg"></div>', unsafe_allow_html=True)
+st.markdown('<div class="main-header"><h2>📊 İlerleme Raporum</h2></div>', unsafe_allow_html=True)
+
+# Time period selection
+period = st.selectbox("📅 Zaman Aralığı:", ["Bu Hafta", "Bu Ay", "Tüm Zamanlar"])
+
+# Get progress data
+progress_data = progress_tracker.get_progress_data("tuna", period.lower().replace(" ", "_"))
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.markdown("### 📈 Genel İstatistikler")
+
+    # Key metrics
+    st.metric("📚 Toplam Çalışma", f"{progress_data['total_study_time']} saat")
+    st.metric("✅ Çözülen Soru", progress_data['questions_solved'])
+    st.metric("🎯 Doğruluk Oranı", f"{progress_data['accuracy']}%")
+    st.metric("🏆 Kazanılan Puan", progress_data['points_earned'])
+
+    # Subject breakdown
+    st.markdown("### 📊 Ders Bazında Performans")
+    subject_data = progress_data['subject_breakdown']
+
+    df = pd.DataFrame(list(subject_data.items()), columns=['Ders', 'Doğruluk'])
+    st.bar_chart(df.set_index('Ders'))
+
+with col2:
+    st.markdown("### 🎯 Hedef Takibi")
+
+    # LGS target
+    current_score = progress_data['estimated_lgs_score']
+    target_score = 475
+
+    st.metric("🎯 LGS Tahmini Puanım", current_score)
+    st.metric("🏆 Hedef Puan", target_score)
+
+    score_progress = min(100, (current_score / target_score) * 100)
+    st.progress(score_progress / 100)
+    st.caption(f"Hedefe {target_score - current_score} puan kaldı!")
+
+    # Weak areas
+    st.markdown("### 🔧 Gelişim Alanları")
+    weak_areas = progress_data['weak_areas']
+
+    for area in weak_areas:
+        st.markdown(f"📝 **{area['subject']}** - {area['topic']}")
+        st.caption(f"Doğruluk: {area['accuracy']}% | Öneri: {area['suggestion']}")
+
+    # Study recommendations
+    if st.button("🤖 Alex'ten Çalışma Önerisi"):
+        recommendation = alex.get_study_recommendation(progress_data)
+        st.info(f"💡 **Alex önerileri:** {recommendation}")
@@ -0,0 +1,33 @@
+"""Search over lessons and questions"""
+import streamlit as st
+
+from services import get_curriculum
+
+curriculum = get_curriculum()
+
+st.markdown('<div class="main-header"><h2>🔎 Konu ve Soru Ara</h2></div>', unsafe_allow_html=True)
+
+query = st.text_input("Ne öğrenmek istiyorsun?", placeholder="örn. üslü ifadeler, DNA, paragrafta anlam")
+kind_labels = {"Hepsi": None, "Dersler": "lesson", "Sorular": "question"}
+kind = st.radio("Ara:", list(kind_labels), horizontal=True)
+
+if query.strip():
+    # Konu adları yazarken tamamlanır
+    topics = curriculum.suggest_topics(query)
+    if topics:
+        st.markdown("**📚 Konular:** " + " · ".join(f"{t['topic']} ({t['subject']})" for t in topics))
+
+    results = curriculum.search(query, limit=20, kind=kind_labels[kind])
+    if not results:
+        st.info("🤔 Sonuç bulunamadı. Farklı bir kelime dene!")
+
+    for result in results:
+        icon = "📖" if result['kind'] == "lesson" else "❓"
+        with st.container(border=True):
+            st.markdown(f"**{icon} {result['title']}**")
+            st.markdown(result['snippet'])
+            if result['kind'] == "lesson":
+                with st.expander("Dersi aç"):
+                    st.markdown(curriculum.get_lesson_content(result['subject'], result['topic']))
+else:
+    st.markdown("💡 Ders anlatımlarında ve soru bankasında arama yapabilirsin. Büyük/küçük harf ve Türkçe karakter fark etmez: *sayisi* yazsan da *Sayısı* bulunur.")
@@ -0,0 +1,240 @@
+"""Advanced study page with memory techniques"""
+import datetime
+import streamlit as st
+
+from services import (
+    get_adaptive_selector, get_alex, get_curriculum, get_database, get_gamification,
+    get_progress_tracker, get_voice
+)
+from progress_tracker import ProgressTracker
+from utils import UIUtils
+
+db = get_database()
+alex = get_alex()
+curriculum = get_curriculum()
+gamification = get_gamification()
+progress_tracker = get_progress_tracker()
+selector = get_adaptive_selector()
+voice = get_voice()
+
+# Öğrenme tekniği seçenekleri → technique_usage kodları
+LEARNING_METHOD_CODES = {
+    "🏰 Zihin Sarayı ile Öğren": "memory_palace",
+    "🗺️ Zihin Haritası Oluştur": "mind_map",
+    "⚡ Aktif Geri Getirme": "active_recall",
+    "🔄 Aralıklı Tekrar": "spaced_repetition",
+    "🎴 Görsel Flash Kartlar": "flash_cards",
+    "📚 Klasik Ders Çalışma": "classic"
+}
+
+st.markdown('<div class="study-page-bg"></div>', unsafe_allow_html=True)
+st.markdown('<div class="main-header"><h2>🧠 Süper Öğrenme Laboratuvarı!</h2></div>', unsafe_allow_html=True)
+
+# Alex'in gelişmiş önerileri
+col1, col2 = st.columns([1, 3])
+with col1:
+    st.markdown('<div class="alex-avatar"></div>', unsafe_allow_html=True)
+with col2:
+    alex_tip = alex.get_advanced_learning_tip()
+    st.markdown(f'<div class="alex-speech-bubble">{alex_tip}</div>', unsafe_allow_html=True)
+
+    if st.button("🔊 Alex'i Dinle"):
+        voice.speak(alex_tip, emotion="explaining")
+
+# Öğrenme tekniği seçimi
+st.markdown("### 🎯 Öğrenme Tekniği Seç")
+learning_method = st.selectbox("🧠 Nasıl öğrenmek istiyorsun?", list(LEARNING_METHOD_CODES))
+
+# Subject selection
+subject = st.selectbox("📚 Ders Seç:", [
+    "Matematik", "Türkçe", "Fen Bilimleri", "T.C. İnkılap Tarihi", 
+    "Din Kültürü", "İngilizce"
+])
+
+# Get topics for selected subject
+topics = curriculum.get_topics(subject)
+topic = st.selectbox("📝 Konu Seç:", topics)
+
+col1, col2 = st.columns([2, 1])
+
+with col1:
+    st.markdown(f"### 🎯 {topic}")
+
+    # Lesson content
+    lesson_content = curriculum.get_lesson_content(subject, topic)
+    st.markdown(lesson_content)
+
+    # Alex explanation
+    if st.button("🤖 Alex'ten Açıklama İste"):
+        explanation = alex.explain_topic(subject, topic)
+        st.markdown(f"**Alex açıklıyor:** {explanation}")
+
+        if st.button("🔊 Sesli Dinle", key="explanation_audio"):
+            voice.speak(explanation)
+
+def update_sidebar_totals(total_points: int = None):
+    """Bring the sidebar totals up to date after an answer without rerunning the app"""
+    totals = st.session_state.sidebar_totals
+    # The answer makes today an active day
+    if not totals['studied_today']:
+        totals['streak'] += 1
+        totals['studied_today'] = True
+    if total_points is not None:
+        totals['total_points'] = total_points
+        totals['level'] = ProgressTracker.level_for(total_points)
+
+def show_feedback(feedback: dict):
+    """Result of an answer, with Alex's spoken reaction"""
+    if feedback['correct']:
+        st.success("🎉 Doğru! Harika iş!")
+        st.info(f"🏆 +10 puan kazandın! Toplam: {feedback['points']}")
+
+        # Alex congratulation speech
+        congrats = "Tebrikler! Doğru cevap! Böyle devam et şampiyon!"
+        success_speech_js = f"""
+        <script>
+        setTimeout(function() {{
+            if ('speechSynthesis' in window) {{
+                var utterance = new SpeechSynthesisUtterance('{congrats}');
+                utterance.lang = 'tr-TR';
+                utterance.rate = 0.9;
+                utterance.pitch = 1.2;
+                window.speechSynthesis.speak(utterance);
+            }}
+        }}, 500);
+        </script>
+        """
+        st.components.v1.html(success_speech_js, height=0)
+    else:
+        st.error(f"❌ Yanlış. Doğru cevap: {feedback['correct_answer']}")
+
+        # Alex encouragement with auto-speech
+        encouragement = feedback['encouragement']
+        st.info(f"🤖 Alex: {encouragement}")
+
+        encouragement_speech_js = f"""
+        <script>
+        setTimeout(function() {{
+            if ('speechSynthesis' in window) {{
+                var utterance = new SpeechSynthesisUtterance('{encouragement}');
+                utterance.lang = 'tr-TR';
+                utterance.rate = 0.8;
+                window.speechSynthesis.speak(utterance);
+            }}
+        }}, 500);
+        </script>
+        """
+        st.components.v1.html(encouragement_speech_js, height=0)
+
+@st.fragment
+def quiz_panel(subject: str, topic: str, learning_method: str):
+    """Question/answer panel; answering reruns only this fragment, not the whole page"""
+    st.markdown("### 🎮 Çalışma Araçları")
+
+    # The sidebar totals are drawn by this fragment (see the end), so an answer can update them
+    if st.session_state.sidebar_totals is None:
+        st.session_state.sidebar_totals = dict(progress_tracker.get_user_stats("tuna"))
+
+    # Persistent question state
+    if f"current_question_{subject}_{topic}" not in st.session_state:
+        st.session_state[f"current_question_{subject}_{topic}"] = None
+        st.session_state[f"answered_{subject}_{topic}"] = False
+        st.session_state[f"score_{subject}_{topic}"] = 0
+        st.session_state[f"total_questions_{subject}_{topic}"] = 0
+
+    current_q_key = f"current_question_{subject}_{topic}"
+    answered_key = f"answered_{subject}_{topic}"
+    score_key = f"score_{subject}_{topic}"
+    total_key = f"total_questions_{subject}_{topic}"
+
+    # Show current stats
+    if st.session_state[total_key] > 0:
+        st.markdown(f"**📊 Bu Konudaki Performansın:** {st.session_state[score_key]}/{st.session_state[total_key]} doğru")
+
+    if st.button("❓ Yeni Soru Getir") or st.session_state[current_q_key] is None:
+        # Öğrencinin seviyesine göre, daha önce çözmediği en bilgilendirici soru
+        mode = progress_tracker.get_difficulty_mode("tuna", subject)
+        question = selector.next_question("tuna", subject, topic, mode)
+        st.session_state[current_q_key] = question
+        st.session_state[answered_key] = False
+
+        # Alex auto-speaks the question
+        if question:
+            question_speech = f"Yeni soru geliyor! {question['text']}"
+            auto_speech_js = f"""
+            <script>
+            setTimeout(function() {{
+                if ('speechSynthesis' in window) {{
+                    var utterance = new SpeechSynthesisUtterance('{question_speech}');
+                    utterance.lang = 'tr-TR';
+                    utterance.rate = 0.8;
+                    window.speechSynthesis.speak(utterance);
+                }}
+            }}, 500);
+            </script>
+            """
+            st.components.v1.html(auto_speech_js, height=0)
+
+    current_question = st.session_state[current_q_key]
+    if current_question and not st.session_state[answered_key]:
+        st.markdown("#### 📝 Soru:")
+        st.markdown(current_question['text'])
+
+        # Multiple choice options
+        user_answer = st.radio("Cevabını seç:", current_question['options'], key=f"answer_{current_q_key}")
+
+        if st.button("✅ Cevapla", key=f"submit_{current_q_key}"):
+            st.session_state[answered_key] = True
+            st.session_state[total_key] += 1
+
+            is_correct = curriculum.check_answer(current_question['id'], user_answer)
+            feedback = {'correct': is_correct, 'correct_answer': current_question['correct_answer']}
+            total_points = None
+
+            # Cevabın bütün yazımları tek işlemde (tek commit)
+            with db.transaction(immediate=True):
+                db.log_question_attempt(
+                    "tuna", subject, topic, current_question['id'],
+                    user_answer, current_question['correct_answer'], is_correct
+                )
+                review = db.record_review("tuna", subject, topic, is_correct)
+                gamification.update_progress("tuna", "spaced_repetition_streak", review['review_count'])
+                selector.record_answer("tuna", current_question, is_correct)
+                gamification.record_technique_use(
+                    "tuna", LEARNING_METHOD_CODES.get(learning_method, "classic"), is_correct
+                )
+                if is_correct:
+                    total_points = gamification.add_points("tuna", 10, "correct_answer")
+                else:
+                    db.log_mistake("tuna", subject, topic, current_question['id'])
+
+            if is_correct:
+                st.session_state[score_key] += 1
+                feedback['points'] = total_points
+            else:
+                feedback['encouragement'] = alex.get_encouragement()
+
+            # Kenar çubuğu bu fragment'ın dışında: sayfayı yeniden çalıştırmadan güncellenir
+            update_sidebar_totals(total_points)
+            show_feedback(feedback)
+
+    elif st.session_state[answered_key]:
+        st.info("✅ Bu soruyu cevapladın! Yeni soru için 'Yeni Soru Getir' butonuna tıkla.")
+
+    if st.button("🔄 Tekrar Et"):
+        st.info("🎯 Bu konuyu aralıklı tekrar listesine eklendi!")
+        db.add_to_spaced_repetition("tuna", subject, topic)
+
+    if st.button("🎯 Pomodoro Başlat"):
+        st.session_state.current_pomodoro = {
+            'subject': subject,
+            'topic': topic,
+            'start_time': datetime.datetime.now(),
+            'duration': 25
+        }
+        st.success("⏰ 25 dakikalık çalışma başladı!")
+
+    UIUtils.show_sidebar_totals()
+
+with col2:
+    quiz_panel(subject, topic, learning_method)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Online backups for the TunaMentor database
+
+Copies the live database with the SQLite backup API a few pages at a time,
+sleeping between steps so readers and the writer are never stalled for
+long. Each copy is checked with ``PRAGMA integrity_check`` before it is
+kept, optionally gzip-compressed, and old copies are rotated out.
+
+Usage:
+    python backup.py run                 # take a backup now
+    python backup.py list                # list existing backups
+    python backup.py verify <file>       # integrity-check a backup
+    python backup.py restore <file>      # verify and restore into DATABASE_URL
+"""
+import argparse
+import gzip
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import config
+from logger import get_logger
+from storage import StorageBackend, SQLiteFileBackend, backend_from_url
+
+logger = get_logger(__name__)
+
+BACKUP_PREFIX = "alex_lgs_"
+
+
+class BackupManager:
+    """Takes, verifies, rotates and restores backups of one SQLite database"""
+
+    def __init__(self, backend: StorageBackend, backup_dir: str = "data/backups", retention: int = 7,
+                 compress: bool = True, pages_per_step: int = 256, step_sleep: float = 0.05):
+        self.backend = backend
+        self.backup_dir = Path(backup_dir)
+        self.retention = retention
+        self.compress = compress
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+
+    def _source_connection(self) -> sqlite3.Connection:
+        conn = self.backend.connect()
+        if not isinstance(conn, sqlite3.Connection):
+            conn.close()
+            raise RuntimeError(f"Online backups need a SQLite backend, not {self.backend.name}")
+        self.backend.configure(conn)
+        return conn
+
+    def backup(self) -> Path:
+        """Copy the live database into backup_dir and return the kept file"""
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        final = self.backup_dir / f"{BACKUP_PREFIX}{stamp}.db{'.gz' if self.compress else ''}"
+        partial = self.backup_dir / f".{BACKUP_PREFIX}{stamp}.db.partial"
+
+        started = time.perf_counter()
+        source = self._source_connection()
+        target = sqlite3.connect(partial)
+        try:
+            # Pin one WAL read snapshot for the whole copy: writers keep committing
+            # to the WAL meanwhile, and the backup does not restart on every write
+            source.execute("BEGIN")
+            source.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+            # Copy pages_per_step pages at a time, sleeping between steps so the
+            # copy never monopolises disk I/O
+            source.backup(target, pages=self.pages_per_step,
+                          progress=lambda status, remaining, total: time.sleep(self.step_sleep))
+            source.execute("COMMIT")
+            ok, message = self._integrity_check(target)
+        finally:
+            target.close()
+            source.close()
+
+        if not ok:
+            partial.unlink(missing_ok=True)
+            raise RuntimeError(f"Backup failed integrity check: {message}")
+
+        if self.compress:
+            compressed = partial.with_suffix(".gz.partial")
+            with open(partial, "rb") as src, gzip.open(compressed, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst)
+            partial.unlink()
+            os.replace(compressed, final)
+        else:
+            os.replace(partial, final)
+
+        logger.info(f"Database backup written to {final} in {time.perf_counter() - started:.1f}s")
+        self.rotate()
+        return final
+
+    def list_backups(self) -> List[Path]:
+        """Backups in backup_dir, newest first"""
+        if not self.backup_dir.exists():
+            return []
+        backups = [p for p in self.backup_dir.glob(f"{BACKUP_PREFIX}*.db*")
+                   if p.name.endswith((".db", ".db.gz"))]
+        return sorted(backups, key=lambda p: p.name, reverse=True)
+
+    def rotate(self) -> List[Path]:
+        """Delete all but the newest ``retention`` backups and return what was removed"""
+        removed = self.list_backups()[self.retention:]
+        for path in removed:
+            path.unlink(missing_ok=True)
+            logger.info(f"Removed old backup {path}")
+        return removed
+
+    def verify(self, path) -> Tuple[bool, str]:
+        """Run PRAGMA integrity_check on a (possibly compressed) backup"""
+        with _opened(Path(path)) as db_file:
+            conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+            try:
+                return self._integrity_check(conn)
+            finally:
+                conn.close()
+
+    def restore(self, path) -> Path:
+        """Verify a backup and copy it over the live database with the backup API"""
+        ok, message = self.verify(path)
+        if not ok:
+            raise RuntimeError(f"Refusing to restore {path}: {message}")
+        with _opened(Path(path)) as db_file:
+            source = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+            target = self._source_connection()
+            try:
+                source.backup(target, pages=self.pages_per_step)
+            finally:
+                source.close()
+                target.close()
+        logger.info(f"Database restored from {path}")
+        return Path(path)
+
+    def last_backup_time(self) -> Optional[float]:
+        backups = self.list_backups()
+        return backups[0].stat().st_mtime if backups else None
+
+    @staticmethod
+    def _integrity_check(conn: sqlite3.Connection) -> Tuple[bool, str]:
+        try:
+            rows = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+        except sqlite3.DatabaseError as e:
+            return False, str(e)
+        return rows == ["ok"], "; ".join(rows)
+
+
+class BackupScheduler:
+    """Background thread that takes a backup whenever the newest one is older than the interval"""
+
+    def __init__(self, manager: BackupManager, interval_hours: float = 24):
+        self.manager = manager
+        self.interval = interval_hours * 3600
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="db-backup", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            last = self.manager.last_backup_time()
+            wait = 0 if last is None else last + self.interval - time.time()
+            if wait <= 0:
+                try:
+                    self.manager.backup()
+                except Exception as e:
+                    logger.error(f"Scheduled database backup failed: {e}")
+                wait = self.interval
+            # Wake up at least hourly so the schedule survives clock changes
+            self._stop.wait(min(wait, 3600))
+
+
+@contextmanager
+def _opened(path: Path) -> Iterator[str]:
+    """Yield a plain .db path, decompressing .gz backups to a temporary file"""
+    if not path.exists():
+        raise FileNotFoundError(path)
+    if path.suffix != ".gz":
+        yield str(path)
+        return
+    fd, temp = tempfile.mkstemp(suffix=".db")
+    try:
+        with os.fdopen(fd, "wb") as dst, gzip.open(path, "rb") as src:
+            shutil.copyfileobj(src, dst)
+        yield temp
+    finally:
+        os.unlink(temp)
+
+
+_schedulers: Dict[str, BackupScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def manager_from_config(database_url: Optional[str] = None) -> BackupManager:
+    return BackupManager(
+        backend_from_url(database_url or config.DATABASE_URL),
+        backup_dir=config.DATABASE_BACKUP_DIR,
+        retention=config.DATABASE_BACKUP_RETENTION,
+        compress=config.DATABASE_BACKUP_COMPRESS
+    )
+
+
+def start_backup_scheduler() -> Optional[BackupScheduler]:
+    """Start the process-wide backup job if DATABASE_BACKUP_ENABLED (safe to call on every rerun)"""
+    if not config.DATABASE_BACKUP_ENABLED:
+        return None
+    manager = manager_from_config()
+    if not isinstance(manager.backend, SQLiteFileBackend):
+        return None  # Memory and libSQL databases are not backed up from here
+    with _schedulers_lock:
+        scheduler = _schedulers.get(manager.backend.key)
+        if scheduler is None:
+            scheduler = _schedulers[manager.backend.key] = BackupScheduler(
+                manager, config.DATABASE_BACKUP_INTERVAL_HOURS
+            )
+            scheduler.start()
+        return scheduler
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="TunaMentor database backups")
+    parser.add_argument("--db", default=None, help="database file (default: DATABASE_URL)")
+    parser.add_argument("--dir", default=None, help="backup directory (default: DATABASE_BACKUP_DIR)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("run", help="Take a backup now")
+    subparsers.add_parser("list", help="List existing backups")
+    for name, help_text in (("verify", "Integrity-check a backup"), ("restore", "Restore a verified backup")):
+        subparsers.add_parser(name, help=help_text).add_argument("file")
+    args = parser.parse_args(argv)
+
+    manager = manager_from_config(args.db)
+    if args.dir:
+        manager.backup_dir = Path(args.dir)
+
+    try:
+        if args.command == "run":
+            path = manager.backup()
+            print(f"✅ Backup written: {path}")
+        elif args.command == "list":
+            for path in manager.list_backups():
+                size_mb = path.stat().st_size / (1024 * 1024)
+                print(f"{path.name}\t{size_mb:.1f} MB")
+        elif args.command == "verify":
+            ok, message = manager.verify(args.file)
+            print(f"{'✅' if ok else '❌'} {args.file}: {message}")
+            return 0 if ok else 1
+        elif args.command == "restore":
+            manager.restore(args.file)
+            print(f"✅ Restored {manager.backend.describe()} from {args.file}")
+    except Exception as e:
+        logger.error(f"Backup command {args.command} failed: {e}")
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the study statistics queries in database.py
+
+Builds a synthetic database at the original (unindexed, username-keyed)
+schema, times the get_study_stats queries, applies the migrations (indexes,
+integer keys) and times them again, reporting table and index sizes.
+
+Usage:
+    python benchmark_database.py                  # 10M attempt rows
+    python benchmark_database.py --rows 1000000 --users 2000
+"""
+import argparse
+import datetime
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import Dict
+
+import migrations
+from storage import SQLITE_PRAGMAS
+
+# Queries exactly as get_study_stats issued them before and after the migration
+BEFORE_QUERIES = {
+    "study time": '''
+        SELECT SUM(duration_minutes) FROM study_sessions
+        WHERE username = ? AND session_date >= ?
+    ''',
+    "subject breakdown": '''
+        SELECT subject, SUM(duration_minutes) FROM study_sessions
+        WHERE username = ? AND session_date >= ?
+        GROUP BY subject
+    ''',
+    "accuracy": '''
+        SELECT COUNT(*), SUM(CASE WHEN is_correct THEN 1 ELSE 0 END)
+        FROM question_attempts
+        WHERE username = ? AND DATE(attempt_date) >= ?
+    '''
+}
+
+# After the migrations: integer keys, with the username resolved once per query
+AFTER_QUERIES = {
+    "study time": '''
+        SELECT SUM(duration_minutes) FROM study_sessions
+        WHERE user_id = (SELECT id FROM users WHERE username = ?) AND session_date >= ?
+    ''',
+    "subject breakdown": '''
+        SELECT s.name, SUM(duration_minutes) FROM study_sessions
+        JOIN subjects s ON s.id = subject_id
+        WHERE user_id = (SELECT id FROM users WHERE username = ?) AND session_date >= ?
+        GROUP BY subject_id
+    ''',
+    "accuracy": '''
+        SELECT COUNT(*), SUM(CASE WHEN is_correct THEN 1 ELSE 0 END)
+        FROM question_attempts
+        WHERE user_id = (SELECT id FROM users WHERE username = ?) AND attempt_day >= ?
+    '''
+}
+
+SUBJECTS = ["Matematik", "Türkçe", "Fen Bilimleri", "T.C. İnkılap Tarihi", "Din Kültürü", "İngilizce"]
+
+
+def populate(conn: sqlite3.Connection, rows: int, users: int, days: int):
+    """Fill question_attempts (and a tenth as many study_sessions) with synthetic rows"""
+    subjects_sql = "CASE n % 6 " + " ".join(
+        f"WHEN {i} THEN '{name}'" for i, name in enumerate(SUBJECTS)
+    ) + " END"
+
+    conn.execute("BEGIN")
+    conn.execute(f'''
+        INSERT INTO question_attempts
+        (username, subject, topic, question_id, user_answer, correct_answer, is_correct, attempt_date)
+        WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < ?)
+        SELECT 'user_' || (n % ?), {subjects_sql}, 'Konu ' || (n % 10), 'q_' || (n % 5000),
+               'A', 'A', (n * 7919) % 10 < 7,
+               DATETIME('2025-01-01', '+' || ((n / ?) % ?) || ' days', '+' || (n % 86400) || ' seconds')
+        FROM seq
+    ''', (rows, users, users, days))
+    conn.execute(f'''
+        INSERT INTO study_sessions (username, subject, topic, duration_minutes, session_date)
+        WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < ?)
+        SELECT 'user_' || (n % ?), {subjects_sql}, 'Konu ' || (n % 10), 15 + n % 30,
+               DATE('2025-01-01', '+' || ((n / ?) % ?) || ' days')
+        FROM seq
+    ''', (max(1, rows // 10), users, users, days))
+    conn.commit()
+
+
+def time_queries(conn: sqlite3.Connection, queries, usernames, start_date: str, repeat: int):
+    """Return {query name: median milliseconds} over the sampled users"""
+    results = {}
+    for name, sql in queries.items():
+        samples = []
+        for _ in range(repeat):
+            for username in usernames:
+                started = time.perf_counter()
+                conn.execute(sql, (username, start_date)).fetchall()
+                samples.append((time.perf_counter() - started) * 1000)
+        results[name] = statistics.median(samples)
+    return results
+
+
+def table_sizes(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Bytes used by each table and index (dbstat), largest first"""
+    try:
+        rows = conn.execute(
+            "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY 2 DESC"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return {}  # SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+    return dict(rows)
+
+
+def query_plans(conn: sqlite3.Connection, queries):
+    return {
+        name: "; ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, ("user_0", "2025-01-01")))
+        for name, sql in queries.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark study statistics queries")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="question_attempts rows to generate")
+    parser.add_argument("--users", type=int, default=5_000, help="distinct users")
+    parser.add_argument("--days", type=int, default=365, help="days of history")
+    parser.add_argument("--samples", type=int, default=20, help="users sampled per query")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per sampled user")
+    parser.add_argument("--path", default=None, help="database file (default: temporary file)")
+    args = parser.parse_args()
+
+    path = args.path or os.path.join(tempfile.mkdtemp(prefix="alex_bench_"), "bench.db")
+    conn = sqlite3.connect(path, isolation_level=None)
+    for pragma, value in SQLITE_PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+
+    print(f"📦 Database: {path}")
+    migrations.MIGRATIONS[0].upgrade(conn.cursor())
+    conn.execute("PRAGMA user_version = 1")
+
+    started = time.perf_counter()
+    populate(conn, args.rows, args.users, args.days)
+    print(f"⏱️ Generated {args.rows:,} attempts in {time.perf_counter() - started:.1f}s")
+
+    usernames = [f"user_{i * (args.users // args.samples or 1) % args.users}" for i in range(args.samples)]
+    start_date = (datetime.date(2025, 1, 1) + datetime.timedelta(days=args.days - 7)).isoformat()
+
+    before = time_queries(conn, BEFORE_QUERIES, usernames, start_date, args.repeat)
+    before_plans = query_plans(conn, BEFORE_QUERIES)
+    before_sizes = table_sizes(conn)
+
+    started = time.perf_counter()
+    migrations.migrate(conn)
+    print(f"⏱️ Migrations took {time.perf_counter() - started:.1f}s")
+
+    after = time_queries(conn, AFTER_QUERIES, usernames, start_date, args.repeat)
+    after_plans = query_plans(conn, AFTER_QUERIES)
+    after_sizes = table_sizes(conn)
+
+    print("\n📊 Median latency per call (last-week period)")
+    print("=" * 60)
+    print(f"{'query':<20}{'before ms':>12}{'after ms':>12}{'speedup':>12}")
+    for name in BEFORE_QUERIES:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<20}{before[name]:>12.2f}{after[name]:>12.3f}{speedup:>11.0f}x")
+    print("=" * 60)
+    for name in BEFORE_QUERIES:
+        print(f"{name}:\n  before: {before_plans[name]}\n  after:  {after_plans[name]}")
+
+    if after_sizes:
+        print("\n💾 Size of the largest tables and indexes (MB)")
+        print("=" * 60)
+        for name, size in list(after_sizes.items())[:8]:
+            before_size = before_sizes.get(name)
+            before_text = f"{before_size / 1e6:>10.1f}" if before_size else f"{'-':>10}"
+            print(f"{name:<40}{before_text}{size / 1e6:>10.1f}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,760 @@
+"""
+In-process caching for Alex LGS
+
+``TTLCache`` is a thread-safe LRU cache bounded by entry count and
+(approximate) memory, with optional per-entry TTL, tags for group
+invalidation and per-key locks so that concurrent misses on the same key
+compute the value once instead of stampeding the database or the AI API.
+
+Named caches are shared process-wide through ``get_cache`` so the database,
+curriculum and AI layers can invalidate each other's entries by tag, and
+``cached`` wraps a function with one of them:
+
+    @cached("reports", ttl=3600)
+    def weekly_summary(self, username): ...
+
+    get_cache("ai").invalidate_tag("ai_responses")
+
+When several worker processes serve the app, ``get_shared_cache`` can add a
+second tier: a SQLite key-value file (``CACHE_DISK_PATH``, off by default)
+shared by every worker on the host, behind the in-process LRU. Values are
+pickled and zlib-compressed, a lease makes one worker compute a missing value
+while the others wait for it, and invalidation bumps namespace versions
+stored in the file, so entries computed under an old version are simply never
+read again. Hot write paths use ``bump_version_later``, which coalesces the
+bumps of a fraction of a second into one write to the file.
+
+Entries are unpickled on read, so anyone who can write the file can run code
+in every worker: only enable the tier with a path that only the app's user
+can write.
+"""
+import atexit
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple, Union
+
+from config import config
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+_MISSING = object()
+_DISK_ERRORS = (sqlite3.Error, OSError)  # A broken shared cache file is a miss, never a crash
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size", "tags")
+
+    def __init__(self, value: Any, expires_at: Optional[float], size: int, tags: frozenset):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.tags = tags
+
+
+class TTLCache:
+    """Thread-safe LRU cache with optional TTL, size and memory bounds"""
+
+    def __init__(self, name: str = "default", max_entries: int = 1024,
+                 max_bytes: Optional[int] = None, ttl: Optional[float] = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._tags: Dict[Hashable, set] = {}
+        self._key_locks: Dict[Hashable, "_KeyLock"] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None, count: bool = True) -> Any:
+        """Cached value for key, or default when it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, tags: Iterable[Hashable] = ()):
+        """Store a value; ``ttl`` (seconds) overrides the cache default, tags allow group invalidation"""
+        ttl = self.ttl if ttl is None else ttl
+        size = _estimate_size(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return  # Larger than the whole cache
+        entry = _Entry(value, time.monotonic() + ttl if ttl else None, size, frozenset(tags))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self._evict()
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any], ttl: Optional[float] = None,
+                   tags: Iterable[Hashable] = ()) -> Any:
+        """Cached value for key, computing and storing it on a miss
+
+        Concurrent misses on the same key wait for the first caller's result
+        rather than all calling ``compute``.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._key_lock(key):
+            # Another thread may have filled the entry while we waited
+            value = self.get(key, _MISSING, count=False)
+            if value is not _MISSING:
+                return value
+            value = compute()
+            self.set(key, value, ttl=ttl, tags=tags)
+            return value
+
+    def invalidate(self, key: Hashable) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def invalidate_tag(self, tag: Hashable) -> int:
+        """Drop every entry stored with this tag; returns how many were dropped"""
+        with self._lock:
+            keys = self._tags.pop(tag, set())
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    def _key_lock(self, key: Hashable) -> "_KeyLock":
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = _KeyLock(self, key)
+            lock.waiters += 1
+            return lock
+
+    def _release_key_lock(self, key: Hashable, lock: "_KeyLock"):
+        with self._lock:
+            lock.waiters -= 1
+            if lock.waiters == 0:
+                del self._key_locks[key]
+
+    def _remove(self, key: Hashable):
+        # Caller holds self._lock
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _evict(self):
+        # Caller holds self._lock; least recently used entries go first
+        while self._entries and (
+            len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+
+class _KeyLock:
+    """Per-key lock that removes itself from the cache once nobody waits on it"""
+
+    def __init__(self, cache: TTLCache, key: Hashable):
+        self.cache = cache
+        self.key = key
+        self.lock = threading.Lock()
+        self.waiters = 0
+
+    def __enter__(self):
+        self.lock.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.lock.release()
+        self.cache._release_key_lock(self.key, self)
+
+
+class DiskCache:
+    """SQLite key-value file shared by every worker process on the host
+
+    Keys are 16-byte digests (see ``key_digest``), values are ``dumps`` blobs.
+    The file is only a cache: it runs without fsync and every SQLite error is
+    logged and treated as a miss, so a broken or locked file never breaks the
+    app. Expired entries and entries beyond ``max_bytes`` (oldest first) are
+    pruned every few writes. A file this creates is readable and writable by
+    its owner only, since entries are unpickled.
+    """
+
+    PRUNE_EVERY = 64  # Writes between two prunes
+    VERSION_TTL = 1.0  # Seconds a namespace version read from the file is reused
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._ready = False
+        self._writes = 0
+        self._versions: Dict[str, Tuple[int, float]] = {}  # namespace -> (version, read at)
+        self._versions_lock = threading.Lock()
+        self._warned = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Created owner-only (SQLite gives the -wal/-shm files the same mode)
+            os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600))
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            with self._lock:
+                if not self._ready:
+                    conn.executescript("""
+                        CREATE TABLE IF NOT EXISTS cache_entries (
+                            key BLOB PRIMARY KEY,
+                            value BLOB NOT NULL,
+                            size INTEGER NOT NULL,
+                            expires_at REAL,
+                            created_at REAL NOT NULL
+                        ) WITHOUT ROWID;
+                        CREATE INDEX IF NOT EXISTS idx_cache_entries_created ON cache_entries(created_at);
+                        CREATE TABLE IF NOT EXISTS cache_versions (
+                            namespace TEXT PRIMARY KEY,
+                            version INTEGER NOT NULL
+                        ) WITHOUT ROWID;
+                        CREATE TABLE IF NOT EXISTS cache_leases (
+                            key BLOB PRIMARY KEY,
+                            expires_at REAL NOT NULL
+                        ) WITHOUT ROWID;
+                    """)
+                    self._ready = True
+            self._local.conn = conn
+        return conn
+
+    def _failed(self, action: str, error: Exception):
+        # Log the first failure loudly, then quietly: the cache keeps working in memory
+        if not self._warned:
+            self._warned = True
+            logger.warning(f"Shared cache {self.path} unavailable ({action}): {error}")
+        else:
+            logger.debug(f"Shared cache {action} failed: {error}")
+
+    def get(self, key: bytes, default: Any = None) -> Any:
+        try:
+            row = self._conn().execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+        except _DISK_ERRORS as e:
+            self._failed("read", e)
+            return default
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return default
+        try:
+            return loads(row[0])
+        except Exception as e:  # Written by an incompatible version of the code
+            logger.debug(f"Dropping unreadable shared cache entry: {e}")
+            self.invalidate(key)
+            return default
+
+    def set(self, key: bytes, value: Any, ttl: Optional[float] = None):
+        try:
+            blob = dumps(value)
+        except Exception as e:  # Unpicklable values stay in memory only
+            logger.debug(f"Not storing unpicklable value in shared cache: {e}")
+            return
+        if self.max_bytes and len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, size, expires_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now + ttl if ttl else None, now)
+            )
+        except _DISK_ERRORS as e:
+            self._failed("write", e)
+            return
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def invalidate(self, key: bytes):
+        try:
+            self._conn().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        except _DISK_ERRORS as e:
+            self._failed("delete", e)
+
+    def clear(self):
+        """Drop every entry and lease (namespace versions are kept, so they never go back)"""
+        try:
+            conn = self._conn()
+            conn.execute("DELETE FROM cache_entries")
+            conn.execute("DELETE FROM cache_leases")
+        except _DISK_ERRORS as e:
+            self._failed("clear", e)
+
+    def prune(self) -> int:
+        """Delete expired entries, then the oldest ones until the file fits max_bytes"""
+        try:
+            conn = self._conn()
+            removed = conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)).rowcount
+            if self.max_bytes:
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+                excess = total - self.max_bytes
+                if excess > 0:
+                    doomed = []
+                    for key, size in conn.execute("SELECT key, size FROM cache_entries ORDER BY created_at"):
+                        doomed.append((key,))
+                        excess -= size
+                        if excess <= 0:
+                            break
+                    conn.executemany("DELETE FROM cache_entries WHERE key = ?", doomed)
+                    removed += len(doomed)
+            return removed
+        except _DISK_ERRORS as e:
+            self._failed("prune", e)
+            return 0
+
+    def acquire(self, key: bytes, seconds: float) -> bool:
+        """Take the lease to compute key; False while another process holds it"""
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute("DELETE FROM cache_leases WHERE key = ? AND expires_at <= ?", (key, now))
+            return conn.execute(
+                "INSERT OR IGNORE INTO cache_leases (key, expires_at) VALUES (?, ?)", (key, now + seconds)
+            ).rowcount == 1
+        except _DISK_ERRORS as e:
+            self._failed("lease", e)
+            return True  # Compute locally rather than wait on a broken file
+
+    def release(self, key: bytes):
+        try:
+            self._conn().execute("DELETE FROM cache_leases WHERE key = ?", (key,))
+        except _DISK_ERRORS as e:
+            self._failed("lease", e)
+
+    def versions(self, namespaces: Iterable[str]) -> Tuple[int, ...]:
+        """Current version of each namespace (re-read from the file at most every VERSION_TTL)"""
+        namespaces = tuple(namespaces)
+        now = time.monotonic()
+        with self._versions_lock:
+            stale = [ns for ns in namespaces
+                     if ns not in self._versions or now - self._versions[ns][1] > self.VERSION_TTL]
+        if stale:
+            try:
+                rows = dict(self._conn().execute(
+                    f"SELECT namespace, version FROM cache_versions WHERE namespace IN ({','.join('?' * len(stale))})",
+                    stale
+                ).fetchall())
+            except _DISK_ERRORS as e:
+                self._failed("read", e)
+                rows = {}
+            self._remember_versions(rows, stale, now)
+        with self._versions_lock:
+            return tuple(self._versions[ns][0] for ns in namespaces)
+
+    def _remember_versions(self, rows: Dict[str, int], namespaces: Iterable[str], now: float):
+        """Store versions read or written; a slower, older read never moves one back"""
+        with self._versions_lock:
+            for ns in namespaces:
+                known = self._versions.get(ns, (0, 0.0))[0]
+                self._versions[ns] = (max(known, rows.get(ns, 0)), now)
+
+    def bump(self, namespace: str) -> int:
+        """Invalidate every entry keyed under this namespace, in every process"""
+        return self.bump_many((namespace,))[0]
+
+    def bump_many(self, namespaces: Iterable[str]) -> Tuple[int, ...]:
+        """``bump`` for several namespaces in one write transaction"""
+        namespaces = tuple(namespaces)
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO cache_versions (namespace, version) VALUES (?, 1) "
+                    "ON CONFLICT(namespace) DO UPDATE SET version = version + 1",
+                    [(ns,) for ns in namespaces]
+                )
+                rows = dict(conn.execute(
+                    f"SELECT namespace, version FROM cache_versions "
+                    f"WHERE namespace IN ({','.join('?' * len(namespaces))})",
+                    namespaces
+                ).fetchall())
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except _DISK_ERRORS as e:
+            self._failed("write", e)
+            with self._versions_lock:
+                rows = {ns: self._versions.get(ns, (0, 0.0))[0] + 1 for ns in namespaces}
+        self._remember_versions(rows, namespaces, time.monotonic())
+        return tuple(rows[ns] for ns in namespaces)
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            entries, size = self._conn().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+            ).fetchone()
+        except _DISK_ERRORS as e:
+            self._failed("read", e)
+            entries, size = 0, 0
+        return {'path': self.path, 'entries': entries, 'bytes': size}
+
+
+class _LocalVersions:
+    """Namespace versions of a single process, used when there is no disk tier"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+
+    def versions(self, namespaces: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self._versions.get(ns, 0) for ns in namespaces)
+
+    def bump(self, namespace: str) -> int:
+        with self._lock:
+            version = self._versions[namespace] = self._versions.get(namespace, 0) + 1
+            return version
+
+
+class TieredCache:
+    """In-process TTLCache in front of the host-wide DiskCache
+
+    Entries are keyed by the versions of the cache's own namespace (its name)
+    plus any ``versions`` namespaces given at lookup; ``bump_version`` on one
+    of them invalidates the entries in every worker. Without a disk tier this
+    is a plain in-process cache with the same interface.
+    """
+
+    LEASE_SECONDS = 60.0  # Longest a worker waits for another one's computation
+    LEASE_POLL = 0.05
+
+    def __init__(self, name: str, disk: Optional[DiskCache], max_entries: int = 1024,
+                 max_bytes: Optional[int] = None, ttl: Optional[float] = None):
+        self.name = name
+        self.disk = disk
+        self.ttl = ttl
+        self.memory = TTLCache(name, max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+        self.disk_hits = 0
+        self.disk_misses = 0
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any], ttl: Optional[float] = None,
+                   tags: Iterable[Hashable] = (), versions: Iterable[str] = ()) -> Any:
+        """Cached value for key, looked up in memory, then on disk, then computed once per host"""
+        ttl = self.ttl if ttl is None else ttl
+        vector = namespace_versions((self.name,) + tuple(versions))
+        full_key = (key, vector)
+        if self.disk is None:
+            return self.memory.get_or_set(full_key, compute, ttl=ttl, tags=tags)
+        return self.memory.get_or_set(full_key, lambda: self._load(full_key, compute, ttl), ttl=ttl, tags=tags)
+
+    def _load(self, full_key: Hashable, compute: Callable[[], Any], ttl: Optional[float]) -> Any:
+        digest = key_digest(self.name, full_key)
+        value = self.disk.get(digest, _MISSING)
+        if value is not _MISSING:
+            self.disk_hits += 1
+            return value
+        self.disk_misses += 1
+
+        # Another worker holding the lease is computing the same value: wait for it.
+        # The lease is released when it fails too, and then we compute it ourselves.
+        while not self.disk.acquire(digest, self.LEASE_SECONDS):
+            time.sleep(self.LEASE_POLL)
+            value = self.disk.get(digest, _MISSING)
+            if value is not _MISSING:
+                self.disk_hits += 1
+                return value
+        try:
+            value = compute()
+            self.disk.set(digest, value, ttl=ttl)
+            return value
+        finally:
+            self.disk.release(digest)
+
+    def invalidate_tag(self, tag: Hashable) -> int:
+        """Drop tagged entries from this process's memory tier only"""
+        return self.memory.invalidate_tag(tag)
+
+    def clear(self):
+        """Invalidate every entry of this cache in every process"""
+        bump_version(self.name)
+        self.memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.memory.stats()
+        stats['disk_hits'] = self.disk_hits
+        stats['disk_misses'] = self.disk_misses
+        return stats
+
+
+def _estimate_size(value: Any, depth: int = 0) -> int:
+    """Approximate memory held by a value (containers are followed a few levels deep)"""
+    size = sys.getsizeof(value)
+    if depth >= 4:
+        return size
+    if isinstance(value, dict):
+        size += sum(_estimate_size(k, depth + 1) + _estimate_size(v, depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_estimate_size(item, depth + 1) for item in value)
+    return size
+
+
+def make_key(*args, **kwargs) -> Hashable:
+    """Hashable cache key for call arguments (dicts, lists and sets are frozen recursively)"""
+    key = args + (("__kwargs__",) + tuple(sorted(kwargs.items())) if kwargs else ())
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return _freeze(key)
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return ("__dict__",) + tuple(sorted(((_freeze(k), _freeze(v)) for k, v in value.items()), key=repr))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+_caches: Dict[str, TTLCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, max_entries: int = 1024, max_bytes: Optional[int] = None,
+              ttl: Optional[float] = None) -> TTLCache:
+    """Process-wide named cache; the options only apply when it is first created"""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = TTLCache(name, max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+        return cache
+
+
+_COMPRESS_MIN = 512  # Smaller pickles are stored as they are
+_RAW, _ZLIB = b"\x00", b"\x01"
+
+
+def dumps(value: Any) -> bytes:
+    """Compact serialization for the disk tier: a pickle, zlib-compressed when that helps"""
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) >= _COMPRESS_MIN:
+        packed = zlib.compress(data, 6)
+        if len(packed) < len(data):
+            return _ZLIB + packed
+    return _RAW + data
+
+
+def loads(blob: bytes) -> Any:
+    data = blob[1:]
+    if blob[:1] == _ZLIB:
+        data = zlib.decompress(data)
+    return pickle.loads(data)
+
+
+def key_digest(*parts: Any) -> bytes:
+    """Digest of a key that is the same in every process
+
+    ``hash()`` of strings is salted per process and set ordering follows it,
+    so keys are first rendered canonically (dicts and sets sorted).
+    """
+    return hashlib.blake2b(_canonical(parts).encode("utf-8"), digest_size=16).digest()
+
+
+def _canonical(value: Any) -> str:
+    if isinstance(value, dict):
+        return "{" + ",".join(sorted(f"{_canonical(k)}:{_canonical(v)}" for k, v in value.items())) + "}"
+    if isinstance(value, (set, frozenset)):
+        return "set(" + ",".join(sorted(_canonical(item) for item in value)) + ")"
+    if isinstance(value, list):
+        return "[" + ",".join(_canonical(item) for item in value) + "]"
+    if isinstance(value, tuple):
+        return "(" + ",".join(_canonical(item) for item in value) + ")"
+    return repr(value)
+
+
+_shared_caches: Dict[str, TieredCache] = {}
+_disk: Optional[DiskCache] = None
+_disk_loaded = False
+_local_versions = _LocalVersions()
+
+
+def get_disk_cache() -> Optional[DiskCache]:
+    """The host-wide disk tier at CACHE_DISK_PATH, or None when that is empty"""
+    global _disk, _disk_loaded
+    with _caches_lock:
+        if not _disk_loaded:
+            if config.CACHE_DISK_PATH:
+                _disk = DiskCache(config.CACHE_DISK_PATH, max_bytes=config.CACHE_DISK_MAX_MB * 1024 * 1024)
+            _disk_loaded = True
+        return _disk
+
+
+def namespace_versions(namespaces: Iterable[str]) -> Tuple[int, ...]:
+    """Versions of the namespaces, shared by every worker when the disk tier is on"""
+    disk = get_disk_cache()
+    return (disk or _local_versions).versions(namespaces)
+
+
+def bump_version(namespace: str) -> int:
+    """Invalidate every tiered entry keyed under the namespace"""
+    disk = get_disk_cache()
+    return (disk or _local_versions).bump(namespace)
+
+
+BUMP_DELAY = 0.25  # Seconds a deferred bump waits for others to share its write
+
+_pending_bumps: set = set()
+_pending_lock = threading.Lock()
+_bump_timer: Optional[threading.Timer] = None
+
+
+def bump_version_later(namespace: str):
+    """``bump_version`` for hot write paths: published within BUMP_DELAY
+
+    Every namespace bumped meanwhile goes to the disk tier in one write, so a
+    burst of writes costs one short transaction instead of one each. Until
+    then other processes (and this one's tiered lookups, unless they call
+    ``publish_bumps`` first) still see the old version.
+    """
+    global _bump_timer
+    if get_disk_cache() is None:
+        _local_versions.bump(namespace)
+        return
+    with _pending_lock:
+        _pending_bumps.add(namespace)
+        if _bump_timer is None:
+            _bump_timer = threading.Timer(BUMP_DELAY, publish_bumps)
+            _bump_timer.daemon = True
+            _bump_timer.start()
+
+
+@atexit.register
+def publish_bumps(namespaces: Optional[Iterable[str]] = None):
+    """Publish deferred bumps now: all of them, or only those among ``namespaces``"""
+    global _bump_timer
+    with _pending_lock:
+        if namespaces is None:
+            due = list(_pending_bumps)
+            _pending_bumps.clear()
+            _bump_timer = None
+        else:
+            due = [ns for ns in namespaces if ns in _pending_bumps]
+            _pending_bumps.difference_update(due)
+    disk = get_disk_cache()
+    if due and disk is not None:
+        disk.bump_many(due)
+
+
+def get_shared_cache(name: str, max_entries: int = 1024, max_bytes: Optional[int] = None,
+                     ttl: Optional[float] = None) -> TieredCache:
+    """Process-wide two-tier cache; the options only apply when it is first created"""
+    disk = get_disk_cache()
+    with _caches_lock:
+        cache = _shared_caches.get(name)
+        if cache is None:
+            cache = _shared_caches[name] = TieredCache(
+                name, disk, max_entries=max_entries, max_bytes=max_bytes, ttl=ttl
+            )
+        return cache
+
+
+def all_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of every named cache"""
+    with _caches_lock:
+        caches = list(_caches.values()) + list(_shared_caches.values())
+    return {cache.name: cache.stats() for cache in caches}
+
+
+def cached(cache: Union[str, TTLCache, TieredCache, None] = None, ttl: Optional[float] = None,
+           tags: Union[Iterable[Hashable], Callable[..., Iterable[Hashable]]] = (),
+           key: Optional[Callable[..., Hashable]] = None):
+    """Decorator caching a function's results in a TTLCache
+
+    ``cache`` is a cache (in-process or tiered) or the name of a shared
+    in-process one (default: one per function).
+    ``tags`` may be a callable receiving the call arguments; ``key`` builds the
+    cache key from them (default: ``make_key``). The wrapper exposes ``.cache``.
+    """
+    def decorator(func):
+        target = cache
+        if target is None:
+            target = TTLCache(f"{func.__module__}.{func.__qualname__}")
+        elif isinstance(target, str):
+            target = get_cache(target)
+        make = key or make_key
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            entry_key = (func.__qualname__, make(*args, **kwargs))
+            entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+            return target.get_or_set(entry_key, lambda: func(*args, **kwargs), ttl=ttl, tags=entry_tags)
+
+        wrapper.cache = target
+        return wrapper
+
+    return decorator
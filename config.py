@@ -21,7 +21,26 @@ class Config:
     
     # Database Configuration
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///alex_lgs.db")
+    DATABASE_AUTH_TOKEN: str = os.getenv("DATABASE_AUTH_TOKEN", "")  # libSQL server token
+    DATABASE_REPLICA_PATH: str = os.getenv("DATABASE_REPLICA_PATH", "")  # Optional local libSQL replica
     DATABASE_BACKUP_ENABLED: bool = os.getenv("DATABASE_BACKUP_ENABLED", "true").lower() == "true"
+    DATABASE_BACKUP_DIR: str = os.getenv("DATABASE_BACKUP_DIR", "data/backups")
+    DATABASE_BACKUP_RETENTION: int = int(os.getenv("DATABASE_BACKUP_RETENTION", "7"))  # Backups kept
+    DATABASE_BACKUP_INTERVAL_HOURS: float = float(os.getenv("DATABASE_BACKUP_INTERVAL_HOURS", "24"))
+    DATABASE_BACKUP_COMPRESS: bool = os.getenv("DATABASE_BACKUP_COMPRESS", "true").lower() == "true"
+    DATABASE_ARCHIVE_AFTER_DAYS: int = int(os.getenv("DATABASE_ARCHIVE_AFTER_DAYS", "180"))  # Hot history horizon
+    DATABASE_WRITE_BEHIND: bool = os.getenv("DATABASE_WRITE_BEHIND", "false").lower() == "true"
+    
+    # Cache Configuration
+    CACHE_MAX_MB: int = int(os.getenv("CACHE_MAX_MB", "32"))  # Memory bound of each shared cache
+    AI_CACHE_TTL_SECONDS: int = int(os.getenv("AI_CACHE_TTL_SECONDS", "3600"))  # Reuse identical AI answers
+    CACHE_DISK_PATH: str = os.getenv("CACHE_DISK_PATH", "")  # Opt-in file shared by worker processes; entries are unpickled
+    CACHE_DISK_MAX_MB: int = int(os.getenv("CACHE_DISK_MAX_MB", "256"))
+    
+    # Question Bank Configuration
+    QUESTION_BANK_PATH: str = os.getenv("QUESTION_BANK_PATH", "data/question_bank.pack")  # Compiled pack
+    QUESTION_BANK_SOURCES: str = os.getenv("QUESTION_BANK_SOURCES", "data/questions")  # JSON/CSV sources
+    QUESTION_BANK_CACHE_BLOCKS: int = int(os.getenv("QUESTION_BANK_CACHE_BLOCKS", "256"))  # Decoded blocks kept in memory
     
     # Security Configuration
     SECRET_KEY: str = os.getenv("SECRET_KEY", "default-secret-key-please-change")
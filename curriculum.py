@@ -1,11 +1,25 @@
 import json
-import random
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+from config import config
+from question_bank import Question, QuestionPack, open_question_bank
+from search import SearchIndex, open_search_index, search_index_path
+
 
 class Curriculum:
-    def __init__(self):
+    def __init__(self, bank_path: Optional[str] = None, sources: Optional[str] = None):
         self.meb_curriculum = self._load_meb_curriculum()
-        self.question_bank = self._load_question_bank()
+        # Memory-mapped pack compiled from data/questions (see ingest_questions.py)
+        self.question_bank: QuestionPack = open_question_bank(
+            bank_path or config.QUESTION_BANK_PATH,
+            config.QUESTION_BANK_SOURCES if sources is None else sources,
+            config.QUESTION_BANK_CACHE_BLOCKS
+        )
+        self.lesson_content = self._load_lesson_content()
+        # Built with the pack; rebuilt here only when the pack or the lessons changed
+        self.search_index: SearchIndex = open_search_index(
+            search_index_path(self.question_bank.path), self.question_bank, self.lesson_content, self.meb_curriculum
+        )
     
     def _load_meb_curriculum(self) -> Dict[str, Any]:
         """Load MEB 8th grade curriculum structure"""
@@ -69,84 +83,14 @@ class Curriculum:
             ]
         }
     
-    def _load_question_bank(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Load sample question bank for each subject"""
-        return {
-            "Matematik": [
-                {
-                    "id": "mat_001",
-                    "topic": "Çarpanlar ve Katlar",
-                    "text": "12 sayısının pozitif bölenlerinin toplamı kaçtır?",
-                    "options": ["A) 24", "B) 28", "C) 30", "D) 32"],
-                    "correct_answer": "B) 28",
-                    "explanation": "12'nin pozitif bölenleri: 1, 2, 3, 4, 6, 12. Toplamları: 1+2+3+4+6+12 = 28"
-                },
-                {
-                    "id": "mat_002", 
-                    "topic": "Üslü İfadeler",
-                    "text": "2⁴ × 2³ işleminin sonucu kaçtır?",
-                    "options": ["A) 2⁷", "B) 2¹²", "C) 4⁷", "D) 4¹²"],
-                    "correct_answer": "A) 2⁷",
-                    "explanation": "Aynı tabanlı sayıların çarpımında üsler toplanır: 2⁴ × 2³ = 2⁴⁺³ = 2⁷"
-                },
-                {
-                    "id": "mat_003",
-                    "topic": "Cebirsel İfadeler", 
-                    "text": "3x + 2 = 14 denkleminde x kaçtır?",
-                    "options": ["A) 3", "B) 4", "C) 5", "D) 6"],
-                    "correct_answer": "B) 4",
-                    "explanation": "3x + 2 = 14 → 3x = 12 → x = 4"
-                }
-            ],
-            "Türkçe": [
-                {
-                    "id": "tur_001",
-                    "topic": "Sözcükte Anlam",
-                    "text": "'Kitabı masanın üzerine koydu.' cümlesinde 'üzerine' sözcüğü hangi anlamda kullanılmıştır?",
-                    "options": ["A) Zaman", "B) Yer", "C) Sebep", "D) Amaç"],
-                    "correct_answer": "B) Yer",
-                    "explanation": "'Üzerine' sözcüğü burada yer bildiren bir edat olarak kullanılmıştır."
-                },
-                {
-                    "id": "tur_002",
-                    "topic": "Cümlenin Öğeleri",
-                    "text": "'Çocuklar parkta top oynuyor.' cümlesinde özne hangisidir?",
-                    "options": ["A) Çocuklar", "B) parkta", "C) top", "D) oynuyor"],
-                    "correct_answer": "A) Çocuklar",
-                    "explanation": "'Kim?' sorusunun cevabı olan 'Çocuklar' sözcüğü öznedir."
-                }
-            ],
-            "Fen Bilimleri": [
-                {
-                    "id": "fen_001",
-                    "topic": "DNA ve Genetik Kod",
-                    "text": "DNA'nın açılımı nedir?",
-                    "options": ["A) Deoksiribonükleik Asit", "B) Ribonükleik Asit", "C) Amino Asit", "D) Yağ Asidi"],
-                    "correct_answer": "A) Deoksiribonükleik Asit",
-                    "explanation": "DNA, Deoksiribonükleik Asitin kısaltmasıdır ve kalıtsal bilgileri taşır."
-                }
-            ],
-            "T.C. İnkılap Tarihi": [
-                {
-                    "id": "ink_001",
-                    "topic": "Bir Kahraman Doğuyor",
-                    "text": "Mustafa Kemal Atatürk hangi yılda doğmuştur?",
-                    "options": ["A) 1880", "B) 1881", "C) 1882", "D) 1883"],
-                    "correct_answer": "B) 1881",
-                    "explanation": "Mustafa Kemal Atatürk 1881 yılında Selanik'te doğmuştur."
-                }
-            ]
-        }
-    
     def get_topics(self, subject: str) -> List[str]:
         """Get topics for a given subject"""
         return self.meb_curriculum.get(subject, [])
     
-    def get_lesson_content(self, subject: str, topic: str) -> str:
-        """Get lesson content for a topic"""
-        
+    def _load_lesson_content(self) -> Dict[str, Dict[str, str]]:
+        """Load lesson content per subject and topic"""
         # Sample lesson content - in real app this would come from comprehensive database
-        lesson_templates = {
+        return {
             "Matematik": {
                 "Çarpanlar ve Katlar": """
                 ## 🔢 Çarpanlar ve Katlar
@@ -219,52 +163,51 @@ class Curriculum:
                 """
             }
         }
-        
-        subject_content = lesson_templates.get(subject, {})
+    
+    def get_lesson_content(self, subject: str, topic: str) -> str:
+        """Get lesson content for a topic"""
+        subject_content = self.lesson_content.get(subject, {})
         return subject_content.get(topic, f"**{topic}** konusu için içerik hazırlanıyor... 📚")
     
-    def get_question(self, subject: str, topic: str) -> Dict[str, Any]:
+    def search(self, query: str, limit: int = 10, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Lessons and questions matching the query, best first, with highlighted snippets"""
+        return self.search_index.search(query, limit, kind)
+    
+    def suggest_topics(self, prefix: str, limit: int = 8) -> List[Dict[str, str]]:
+        """Topic names completing what the user typed"""
+        return self.search_index.suggest_topics(prefix, limit)
+    
+    def get_question(self, subject: str, topic: str) -> Question:
         """Get a random question for the given subject and topic"""
-        subject_questions = self.question_bank.get(subject, [])
-        
-        # Filter questions by topic if available
-        topic_questions = [q for q in subject_questions if q.get('topic') == topic]
-        
-        if not topic_questions:
-            # If no specific topic questions, get any from subject
-            topic_questions = subject_questions
-        
-        if topic_questions:
-            return random.choice(topic_questions)
+        # If no specific topic questions, get any from subject
+        question = self.question_bank.choice(subject, topic) or self.question_bank.choice(subject)
+        if question is not None:
+            return question
         
         # Fallback question if no questions available
-        return {
-            "id": f"fallback_{subject}_{topic}",
-            "topic": topic,
-            "text": f"{topic} konusundan bir soru hazırlanıyor...",
-            "options": ["A) Seçenek 1", "B) Seçenek 2", "C) Seçenek 3", "D) Seçenek 4"],
-            "correct_answer": "A) Seçenek 1",
-            "explanation": "Bu bir örnek sorudur."
-        }
+        return Question(
+            f"fallback_{subject}_{topic}", subject, topic,
+            f"{topic} konusundan bir soru hazırlanıyor...",
+            ["A) Seçenek 1", "B) Seçenek 2", "C) Seçenek 3", "D) Seçenek 4"],
+            "A) Seçenek 1",
+            "Bu bir örnek sorudur."
+        )
+    
+    def get_question_by_id(self, question_id: str) -> Optional[Question]:
+        return self.question_bank.get(question_id)
+    
+    def get_questions_by_difficulty(self, subject: str, difficulty: int, count: int) -> List[Question]:
+        """Up to ``count`` random questions of a subject at one difficulty level"""
+        return self.question_bank.sample(subject, count, difficulty=difficulty)
     
     def check_answer(self, question_id: str, user_answer: str) -> bool:
         """Check if user's answer is correct"""
-        # Find the question by ID
-        for subject_questions in self.question_bank.values():
-            for question in subject_questions:
-                if question['id'] == question_id:
-                    return question['correct_answer'] == user_answer
-        
-        return False
+        question = self.question_bank.get(question_id)
+        return question is not None and question.correct_answer == user_answer
     
-    def get_lgs_practice_questions(self, subject: str, count: int = 5) -> List[Dict[str, Any]]:
+    def get_lgs_practice_questions(self, subject: str, count: int = 5) -> List[Question]:
         """Get LGS-style practice questions"""
-        subject_questions = self.question_bank.get(subject, [])
-        
-        if len(subject_questions) >= count:
-            return random.sample(subject_questions, count)
-        else:
-            return subject_questions
+        return self.question_bank.sample(subject, count)
     
     def get_weak_topics(self, username: str, subject: str) -> List[str]:
         """Get topics where student makes most mistakes"""
@@ -1,309 +1,1276 @@
 import sqlite3
 import json
 import datetime
-from typing import Dict, List, Any
+import queue
+import threading
+import atexit
+import itertools
+import operator
+import re
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Any, Iterator, Optional, Set
+
+import adaptive
+import migrations
+from cache import TTLCache, bump_version, bump_version_later, get_shared_cache, namespace_versions, publish_bumps
+from config import config
+from spaced_repetition import AGAIN, FSRS, batch_due_dates, fit_weights, grade_from_answer, replay_states
+from storage import StorageBackend, SQLiteFileBackend, backend_from_url
+from write_behind import get_writer, close_all_writers
+
+_MONTH_PATTERN = re.compile(r"\d{4}-\d{2}")
+
+
+class ConnectionPool:
+    """Thread-aware pool of long-lived SQLite connections.
+
+    A thread keeps the connection it checked out until its outermost
+    ``connection()``/``transaction()`` block exits, so nested calls share
+    one connection and one commit.
+    """
+
+    def __init__(self, backend: StorageBackend, max_size: Optional[int] = None, timeout: float = 30.0):
+        self.backend = backend
+        self.key = backend.key
+        self.max_size = max_size or backend.max_connections
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all: set = set()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and tune a new connection"""
+        conn = self.backend.connect()
+        self.backend.configure(conn)
+        with self._lock:
+            self._all.add(conn)
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No database connection available after {self.timeout}s")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                return self._connect()
+            except Exception:
+                self._slots.release()
+                raise
+
+    def _release(self, conn: sqlite3.Connection):
+        with self._lock:
+            owned = conn in self._all
+        if owned:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Check out a connection for the current thread (re-entrant)"""
+        local = self._local
+        if getattr(local, "conn", None) is not None:
+            local.depth += 1
+            try:
+                yield local.conn
+            finally:
+                local.depth -= 1
+            return
+
+        local.conn = self._acquire()
+        local.depth = 1
+        local.tx_depth = 0
+        try:
+            yield local.conn
+        finally:
+            conn = local.conn
+            local.conn = None
+            local.depth = 0
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        """Run a block in a single transaction; nested blocks join the outer one"""
+        with self.connection() as conn:
+            local = self._local
+            if local.tx_depth > 0:
+                local.tx_depth += 1
+                try:
+                    yield conn
+                finally:
+                    local.tx_depth -= 1
+                return
+
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            local.tx_depth = 1
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+            finally:
+                local.tx_depth = 0
+
+    def in_transaction(self) -> bool:
+        """Whether the current thread is inside a transaction() block"""
+        return getattr(self._local, "conn", None) is not None and self._local.tx_depth > 0
+
+    def close(self):
+        """Close every connection owned by the pool"""
+        with self._lock:
+            connections, self._all = self._all, set()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._idle = queue.LifoQueue()
+
+
+def _utc_timestamp() -> str:
+    """Current time in the same format as SQLite's CURRENT_TIMESTAMP"""
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class LookupCache:
+    """Process-wide name -> id maps for users, subjects and topics of one database
+    
+    A name keeps its id for the life of the row, so entries never expire;
+    Database.rename_user drops the entry it changes.
+    """
+    
+    def __init__(self):
+        self.users: Dict[str, int] = {}
+        self.subjects: Dict[str, int] = {}
+        self.topics: Dict[tuple, int] = {}
+
+
+class UserCache:
+    """Process-wide cache of derived per-user values (stats, streaks) for one database
+    
+    Each user has a data version that every write touching the user bumps.
+    Entries are keyed by the version they were computed from (and tagged with
+    the username) in a bounded cache.TTLCache, so they are invalidated exactly
+    when the user's data changes. The bumps are also published, deferred and
+    coalesced, as shared cache namespaces (see ``namespaces``). Entries are
+    keyed by those too, so writes made by other worker processes (or
+    db_maintenance.py) retire them within a second or so.
+    """
+    
+    def __init__(self, scope: str = "", max_entries: int = 4096):
+        self._lock = threading.Lock()
+        self._generation = 0  # Bumped by clear()
+        self._versions: Dict[str, int] = {}
+        self.scope = scope
+        self.entries = TTLCache("user_cache", max_entries=max_entries)
+    
+    def version(self, username: str) -> tuple:
+        return self._generation, self._versions.get(username, 0)
+    
+    def namespaces(self, username: str) -> tuple:
+        """Shared cache namespaces whose versions change with the user's data"""
+        return f"{self.scope}|users", f"{self.scope}|user:{username}"
+    
+    def bump(self, username: str):
+        """Invalidate everything cached for a user"""
+        with self._lock:
+            self._versions[username] = self._versions.get(username, 0) + 1
+        self.entries.invalidate_tag(username)
+        bump_version_later(self.namespaces(username)[1])
+    
+    def clear(self):
+        """Invalidate every user (bulk rewrites such as rebuilding the rollups)"""
+        with self._lock:
+            self._generation += 1
+        self.entries.clear()
+        bump_version(f"{self.scope}|users")
+    
+    def get(self, username: str, key, compute: Callable[[], Any], store: bool = True) -> Any:
+        """Cached value of ``key`` for the user's current data version, computing it on a miss"""
+        if not store:
+            return compute()
+        # A write during compute() bumps the version, so a stale result is stored
+        # under a key that is never read again (and soon evicted)
+        version = self.version(username) + namespace_versions(self.namespaces(username))
+        return self.entries.get_or_set((username, key, version), compute, tags=(username,))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        return self.entries.stats()
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_lookups: Dict[str, LookupCache] = {}
+_user_caches: Dict[str, UserCache] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(backend: StorageBackend) -> ConnectionPool:
+    """Return the process-wide pool for a storage backend"""
+    with _pools_lock:
+        pool = _pools.get(backend.key)
+        if pool is None:
+            pool = _pools[backend.key] = ConnectionPool(backend)
+        return pool
+
+
+@atexit.register
+def close_all_pools():
+    """Close all pooled connections (runs on interpreter shutdown)"""
+    # Queued events are committed before their connections go away
+    close_all_writers()
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
 
 class Database:
-    def __init__(self, db_path="alex_lgs.db"):
-        self.db_path = db_path
+    def __init__(self, db_path: Optional[str] = None, write_behind: bool = False,
+                 database_url: Optional[str] = None):
+        # An explicit file path wins; otherwise the backend comes from DATABASE_URL
+        if db_path is not None:
+            self.backend = SQLiteFileBackend(db_path)
+        else:
+            self.backend = backend_from_url(database_url or config.DATABASE_URL)
+        self.db_path = db_path or self.backend.key
+        self.pool = get_pool(self.backend)
+        with _pools_lock:
+            self.lookups = _lookups.setdefault(self.pool.key, LookupCache())
+            self.user_cache = _user_caches.setdefault(self.pool.key, UserCache(self.pool.key))
         self.init_database()
+        # Event logging (attempts, mistakes, study time) can be committed by a background writer
+        self.writer = get_writer(self.pool) if write_behind else None
     
-    def init_database(self):
-        """Initialize database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                total_points INTEGER DEFAULT 0,
-                level INTEGER DEFAULT 1,
-                streak INTEGER DEFAULT 0
-            )
-        ''')
-        
-        # Study sessions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS study_sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL,
-                subject TEXT NOT NULL,
-                topic TEXT,
-                duration_minutes INTEGER NOT NULL,
-                session_date DATE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (username) REFERENCES users (username)
-            )
-        ''')
-        
-        # Questions and answers table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS question_attempts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL,
-                subject TEXT NOT NULL,
-                topic TEXT NOT NULL,
-                question_id TEXT NOT NULL,
-                user_answer TEXT,
-                correct_answer TEXT,
-                is_correct BOOLEAN NOT NULL,
-                attempt_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (username) REFERENCES users (username)
-            )
-        ''')
-        
-        # Mistakes tracking table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS mistakes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL,
-                subject TEXT NOT NULL,
-                topic TEXT NOT NULL,
-                question_id TEXT NOT NULL,
-                mistake_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                reviewed BOOLEAN DEFAULT FALSE,
-                FOREIGN KEY (username) REFERENCES users (username)
-            )
-        ''')
-        
-        # Spaced repetition table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS spaced_repetition (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL,
-                subject TEXT NOT NULL,
-                topic TEXT NOT NULL,
-                next_review_date DATE NOT NULL,
-                review_count INTEGER DEFAULT 0,
-                difficulty_level INTEGER DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (username) REFERENCES users (username)
-            )
-        ''')
-        
-        # Achievements table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS achievements (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL,
-                achievement_name TEXT NOT NULL,
-                achievement_description TEXT,
-                points_awarded INTEGER DEFAULT 0,
-                achieved_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (username) REFERENCES users (username)
-            )
-        ''')
-        
-        # Daily goals table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS daily_goals (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL,
-                goal_date DATE NOT NULL,
-                subject TEXT NOT NULL,
-                target_minutes INTEGER NOT NULL,
-                completed_minutes INTEGER DEFAULT 0,
-                completed BOOLEAN DEFAULT FALSE,
-                FOREIGN KEY (username) REFERENCES users (username)
-            )
-        ''')
-        
-        # Future lessons progress
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS future_lessons (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL,
-                lesson_title TEXT NOT NULL,
-                lesson_type TEXT NOT NULL,
-                completion_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (username) REFERENCES users (username)
-            )
-        ''')
+    def connection(self):
+        """Context manager yielding a pooled connection (no implicit transaction)"""
+        return self.pool.connection()
+    
+    def transaction(self, immediate: bool = False):
+        """Context manager grouping several calls into one connection and one commit
+        
+        Example:
+            with db.transaction():
+                db.log_question_attempt(...)
+                db.update_user_points(...)
+        """
+        return self.pool.transaction(immediate=immediate)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until queued write-behind events are committed (read-your-writes)"""
+        if self.writer is None:
+            return True
+        return self.writer.flush(timeout)
+    
+    def cached(self, username: str, key, compute: Callable[[], Any]) -> Any:
+        """Per-user cached value, recomputed only after a write for that user
         
-        conn.commit()
-        conn.close()
+        ``key`` must capture every other input of ``compute`` (e.g. today's
+        date for values that depend on it).
+        """
+        # Inside a transaction the value could include writes that are rolled back
+        return self.user_cache.get(username, key, compute, store=not self.pool.in_transaction())
+    
+    def cached_shared(self, username: str, key, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Like ``cached`` but through the shared cache tier, so one worker
+        process on the host computes the value and the others reuse it
+        (weekly reports and other expensive per-user artifacts)
+        """
+        if self.pool.in_transaction():
+            return compute()
+        # The key only holds the shared versions: this process's own writes must be published first
+        publish_bumps(self.user_cache.namespaces(username))
+        return get_shared_cache("user_artifacts").get_or_set(
+            (self.pool.key, username, key), compute, ttl=ttl, tags=(username,),
+            versions=self.user_cache.namespaces(username)
+        )
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the per-user cache"""
+        return self.user_cache.stats()
+    
+    def _write_event(self, sql: str, params: tuple):
+        """Insert an event row, through the write-behind queue when enabled"""
+        if self.writer is not None and not self.pool.in_transaction():
+            self.writer.submit((sql, params))
+            return
+        with self.transaction() as conn:
+            conn.execute(sql, params)
+    
+    def init_database(self):
+        """Bring the schema up to date (runs the migrations once per process)"""
+        migrations.ensure_schema(self.pool)
+    
+    def _lookup(self, cache: Dict, key, select_sql: str, insert_sql: Optional[str], params: tuple) -> Optional[int]:
+        """Resolve a name to its id through the process-wide cache, optionally creating the row"""
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        with self.transaction() as conn:
+            if insert_sql:
+                conn.execute(insert_sql, params)
+            row = conn.execute(select_sql, params).fetchone()
+        if row is None:
+            return None
+        # Inside an outer transaction the new row could still be rolled back
+        if not self.pool.in_transaction():
+            cache[key] = row[0]
+        return row[0]
+    
+    def user_id(self, username: str, create: bool = True) -> Optional[int]:
+        """Integer id for a username (None for unknown users when create is False)"""
+        return self._lookup(
+            self.lookups.users, username,
+            'SELECT id FROM users WHERE username = ?',
+            'INSERT OR IGNORE INTO users (username) VALUES (?)' if create else None,
+            (username,)
+        )
+    
+    def subject_id(self, subject: str, create: bool = True) -> Optional[int]:
+        """Integer id for a subject name, added to the lookup table on first use
+        (None for unknown subjects when create is False)"""
+        return self._lookup(
+            self.lookups.subjects, subject,
+            'SELECT id FROM subjects WHERE name = ?',
+            'INSERT OR IGNORE INTO subjects (name) VALUES (?)' if create else None,
+            (subject,)
+        )
+    
+    def topic_id(self, subject: str, topic: Optional[str], create: bool = True) -> Optional[int]:
+        """Integer id for a topic within a subject (None when there is no topic,
+        or for unknown ones when create is False)"""
+        if topic is None:
+            return None
+        subject_id = self.subject_id(subject, create)
+        if subject_id is None:
+            return None
+        return self._lookup(
+            self.lookups.topics, (subject_id, topic),
+            'SELECT id FROM topics WHERE subject_id = ? AND name = ?',
+            'INSERT OR IGNORE INTO topics (subject_id, name) VALUES (?, ?)' if create else None,
+            (subject_id, topic)
+        )
+    
+    def rename_user(self, username: str, new_username: str) -> bool:
+        """Rename a user; rows elsewhere reference the id, so only users changes"""
+        with self.transaction(immediate=True) as conn:
+            renamed = conn.execute(
+                'UPDATE users SET username = ? WHERE username = ?', (new_username, username)
+            ).rowcount
+        self.lookups.users.pop(username, None)
+        self.user_cache.bump(username)
+        self.user_cache.bump(new_username)
+        return bool(renamed)
     
     def create_user_session(self, username: str):
         """Create or update user session"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR IGNORE INTO users (username) VALUES (?)
-        ''', (username,))
-        
-        conn.commit()
-        conn.close()
+        self.user_id(username)
     
     def log_study_time(self, username: str, subject: str, duration: int, topic: str = None):
         """Log study session"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         today = datetime.date.today()
         
-        cursor.execute('''
-            INSERT INTO study_sessions (username, subject, topic, duration_minutes, session_date)
+        self._write_event('''
+            INSERT INTO study_sessions (user_id, subject_id, topic_id, duration_minutes, session_date)
             VALUES (?, ?, ?, ?, ?)
-        ''', (username, subject, topic, duration, today))
-        
-        conn.commit()
-        conn.close()
+        ''', (self.user_id(username), self.subject_id(subject), self.topic_id(subject, topic),
+              duration, today.isoformat()))
+        self.user_cache.bump(username)
     
-    def log_question_attempt(self, username: str, subject: str, topic: str, 
+    def log_question_attempt(self, username: str, subject: str, topic: str,
                            question_id: str, user_answer: str, correct_answer: str, is_correct: bool):
         """Log question attempt"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO question_attempts 
-            (username, subject, topic, question_id, user_answer, correct_answer, is_correct)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (username, subject, topic, question_id, user_answer, correct_answer, is_correct))
-        
-        conn.commit()
-        conn.close()
+        # Timestamp taken now, not when a batched write reaches the disk
+        self._write_event('''
+            INSERT INTO question_attempts
+            (user_id, subject_id, topic_id, question_id, user_answer, correct_answer, is_correct, attempt_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (self.user_id(username), self.subject_id(subject), self.topic_id(subject, topic),
+              question_id, user_answer, correct_answer, is_correct, _utc_timestamp()))
+        self.user_cache.bump(username)
     
     def log_mistake(self, username: str, subject: str, topic: str, question_id: str):
         """Log a mistake for spaced repetition"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self._write_event('''
+            INSERT INTO mistakes (user_id, subject_id, topic_id, question_id, mistake_date)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (self.user_id(username), self.subject_id(subject), self.topic_id(subject, topic),
+              question_id, _utc_timestamp()))
+        self.user_cache.bump(username)
+    
+    def add_to_spaced_repetition(self, username: str, subject: str, topic: str):
+        """Queue a topic for review tomorrow (or keep an earlier due date if it is already queued)"""
+        next_review = datetime.date.today() + datetime.timedelta(days=1)
         
-        cursor.execute('''
-            INSERT INTO mistakes (username, subject, topic, question_id)
-            VALUES (?, ?, ?, ?)
-        ''', (username, subject, topic, question_id))
+        with self.transaction() as conn:
+            conn.execute('''
+                INSERT INTO spaced_repetition (user_id, subject_id, topic_id, next_review_date)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (user_id, topic_id)
+                DO UPDATE SET next_review_date = MIN(next_review_date, excluded.next_review_date)
+            ''', (self.user_id(username), self.subject_id(subject), self.topic_id(subject, topic),
+                  next_review.isoformat()))
+        self.user_cache.bump(username)
+    
+    def get_due_reviews(self, username: str, limit: int = 20,
+                        as_of: Optional[datetime.date] = None) -> List[Dict[str, Any]]:
+        """Topics due for review by ``as_of`` (default today), most overdue first
+        
+        One range scan of idx_spaced_repetition_user_review; the index is already
+        in (next_review_date, id) order, so there is no sort.
+        """
+        as_of = as_of or datetime.date.today()
+        
+        with self.connection() as conn:
+            rows = conn.execute('''
+                SELECT s.name, t.name, r.next_review_date, r.review_count, r.difficulty_level
+                FROM spaced_repetition r
+                JOIN topics t ON t.id = r.topic_id
+                JOIN subjects s ON s.id = r.subject_id
+                WHERE r.user_id = ? AND r.next_review_date <= ?
+                ORDER BY r.next_review_date, r.id
+                LIMIT ?
+            ''', (self.user_id(username, create=False), as_of.isoformat(), limit)).fetchall()
         
-        conn.commit()
-        conn.close()
+        return [
+            {
+                'subject': subject,
+                'topic': topic,
+                'due_date': due_date,
+                'review_count': review_count,
+                'difficulty_level': difficulty_level
+            }
+            for subject, topic, due_date, review_count, difficulty_level in rows
+        ]
     
-    def add_to_spaced_repetition(self, username: str, subject: str, topic: str):
-        """Add topic to spaced repetition schedule"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _review_scheduler(self, conn, user_id: Optional[int]) -> FSRS:
+        """FSRS scheduler with the user's fitted parameters (defaults until fitted)"""
+        row = conn.execute(
+            'SELECT weights, desired_retention FROM srs_parameters WHERE user_id = ?', (user_id,)
+        ).fetchone()
+        if row is None:
+            return FSRS()
+        return FSRS(json.loads(row[0]), row[1])
+    
+    def record_review(self, username: str, subject: str, topic: str, is_correct: bool,
+                      reviewed_on: Optional[datetime.date] = None) -> Dict[str, Any]:
+        """Update a topic's FSRS card from one answer and reschedule it (creating the card if needed)"""
+        today = reviewed_on or datetime.date.today()
+        grade = grade_from_answer(is_correct)
+        user_id = self.user_id(username)
+        subject_id, topic_id = self.subject_id(subject), self.topic_id(subject, topic)
         
-        # Calculate next review date (start with 1 day)
-        next_review = datetime.date.today() + datetime.timedelta(days=1)
+        with self.transaction(immediate=True) as conn:
+            card = conn.execute('''
+                SELECT stability, difficulty, last_review_date FROM spaced_repetition
+                WHERE user_id = ? AND topic_id = ?
+            ''', (user_id, topic_id)).fetchone()
+            stability, difficulty, last_review = card or (None, None, None)
+            state = self._review_scheduler(conn, user_id).review(
+                stability, difficulty,
+                datetime.date.fromisoformat(last_review) if last_review else None,
+                grade, today
+            )
+            review_count = conn.execute('''
+                INSERT INTO spaced_repetition
+                (user_id, subject_id, topic_id, next_review_date, review_count,
+                 stability, difficulty, interval_days, last_review_date, lapses)
+                VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?, ?)
+                ON CONFLICT (user_id, topic_id) DO UPDATE SET
+                    next_review_date = excluded.next_review_date,
+                    review_count = review_count + 1,
+                    stability = excluded.stability,
+                    difficulty = excluded.difficulty,
+                    interval_days = excluded.interval_days,
+                    last_review_date = excluded.last_review_date,
+                    lapses = lapses + excluded.lapses
+                RETURNING review_count
+            ''', (user_id, subject_id, topic_id, state.due_date.isoformat(), state.stability,
+                  state.difficulty, state.interval_days, today.isoformat(), 1 if grade == AGAIN else 0)).fetchone()[0]
+        self.user_cache.bump(username)
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO spaced_repetition 
-            (username, subject, topic, next_review_date)
-            VALUES (?, ?, ?, ?)
-        ''', (username, subject, topic, next_review))
+        return {
+            'review_count': review_count,
+            'due_date': state.due_date.isoformat(),
+            'interval_days': state.interval_days,
+            'stability': round(state.stability, 2),
+            'difficulty': round(state.difficulty, 2)
+        }
+    
+    def get_review_histories(self, username: str) -> Dict[int, List[tuple]]:
+        """Per-topic review histories, oldest first, from question_attempts_history
+        
+        The first attempt of each day counts as that day's review. Returns
+        {topic_id: [(review date, days since previous review, grade), ...]}.
+        """
+        self.flush()
         
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            rows = conn.execute('''
+                SELECT topic_id, attempt_day, is_correct FROM (
+                    SELECT topic_id, attempt_day, is_correct,
+                           ROW_NUMBER() OVER (PARTITION BY topic_id, attempt_day ORDER BY attempt_date, id) AS nth
+                    FROM question_attempts_history
+                    WHERE user_id = ?
+                )
+                WHERE nth = 1
+                ORDER BY topic_id, attempt_day
+            ''', (self.user_id(username, create=False),)).fetchall()
+        
+        histories: Dict[int, List[tuple]] = {}
+        for topic_id, attempt_day, is_correct in rows:
+            day = datetime.date.fromisoformat(attempt_day)
+            history = histories.setdefault(topic_id, [])
+            elapsed = (day - history[-1][0]).days if history else 0
+            history.append((day, elapsed, grade_from_answer(is_correct)))
+        return histories
     
-    def get_study_stats(self, username: str, period: str = "week") -> Dict[str, Any]:
-        """Get study statistics for a user"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def reschedule_reviews(self, username: str) -> int:
+        """Recompute every reviewed card of a user under the current parameters
         
-        # Calculate date range
-        today = datetime.date.today()
-        if period == "week":
-            start_date = today - datetime.timedelta(days=7)
-        elif period == "month":
-            start_date = today - datetime.timedelta(days=30)
-        else:
-            start_date = datetime.date(2025, 1, 1)  # All time
+        Card state is replayed from the review history and due dates are
+        computed for all cards in one vectorised pass. Returns the cards updated.
+        """
+        histories = self.get_review_histories(username)
+        user_id = self.user_id(username, create=False)
         
-        # Total study time
-        cursor.execute('''
-            SELECT SUM(duration_minutes) FROM study_sessions 
-            WHERE username = ? AND session_date >= ?
-        ''', (username, start_date))
+        with self.transaction(immediate=True) as conn:
+            scheduler = self._review_scheduler(conn, user_id)
+            topic_ids = [row[0] for row in conn.execute(
+                'SELECT topic_id FROM spaced_repetition WHERE user_id = ?', (user_id,)
+            ) if row[0] in histories]
+            if not topic_ids:
+                return 0
+            
+            stability, difficulty = replay_states(
+                [[(elapsed, grade) for _, elapsed, grade in histories[t]] for t in topic_ids], scheduler.w
+            )
+            last_review = [histories[t][-1][0] for t in topic_ids]
+            intervals, due = batch_due_dates(
+                stability, [day.toordinal() for day in last_review],
+                scheduler.desired_retention, scheduler.max_interval
+            )
+            conn.executemany('''
+                UPDATE spaced_repetition
+                SET stability = ?, difficulty = ?, interval_days = ?, last_review_date = ?, next_review_date = ?
+                WHERE user_id = ? AND topic_id = ?
+            ''', [
+                (float(s), float(d), int(i), day.isoformat(), datetime.date.fromordinal(int(o)).isoformat(),
+                 user_id, topic_id)
+                for s, d, i, day, o, topic_id in zip(stability, difficulty, intervals, last_review, due, topic_ids)
+            ])
+        self.user_cache.bump(username)
         
-        total_minutes = cursor.fetchone()[0] or 0
+        return len(topic_ids)
+    
+    def fit_review_parameters(self, username: str, min_reviews: int = 50) -> Optional[Dict[str, Any]]:
+        """Fit the user's FSRS weights to their answer history and reschedule their cards
         
-        # Subject breakdown
-        cursor.execute('''
-            SELECT subject, SUM(duration_minutes) FROM study_sessions 
-            WHERE username = ? AND session_date >= ?
-            GROUP BY subject
-        ''', (username, start_date))
+        Returns None when the user has fewer than ``min_reviews`` daily reviews.
+        """
+        histories = self.get_review_histories(username)
+        reviews = sum(len(history) for history in histories.values())
+        if reviews < min_reviews:
+            return None
         
-        subject_breakdown = dict(cursor.fetchall())
+        weights, loss_before, loss_after = fit_weights(
+            [[(elapsed, grade) for _, elapsed, grade in history] for history in histories.values()]
+        )
+        with self.transaction(immediate=True) as conn:
+            conn.execute('''
+                INSERT INTO srs_parameters (user_id, weights, log_loss, review_count, fitted_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (user_id) DO UPDATE SET
+                    weights = excluded.weights,
+                    log_loss = excluded.log_loss,
+                    review_count = excluded.review_count,
+                    fitted_at = excluded.fitted_at
+            ''', (self.user_id(username), json.dumps(weights), loss_after, reviews, _utc_timestamp()))
+        self.user_cache.bump(username)
         
-        # Question accuracy
-        cursor.execute('''
-            SELECT COUNT(*), SUM(CASE WHEN is_correct THEN 1 ELSE 0 END) 
-            FROM question_attempts 
-            WHERE username = ? AND DATE(attempt_date) >= ?
-        ''', (username, start_date))
+        return {
+            'reviews': reviews,
+            'log_loss_before': round(loss_before, 4),
+            'log_loss_after': round(loss_after, 4),
+            'rescheduled': self.reschedule_reviews(username)
+        }
+    
+    def get_ability(self, username: str, subject: str) -> Dict[str, Any]:
+        """A user's item response ability in a subject (0 = average) and the answers it rests on"""
+        def compute():
+            user_id, subject_id = self.user_id(username, create=False), self.subject_id(subject, create=False)
+            row = None
+            if user_id is not None and subject_id is not None:
+                with self.connection() as conn:
+                    row = conn.execute(
+                        'SELECT ability, attempts FROM user_ability WHERE user_id = ? AND subject_id = ?',
+                        (user_id, subject_id)
+                    ).fetchone()
+            ability, attempts = row or (0.0, 0)
+            return {'ability': ability, 'attempts': attempts}
         
-        total_questions, correct_answers = cursor.fetchone()
-        accuracy = (correct_answers / total_questions * 100) if total_questions > 0 else 0
+        return self.cached(username, ("ability", subject), compute)
+    
+    def get_seen_questions(self, username: str, subject: str) -> frozenset:
+        """Ids of the questions of a subject the user has answered
+        
+        This reads the user's whole subject history; AdaptiveSelector reads it
+        once per student and then adds each answer it records.
+        """
+        user_id, subject_id = self.user_id(username, create=False), self.subject_id(subject, create=False)
+        if user_id is None or subject_id is None:
+            return frozenset()
+        self.flush()
+        with self.connection() as conn:
+            rows = conn.execute('''
+                SELECT DISTINCT question_id FROM question_attempts_history
+                WHERE user_id = ? AND subject_id = ?
+            ''', (user_id, subject_id)).fetchall()
+        return frozenset(row[0] for row in rows)
+    
+    def get_recent_questions(self, usernames: List[str], days: int) -> Dict[str, Dict[str, str]]:
+        """{question id: last day answered} of the questions each user answered in the last ``days`` days
+        
+        One query per 500 users, answered from the (user, date, question) index alone
+        (attempt_date starts with the day, so it is compared and cut as a string).
+        """
+        self.flush()
+        since = (datetime.date.today() - datetime.timedelta(days=days)).isoformat()
+        recent: Dict[str, Dict[str, str]] = {username: {} for username in usernames}
+        user_ids = {self.user_id(username, create=False): username for username in recent}
+        user_ids.pop(None, None)
+        batch = list(user_ids)
+        
+        with self.connection() as conn:
+            for start in range(0, len(batch), 500):
+                chunk = batch[start:start + 500]
+                rows = conn.execute(f'''
+                    SELECT user_id, question_id, substr(attempt_date, 1, 10) FROM question_attempts_history
+                    WHERE user_id IN ({", ".join("?" * len(chunk))}) AND attempt_date >= ?
+                    ORDER BY user_id, attempt_date
+                ''', (*chunk, since))
+                # In date order, so a question's last answer overwrites the earlier ones
+                for user_id, answers in itertools.groupby(rows, key=operator.itemgetter(0)):
+                    recent[user_ids[user_id]] = {question_id: day for _, question_id, day in answers}
+        return recent
+    
+    def get_mock_exam(self, username: str, exam_date: datetime.date) -> Optional[Dict[str, Any]]:
+        """The mock exam stored for a user and exam day, if any"""
+        user_id = self.user_id(username, create=False)
+        if user_id is None:
+            return None
+        with self.connection() as conn:
+            row = conn.execute(
+                'SELECT exam FROM mock_exams WHERE user_id = ? AND exam_date = ?', (user_id, exam_date.isoformat())
+            ).fetchone()
+        if row is None:
+            return None
+        exam = json.loads(row[0])
+        exam['difficulty'] = {int(level): count for level, count in exam['difficulty'].items()}
+        return exam
+    
+    def save_mock_exam(self, username: str, exam_date: datetime.date, exam: Dict[str, Any]):
+        """Store the mock exam given to a user for an exam day (replacing an earlier one)"""
+        with self.transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO mock_exams (user_id, exam_date, exam, created_at) VALUES (?, ?, ?, ?)',
+                (self.user_id(username), exam_date.isoformat(), json.dumps(exam, ensure_ascii=False), _utc_timestamp())
+            )
+    
+    def get_item_parameters(self, subject: str, topic: Optional[str] = None) -> Dict[str, tuple]:
+        """{question id: (difficulty, discrimination)} of the answered questions of a subject or topic"""
+        sql = 'SELECT question_id, difficulty, discrimination FROM question_stats WHERE subject_id = ?'
+        params = (self.subject_id(subject, create=False),)
+        if topic is not None:
+            sql += ' AND topic_id = ?'
+            params += (self.topic_id(subject, topic, create=False),)
+        if None in params:
+            return {}
+        with self.connection() as conn:
+            return {question_id: (difficulty, discrimination)
+                    for question_id, difficulty, discrimination in conn.execute(sql, params)}
+    
+    def record_response(self, username: str, subject: str, topic: str, question_id: str,
+                        is_correct: bool, prior_difficulty: float = 0.0) -> Dict[str, Any]:
+        """Update the user's ability and the question's parameters from one answer
+        
+        ``prior_difficulty`` is the question's difficulty before its first answer.
+        """
+        user_id = self.user_id(username)
+        subject_id, topic_id = self.subject_id(subject), self.topic_id(subject, topic)
+        
+        with self.transaction(immediate=True) as conn:
+            ability, ability_answers = conn.execute(
+                'SELECT ability, attempts FROM user_ability WHERE user_id = ? AND subject_id = ?',
+                (user_id, subject_id)
+            ).fetchone() or (0.0, 0)
+            difficulty, discrimination, question_answers = conn.execute(
+                'SELECT difficulty, discrimination, attempts FROM question_stats WHERE question_id = ?',
+                (question_id,)
+            ).fetchone() or (prior_difficulty, 1.0, 0)
+            response = adaptive.update(ability, ability_answers, difficulty, discrimination,
+                                       question_answers, is_correct)
+            now = _utc_timestamp()
+            conn.execute('''
+                INSERT INTO user_ability (user_id, subject_id, ability, attempts, updated_at)
+                VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT (user_id, subject_id) DO UPDATE SET
+                    ability = excluded.ability,
+                    attempts = attempts + 1,
+                    updated_at = excluded.updated_at
+            ''', (user_id, subject_id, response.ability, now))
+            conn.execute('''
+                INSERT INTO question_stats
+                (question_id, subject_id, topic_id, difficulty, discrimination, attempts, correct, updated_at)
+                VALUES (?, ?, ?, ?, ?, 1, ?, ?)
+                ON CONFLICT (question_id) DO UPDATE SET
+                    difficulty = excluded.difficulty,
+                    discrimination = excluded.discrimination,
+                    attempts = attempts + 1,
+                    correct = correct + excluded.correct,
+                    updated_at = excluded.updated_at
+            ''', (question_id, subject_id, topic_id, response.difficulty, response.discrimination,
+                  1 if is_correct else 0, now))
+        self.user_cache.bump(username)
+        
+        return {
+            'ability': round(response.ability, 3),
+            'difficulty': round(response.difficulty, 3),
+            'discrimination': round(response.discrimination, 3),
+            'expected': round(response.probability, 3)
+        }
+    
+    def calibrate_questions(self, full: bool = False, chunk_size: int = 100_000) -> Dict[str, Any]:
+        """Fit Rasch difficulties and per-subject abilities to the answer history
+        
+        Attempts are streamed in chunks of ``chunk_size`` rows and folded into
+        (user and subject) × question cells, so memory grows with distinct
+        pairs rather than attempts. By default only attempts after the last
+        run's watermark are read, and every question and ability starts from
+        its stored estimate weighted by the information behind it; ``full``
+        refits the whole history from scratch.
+        """
+        self.flush()
+        
+        with self.connection() as conn:
+            watermark = 0 if full else conn.execute(
+                'SELECT COALESCE(MAX(watermark), 0) FROM calibration_runs'
+            ).fetchone()[0]
+            cells = adaptive.ResponseCells()
+            question_topics: Dict[str, tuple] = {}
+            attempts = 0
+            cursor = conn.execute('''
+                SELECT id, user_id, subject_id, topic_id, question_id, is_correct
+                FROM question_attempts_history
+                WHERE id > ?
+            ''', (watermark,))
+            for rows in iter(lambda: cursor.fetchmany(chunk_size), []):
+                attempts += len(rows)
+                watermark = max(watermark, max(row[0] for row in rows))
+                for row in rows:
+                    question_topics.setdefault(row[4], (row[2], row[3]))
+                cells.add([(row[1], row[2]) for row in rows], [row[4] for row in rows], [row[5] for row in rows])
+            
+            if not attempts:
+                return {'attempts': 0, 'questions': 0, 'abilities': 0, 'cells': 0, 'watermark': watermark}
+            
+            # Earlier estimates become the priors (a full refit ignores them)
+            stored_questions = {} if full else {
+                question_id: (difficulty, information) for question_id, difficulty, information in
+                conn.execute('SELECT question_id, difficulty, information FROM question_stats')
+            }
+            stored_abilities = {} if full else {
+                (user_id, subject_id): (ability, information) for user_id, subject_id, ability, information in
+                conn.execute('SELECT user_id, subject_id, ability, information FROM user_ability')
+            }
+        
+        difficulty_prior, difficulty_precision = self._calibration_priors(cells.items, stored_questions)
+        ability_prior, ability_precision = self._calibration_priors(cells.persons, stored_abilities)
+        fit = adaptive.fit_rasch(cells, ability_prior, ability_precision, difficulty_prior, difficulty_precision)
         
-        conn.close()
+        person_answers, question_answers, question_right = cells.totals()
+        now = _utc_timestamp()
+        
+        with self.transaction(immediate=True) as conn:
+            # attempts/correct count the answers seen online; a batch only fills them for new rows
+            conn.executemany('''
+                INSERT INTO question_stats
+                (question_id, subject_id, topic_id, difficulty, attempts, correct, information, calibrated_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (question_id) DO UPDATE SET
+                    difficulty = excluded.difficulty,
+                    information = excluded.information,
+                    calibrated_at = excluded.calibrated_at,
+                    updated_at = excluded.updated_at
+            ''', [
+                (question_id, *question_topics[question_id], float(fit.difficulty[index]),
+                 int(question_answers[index]), int(question_right[index]),
+                 float(fit.difficulty_information[index]), now, now)
+                for question_id, index in cells.items.items()
+            ])
+            conn.executemany('''
+                INSERT INTO user_ability (user_id, subject_id, ability, attempts, information, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (user_id, subject_id) DO UPDATE SET
+                    ability = excluded.ability,
+                    information = excluded.information,
+                    updated_at = excluded.updated_at
+            ''', [
+                (user_id, subject_id, float(fit.ability[index]), int(person_answers[index]),
+                 float(fit.ability_information[index]), now)
+                for (user_id, subject_id), index in cells.persons.items()
+            ])
+            conn.execute('''
+                INSERT INTO calibration_runs
+                (watermark, full_refit, attempts, questions, abilities, log_likelihood, iterations, finished_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (watermark, full, attempts, len(cells.items), len(cells.persons),
+                  fit.log_likelihood, fit.iterations, now))
+        self.user_cache.clear()
+        
+        return {
+            'attempts': attempts,
+            'questions': len(cells.items),
+            'abilities': len(cells.persons),
+            'cells': len(cells),
+            'watermark': watermark,
+            'iterations': fit.iterations,
+            'log_loss': round(-fit.log_likelihood / attempts, 4)
+        }
+    
+    @staticmethod
+    def _calibration_priors(index: Dict[Any, int], stored: Dict[Any, tuple]):
+        """Prior means and precisions in index order: stored estimates, else 0 with the default precision"""
+        means = [0.0] * len(index)
+        precisions = [adaptive.PRIOR_PRECISION] * len(index)
+        for key, position in index.items():
+            if key in stored:
+                means[position], information = stored[key]
+                precisions[position] = max(information, adaptive.PRIOR_PRECISION)
+        return means, precisions
+    
+    @staticmethod
+    def period_start(period: str) -> Optional[datetime.date]:
+        """First day included in a reporting period (None means all time)"""
+        today = datetime.date.today()
+        if period in ("week", "bu_hafta"):
+            return today - datetime.timedelta(days=7)
+        elif period in ("month", "bu_ay"):
+            return today - datetime.timedelta(days=30)
+        return None  # All time
+    
+    def _daily_stats_by_subject(self, username: str, period: str) -> List[tuple]:
+        """Rows of (subject, minutes, attempts, correct) summed from the daily rollups"""
+        start_date = self.period_start(period)
+        user_id = self.user_id(username, create=False)
+        self.flush()
+        
+        with self.connection() as conn:
+            return conn.execute('''
+                SELECT s.name, SUM(d.study_minutes), SUM(d.attempts), SUM(d.correct)
+                FROM daily_study_stats d
+                JOIN subjects s ON s.id = d.subject_id
+                WHERE d.user_id = ? AND d.stat_date >= ?
+                GROUP BY d.subject_id
+            ''', (user_id, start_date.isoformat() if start_date else '')).fetchall()
+    
+    def get_study_stats(self, username: str, period: str = "week") -> Dict[str, Any]:
+        """Get study statistics for a user"""
+        rows = self._daily_stats_by_subject(username, period)
+        
+        total_minutes = sum(row[1] for row in rows)
+        subject_breakdown = {subject: minutes for subject, minutes, _, _ in rows if minutes}
+        total_questions = sum(row[2] for row in rows)
+        correct_answers = sum(row[3] for row in rows)
+        accuracy = (correct_answers / total_questions * 100) if total_questions > 0 else 0
         
         return {
             'total_study_time': round(total_minutes / 60, 1),  # Convert to hours
             'subject_breakdown': subject_breakdown,
-            'questions_solved': total_questions or 0,
+            'questions_solved': total_questions,
             'accuracy': round(accuracy, 1),
             'total_minutes': total_minutes
         }
     
+    def get_subject_accuracy(self, username: str, period: str = "week") -> Dict[str, float]:
+        """Accuracy percentage per subject for subjects with at least one attempt"""
+        return {
+            subject: round(correct / attempts * 100, 1)
+            for subject, _, attempts, correct in self._daily_stats_by_subject(username, period)
+            if attempts
+        }
+    
+    def get_daily_study_minutes(self, username: str, days: int = 7) -> Dict[datetime.date, int]:
+        """Study minutes per day for the last ``days`` days, oldest first, zero-filled"""
+        today = datetime.date.today()
+        start_date = today - datetime.timedelta(days=days - 1)
+        user_id = self.user_id(username, create=False)
+        self.flush()
+        
+        with self.connection() as conn:
+            rows = conn.execute('''
+                SELECT stat_date, SUM(study_minutes) FROM daily_study_stats
+                WHERE user_id = ? AND stat_date >= ?
+                GROUP BY stat_date
+            ''', (user_id, start_date.isoformat())).fetchall()
+        
+        minutes_by_day = dict(rows)
+        return {
+            day: minutes_by_day.get(day.isoformat(), 0)
+            for day in (start_date + datetime.timedelta(days=i) for i in range(days))
+        }
+    
+    def rebuild_daily_stats(self) -> int:
+        """Rebuild the daily rollups from the raw event tables; returns the row count"""
+        self.flush()
+        
+        with self.transaction(immediate=True) as conn:
+            conn.execute('DELETE FROM daily_study_stats')
+            conn.execute('''
+                INSERT INTO daily_study_stats (user_id, stat_date, subject_id, study_minutes, attempts, correct)
+                SELECT user_id, stat_date, subject_id, SUM(minutes), SUM(attempts), SUM(correct)
+                FROM (
+                    SELECT user_id, session_date AS stat_date, subject_id,
+                           duration_minutes AS minutes, 0 AS attempts, 0 AS correct
+                    FROM study_sessions
+                    UNION ALL
+                    SELECT user_id, attempt_day, subject_id,
+                           0, 1, CASE WHEN is_correct THEN 1 ELSE 0 END
+                    FROM question_attempts_history
+                )
+                GROUP BY user_id, stat_date, subject_id
+            ''')
+            rows = conn.execute('SELECT COUNT(*) FROM daily_study_stats').fetchone()[0]
+        self.user_cache.clear()
+        return rows
+    
+    def log_technique_usage(self, username: str, technique: str, is_correct: Optional[bool] = None) -> Dict[str, int]:
+        """Count one use of a learning technique (optionally with the answer it led to)
+        
+        Returns the technique's updated counters. The row is a single counter
+        rather than an event, so it is upserted directly instead of through
+        the write-behind queue.
+        """
+        with self.transaction() as conn:
+            uses, correct = conn.execute('''
+                INSERT INTO technique_usage (user_id, technique, uses, correct, last_used)
+                VALUES (?, ?, 1, ?, ?)
+                ON CONFLICT (user_id, technique)
+                DO UPDATE SET uses = uses + 1, correct = correct + excluded.correct, last_used = excluded.last_used
+                RETURNING uses, correct
+            ''', (self.user_id(username), technique, 1 if is_correct else 0, _utc_timestamp())).fetchone()
+        self.user_cache.bump(username)
+        
+        return {'uses': uses, 'correct': correct}
+    
+    def get_user_data(self, username: str, recent_days: int = 30) -> Dict[str, Any]:
+        """Load everything the analytics layer needs for a user in two aggregate queries
+        
+        Returns recent per-day sessions (with accuracy), technique usage counters,
+        spaced repetition totals, the current study streak and whether today
+        already counts towards it.
+        """
+        today = datetime.date.today()
+        user_id = self.user_id(username, create=False)
+        self.flush()
+        
+        with self.transaction() as conn:
+            # One row per active day for the last year: recent sessions and the streak
+            daily_rows = conn.execute('''
+                SELECT stat_date, SUM(study_minutes), SUM(attempts), SUM(correct)
+                FROM daily_study_stats
+                WHERE user_id = ? AND stat_date >= ?
+                GROUP BY stat_date
+                ORDER BY stat_date
+            ''', (user_id, (today - datetime.timedelta(days=365)).isoformat())).fetchall()
+            
+            # Technique counters plus a single spaced repetition summary row (technique IS NULL)
+            counter_rows = conn.execute('''
+                SELECT technique, uses, correct FROM technique_usage WHERE user_id = ?
+                UNION ALL
+                SELECT NULL, COUNT(*), COALESCE(MAX(review_count), 0)
+                FROM spaced_repetition WHERE user_id = ?
+            ''', (user_id, user_id)).fetchall()
+        
+        recent_start = (today - datetime.timedelta(days=recent_days)).isoformat()
+        recent_sessions = [
+            {
+                'date': datetime.datetime.fromisoformat(stat_date),
+                'minutes': minutes,
+                'questions': attempts,
+                'accuracy': round(correct / attempts * 100, 1)
+            }
+            for stat_date, minutes, attempts, correct in daily_rows
+            if stat_date >= recent_start and attempts
+        ]
+        
+        active_days = {stat_date for stat_date, minutes, attempts, _ in daily_rows if minutes or attempts}
+        streak = 0
+        day = today if today.isoformat() in active_days else today - datetime.timedelta(days=1)
+        while day.isoformat() in active_days:
+            streak += 1
+            day -= datetime.timedelta(days=1)
+        
+        technique_usage = {}
+        spaced_repetition = {'active_items': 0, 'max_review_count': 0}
+        for technique, uses, correct in counter_rows:
+            if technique is None:
+                spaced_repetition = {'active_items': uses, 'max_review_count': correct}
+            else:
+                technique_usage[technique] = {'uses': uses, 'correct': correct}
+        
+        return {
+            'recent_sessions': recent_sessions,
+            'technique_usage': technique_usage,
+            'spaced_repetition': spaced_repetition,
+            'study_streak': streak,
+            'studied_today': today.isoformat() in active_days
+        }
+    
+    def get_user_progress(self, username: str) -> Dict[str, Any]:
+        """Achievement counters keyed by Gamification requirement names"""
+        user_data = self.get_user_data(username)
+        techniques = user_data['technique_usage']
+        active_recall = techniques.get('active_recall', {'uses': 0, 'correct': 0})
+        
+        # match_day_goals has no data source yet, so it is left out rather than reported as 0
+        return {
+            'memory_palace_usage': techniques.get('memory_palace', {}).get('uses', 0),
+            'mind_maps_created': techniques.get('mind_map', {}).get('uses', 0),
+            'active_recall_accuracy': round(active_recall['correct'] / active_recall['uses'] * 100, 1)
+            if active_recall['uses'] else 0,
+            'spaced_repetition_streak': user_data['spaced_repetition']['max_review_count'],
+            'study_streak': user_data['study_streak']
+        }
+    
+    def get_achievement_names(self, username: str) -> Set[str]:
+        """Names of the achievements a user has earned"""
+        user_id = self.user_id(username, create=False)
+        if user_id is None:
+            return set()
+        with self.connection() as conn:
+            rows = conn.execute('SELECT achievement_name FROM achievements WHERE user_id = ?', (user_id,)).fetchall()
+        
+        return {name for name, in rows}
+    
+    def award_achievement(self, username: str, name: str, description: str, points: int) -> bool:
+        """Record an achievement and its reward points once; False if the user already has it"""
+        user_id = self.user_id(username)
+        with self.transaction(immediate=True) as conn:
+            inserted = conn.execute('''
+                INSERT INTO achievements (user_id, achievement_name, achievement_description, points_awarded)
+                SELECT ?, ?, ?, ?
+                WHERE NOT EXISTS (SELECT 1 FROM achievements WHERE user_id = ? AND achievement_name = ?)
+            ''', (user_id, name, description, points, user_id, name)).rowcount
+            if inserted:
+                self.award(username, points, f"achievement:{name}")
+        self.user_cache.bump(username)
+        
+        return bool(inserted)
+    
     def get_user_points(self, username: str) -> int:
         """Get user's total points"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            result = conn.execute('SELECT total_points FROM users WHERE username = ?', (username,)).fetchone()
         
-        cursor.execute('SELECT total_points FROM users WHERE username = ?', (username,))
-        result = cursor.fetchone()
-        
-        conn.close()
         return result[0] if result else 0
     
+    def award(self, username: str, points: int, reason: str) -> int:
+        """Add (or with a negative value, remove) points atomically; returns the new balance"""
+        user_id = self.user_id(username)
+        with self.transaction(immediate=True) as conn:
+            balance = conn.execute('''
+                UPDATE users SET total_points = total_points + ? WHERE id = ?
+                RETURNING total_points
+            ''', (points, user_id)).fetchone()[0]
+            conn.execute('''
+                INSERT INTO points_ledger (user_id, points, reason, balance_after)
+                VALUES (?, ?, ?, ?)
+            ''', (user_id, points, reason, balance))
+        self.user_cache.bump(username)
+        
+        return balance
+    
+    def spend(self, username: str, points: int, reason: str) -> Optional[int]:
+        """Deduct points only if the balance covers them; returns the new balance or None"""
+        user_id = self.user_id(username, create=False)
+        with self.transaction(immediate=True) as conn:
+            row = conn.execute('''
+                UPDATE users SET total_points = total_points - ?
+                WHERE id = ? AND total_points >= ?
+                RETURNING total_points
+            ''', (points, user_id, points)).fetchone()
+            if row is None:
+                return None
+            conn.execute('''
+                INSERT INTO points_ledger (user_id, points, reason, balance_after)
+                VALUES (?, ?, ?, ?)
+            ''', (user_id, -points, reason, row[0]))
+        self.user_cache.bump(username)
+        
+        return row[0]
+    
     def update_user_points(self, username: str, points: int):
         """Update user's points"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self.award(username, points, "adjustment")
+    
+    def get_points_earned(self, username: str, period: str = "week") -> int:
+        """Sum of points awarded (spending excluded) within a reporting period"""
+        start_date = self.period_start(period)
+        user_id = self.user_id(username, create=False)
         
-        cursor.execute('''
-            UPDATE users SET total_points = total_points + ? WHERE username = ?
-        ''', (points, username))
+        with self.connection() as conn:
+            row = conn.execute('''
+                SELECT SUM(points) FROM points_ledger
+                WHERE user_id = ? AND created_at >= ? AND points > 0 AND reason != 'opening_balance'
+            ''', (user_id, start_date.isoformat() if start_date else '')).fetchone()
         
-        conn.commit()
-        conn.close()
+        return row[0] or 0
+    
+    def reconcile_points(self) -> List[Dict[str, Any]]:
+        """Rebuild every balance from the ledger; returns the users that were corrected"""
+        with self.transaction(immediate=True) as conn:
+            drifted = conn.execute('''
+                SELECT u.username, u.total_points, COALESCE(l.balance, 0)
+                FROM users u
+                LEFT JOIN (
+                    SELECT user_id, SUM(points) AS balance FROM points_ledger GROUP BY user_id
+                ) l ON l.user_id = u.id
+                WHERE u.total_points != COALESCE(l.balance, 0)
+            ''').fetchall()
+            conn.executemany(
+                'UPDATE users SET total_points = ? WHERE username = ?',
+                [(balance, username) for username, _, balance in drifted]
+            )
+        for username, _, _ in drifted:
+            self.user_cache.bump(username)
+        
+        return [
+            {'username': username, 'previous': previous, 'balance': balance}
+            for username, previous, balance in drifted
+        ]
+    
+    def archive_history(self, older_than_days: Optional[int] = None) -> Dict[str, Any]:
+        """Move attempts and mistakes older than the horizon into monthly archive tables
+        
+        A month is only archived when daily_study_stats already accounts for its
+        attempts, so rollup-based statistics are unchanged; otherwise it is
+        reported in ``skipped_months`` (run backfill-rollups first). Archived rows
+        stay readable through the question_attempts_history and mistakes_history views.
+        """
+        days = config.DATABASE_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+        cutoff = (datetime.date.today() - datetime.timedelta(days=days)).isoformat()
+        self.flush()
+        
+        with self.connection() as conn:
+            months = {row[0] for row in conn.execute('''
+                SELECT DISTINCT SUBSTR(attempt_day, 1, 7) FROM question_attempts WHERE attempt_day < ?
+                UNION
+                SELECT DISTINCT SUBSTR(mistake_date, 1, 7) FROM mistakes WHERE mistake_date < ?
+            ''', (cutoff, cutoff))}
+        
+        result: Dict[str, Any] = {table: 0 for table in migrations.ARCHIVED_COLUMNS}
+        result['skipped_months'] = []
+        for month in sorted(months):
+            if not _MONTH_PATTERN.fullmatch(month or ''):
+                result['skipped_months'].append(month)
+                continue
+            month_start = datetime.date.fromisoformat(f"{month}-01")
+            next_month = (month_start + datetime.timedelta(days=32)).replace(day=1)
+            start, end = month_start.isoformat(), min(next_month.isoformat(), cutoff)
+            
+            with self.transaction(immediate=True) as conn:
+                if not self._rollups_cover(conn, month, start, end):
+                    result['skipped_months'].append(month)
+                    continue
+                for table, day_column in (('question_attempts', 'attempt_day'), ('mistakes', 'mistake_date')):
+                    result[table] += self._move_to_partition(conn, table, day_column, month, start, end)
+                migrations.rebuild_history_views(conn.cursor())
+        
+        if result['question_attempts'] or result['mistakes']:
+            with self.connection() as conn:
+                conn.execute('PRAGMA optimize')
+            self.user_cache.clear()
+        return result
+    
+    @staticmethod
+    def _partition_name(table: str, month: str) -> str:
+        return f"{table}_archive_{month.replace('-', '_')}"
+    
+    def _rollups_cover(self, conn, month: str, start: str, end: str) -> bool:
+        """Whether daily_study_stats counts every attempt (hot and archived) in [start, end)"""
+        rolled_up = conn.execute(
+            'SELECT COALESCE(SUM(attempts), 0) FROM daily_study_stats WHERE stat_date >= ? AND stat_date < ?',
+            (start, end)
+        ).fetchone()[0]
+        raw = conn.execute(
+            'SELECT COUNT(*) FROM question_attempts WHERE attempt_day >= ? AND attempt_day < ?',
+            (start, end)
+        ).fetchone()[0]
+        partition = self._partition_name('question_attempts', month)
+        if conn.execute('SELECT 1 FROM archive_partitions WHERE table_name = ?', (partition,)).fetchone():
+            raw += conn.execute(
+                f'SELECT COUNT(*) FROM {partition} WHERE attempt_day >= ? AND attempt_day < ?',
+                (start, end)
+            ).fetchone()[0]
+        return rolled_up >= raw
+    
+    def _move_to_partition(self, conn, table: str, day_column: str, month: str, start: str, end: str) -> int:
+        """Copy one month's rows into its archive table and delete them from the hot table"""
+        partition = self._partition_name(table, month)
+        columns = ", ".join(migrations.ARCHIVED_COLUMNS[table])
+        conn.execute(f'CREATE TABLE IF NOT EXISTS {partition} AS SELECT {columns} FROM {table} WHERE 0')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{partition}_user ON {partition} (user_id, {day_column})')
+        
+        moved = conn.execute(f'''
+            INSERT INTO {partition} ({columns})
+            SELECT {columns} FROM {table} WHERE {day_column} >= ? AND {day_column} < ?
+        ''', (start, end)).rowcount
+        conn.execute(f'DELETE FROM {table} WHERE {day_column} >= ? AND {day_column} < ?', (start, end))
+        conn.execute('''
+            INSERT INTO archive_partitions (table_name, source_table, month, row_count)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (table_name)
+            DO UPDATE SET row_count = row_count + excluded.row_count, archived_at = CURRENT_TIMESTAMP
+        ''', (partition, table, month, moved))
+        return moved
     
     def get_completed_future_lessons(self, username: str) -> List[Dict[str, Any]]:
         """Get completed future lessons"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT lesson_title, lesson_type, completion_date 
-            FROM future_lessons 
-            WHERE username = ?
-            ORDER BY completion_date DESC
-        ''', (username,))
+        with self.connection() as conn:
+            rows = conn.execute('''
+                SELECT lesson_title, lesson_type, completion_date 
+                FROM future_lessons
+                WHERE user_id = ?
+                ORDER BY completion_date DESC
+            ''', (self.user_id(username, create=False),)).fetchall()
         
         lessons = []
-        for row in cursor.fetchall():
+        for row in rows:
             lessons.append({
                 'title': row[0],
                 'type': row[1],
                 'completion_date': row[2]
             })
         
-        conn.close()
         return lessons
     
     def add_future_lesson_completion(self, username: str, lesson_title: str, lesson_type: str):
         """Add completed future lesson"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO future_lessons (username, lesson_title, lesson_type)
-            VALUES (?, ?, ?)
-        ''', (username, lesson_title, lesson_type))
-        
-        conn.commit()
-        conn.close()
+        with self.transaction() as conn:
+            conn.execute('''
+                INSERT INTO future_lessons (user_id, lesson_title, lesson_type)
+                VALUES (?, ?, ?)
+            ''', (self.user_id(username), lesson_title, lesson_type))
+        self.user_cache.bump(username)
+    
+    def close(self):
+        """Close the pooled connections for this database file"""
+        self.pool.close()
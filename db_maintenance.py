@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Database maintenance commands for TunaMentor
+
+Usage:
+    python db_maintenance.py migrate
+    python db_maintenance.py backfill-rollups
+    python db_maintenance.py reconcile-points
+    python db_maintenance.py archive --days 180
+    python db_maintenance.py fit-srs [--user tuna]
+    python db_maintenance.py calibrate [--full] [--chunk-size 100000]
+"""
+import argparse
+import sys
+import time
+
+import migrations
+from database import Database
+from logger import get_logger
+
+
+def cmd_migrate(db: Database, args) -> int:
+    """Apply pending schema migrations"""
+    with db.connection() as conn:
+        version = migrations.current_version(conn)
+    print(f"✅ Schema version {version} (latest {migrations.latest_version()})")
+    return 0
+
+
+def cmd_backfill_rollups(db: Database, args) -> int:
+    """Rebuild daily_study_stats from study_sessions and question_attempts"""
+    started = time.perf_counter()
+    rows = db.rebuild_daily_stats()
+    print(f"✅ Daily rollups rebuilt: {rows} rows in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+def cmd_reconcile_points(db: Database, args) -> int:
+    """Rebuild user balances from the points ledger"""
+    corrected = db.reconcile_points()
+    for row in corrected:
+        print(f"⚠️ {row['username']}: {row['previous']} → {row['balance']}")
+    print(f"✅ Points reconciled ({len(corrected)} balances corrected)")
+    return 0
+
+
+def cmd_archive(db: Database, args) -> int:
+    """Move old attempts and mistakes into monthly archive tables"""
+    started = time.perf_counter()
+    result = db.archive_history(args.days)
+    print(f"✅ Archived {result['question_attempts']} attempts and {result['mistakes']} mistakes "
+          f"in {time.perf_counter() - started:.1f}s")
+    if result['skipped_months']:
+        print(f"⚠️ Rollups incomplete, skipped: {', '.join(map(str, result['skipped_months']))} "
+              f"(run backfill-rollups first)")
+        return 1
+    return 0
+
+
+def cmd_fit_srs(db: Database, args) -> int:
+    """Fit per-user FSRS weights to answer history and reschedule review cards"""
+    if args.user:
+        usernames = [args.user]
+    else:
+        with db.connection() as conn:
+            usernames = [row[0] for row in conn.execute("SELECT username FROM users ORDER BY id")]
+
+    fitted = 0
+    for username in usernames:
+        result = db.fit_review_parameters(username, args.min_reviews)
+        if result is None:
+            print(f"⏭️ {username}: not enough review history")
+            continue
+        fitted += 1
+        print(f"✅ {username}: {result['reviews']} reviews, log loss "
+              f"{result['log_loss_before']} → {result['log_loss_after']}, {result['rescheduled']} cards rescheduled")
+    print(f"✅ FSRS parameters fitted for {fitted} of {len(usernames)} users")
+    return 0
+
+
+def cmd_calibrate(db: Database, args) -> int:
+    """Fit question difficulties (Rasch) to the answer history, incrementally by default"""
+    started = time.perf_counter()
+    result = db.calibrate_questions(full=args.full, chunk_size=args.chunk_size)
+    if not result['attempts']:
+        print(f"✅ No attempts after #{result['watermark']}; nothing to calibrate")
+        return 0
+    print(f"✅ Calibrated {result['questions']} questions and {result['abilities']} abilities from "
+          f"{result['attempts']} attempts ({result['cells']} user/question pairs, {result['iterations']} iterations, "
+          f"log loss {result['log_loss']}) in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+COMMANDS = {
+    "migrate": (cmd_migrate, "Apply pending schema migrations"),
+    "backfill-rollups": (cmd_backfill_rollups, "Rebuild the daily study rollups from raw events"),
+    "reconcile-points": (cmd_reconcile_points, "Rebuild user point balances from the ledger"),
+    "archive": (cmd_archive, "Move old attempts and mistakes into monthly archive tables"),
+    "fit-srs": (cmd_fit_srs, "Fit spaced repetition parameters to each user's answer history"),
+    "calibrate": (cmd_calibrate, "Fit question difficulties to the answer history"),
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="TunaMentor database maintenance")
+    parser.add_argument("--db", default=None, help="database file (default: DATABASE_URL)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text)
+    subparsers.choices["archive"].add_argument(
+        "--days", type=int, default=None, help="archive rows older than this (default: DATABASE_ARCHIVE_AFTER_DAYS)"
+    )
+    subparsers.choices["fit-srs"].add_argument("--user", default=None, help="only this user (default: all users)")
+    subparsers.choices["fit-srs"].add_argument(
+        "--min-reviews", type=int, default=50, help="skip users with fewer daily reviews than this"
+    )
+    subparsers.choices["calibrate"].add_argument(
+        "--full", action="store_true", help="refit the whole history instead of the attempts since the last run"
+    )
+    subparsers.choices["calibrate"].add_argument(
+        "--chunk-size", type=int, default=100_000, help="attempts read per chunk (bounds memory)"
+    )
+    args = parser.parse_args(argv)
+
+    logger = get_logger(__name__)
+    logger.info(f"Running maintenance command: {args.command}")
+
+    # Constructing the Database applies any pending migrations
+    db = Database(args.db)
+    handler, _ = COMMANDS[args.command]
+    return handler(db, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
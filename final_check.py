@@ -23,7 +23,7 @@ def check_all_systems():
         "app.py", "alex_ai.py", "database.py", "curriculum.py",
         "gamification.py", "memory_techniques.py", "voice_synthesis.py",
         "progress_tracker.py", "parent_dashboard.py", "study_planner.py",
-        "fenerbahce_integration.py", "utils.py", "manifest.json"
+        "fenerbahce_integration.py", "services.py", "question_bank.py", "theme.css", "utils.py", "manifest.json"
     ]
     
     for file in required_files:
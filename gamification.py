@@ -1,11 +1,24 @@
 import random
 import datetime
 from typing import Dict, List, Any
+from cache import TTLCache
 from database import Database
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Learning technique code → the advanced achievement requirement its counters feed
+TECHNIQUE_REQUIREMENTS = {
+    "memory_palace": "memory_palace_usage",
+    "mind_map": "mind_maps_created",
+    "active_recall": "active_recall_accuracy"
+}
 
 class Gamification:
     def __init__(self, database: Database):
         self.db = database
+        # Achievements are never taken back, so a user's known ones need no invalidation
+        self.earned = TTLCache("earned_achievements", max_entries=4096)
         self.point_values = {
             "correct_answer": 10,
             "streak_bonus": 5,
@@ -56,27 +69,37 @@ class Gamification:
             }
         }
 
-    def add_points(self, username: str, points: int, reason: str = "") -> int:
+    def add_points(self, username: str, points: int, reason: str = "manual") -> int:
         """Add points to user and return total points"""
-        self.db.update_user_points(username, points)
+        total_points = self.db.award(username, points, reason)
 
-        # Check for achievements
-        self._check_achievements(username)
-        self._check_advanced_achievements(username)
+        # Check for achievements (advanced ones are checked where their counters change)
+        self._check_achievements(username, total_points)
 
-        return self.db.get_user_points(username)
+        return total_points
 
-    def spend_points(self, username: str, points: int) -> bool:
-        """Spend points if user has enough"""
-        current_points = self.db.get_user_points(username)
+    def record_technique_use(self, username: str, technique: str, is_correct: bool = None) -> List[str]:
+        """Count one use of a learning technique; returns the achievements it earned"""
+        counters = self.db.log_technique_usage(username, technique, is_correct)
+        requirement = TECHNIQUE_REQUIREMENTS.get(technique)
+        if requirement is None:
+            return []
+        if requirement == "active_recall_accuracy":
+            value = round(counters['correct'] / counters['uses'] * 100, 1)
+        else:
+            value = counters['uses']
+        return self.update_progress(username, requirement, value)
 
-        if current_points >= points:
-            self.db.update_user_points(username, -points)
-            return True
-        return False
+    def spend_points(self, username: str, points: int, reason: str = "store_purchase") -> bool:
+        """Spend points if user has enough"""
+        return self.db.spend(username, points, reason) is not None
 
     def get_user_stats(self, username: str) -> Dict[str, Any]:
-        """Get comprehensive user statistics"""
+        """Get comprehensive user statistics (cached until the user's data changes)"""
+        return self.db.cached(username, ("game_stats", datetime.date.today()),
+                              lambda: self._compute_user_stats(username))
+
+    def _compute_user_stats(self, username: str) -> Dict[str, Any]:
         total_points = self.db.get_user_points(username)
         level = self._calculate_level(total_points)
         streak = self._calculate_streak(username)
@@ -94,9 +117,7 @@ class Gamification:
 
     def _calculate_streak(self, username: str) -> int:
         """Calculate current study streak"""
-        # This would check consecutive days of study from database
-        # For demo, return a sample value
-        return random.randint(0, 10)
+        return self.db.get_user_data(username)['study_streak']
 
     def get_daily_challenges(self, username: str) -> List[Dict[str, Any]]:
         """Generate daily challenges for user"""
@@ -168,32 +189,44 @@ class Gamification:
         ]
         return sample_achievements
 
-    def _check_achievements(self, username: str):
+    def _check_achievements(self, username: str, total_points: int):
         """Check and award new achievements"""
-        total_points = self.db.get_user_points(username)
 
         # Simple achievement check - in real app this would be more sophisticated
         if total_points >= 1000:
             # Award "LGS Ready" achievement if not already earned
             pass
     
-    def _check_advanced_achievements(self, username: str):
-        """Check and award new advanced achievements"""
-        user_progress = self.db.get_user_progress(username) # Assuming a method to get user progress data
-
-        for key, achievement in self.advanced_achievements.items():
-            requirement = achievement["requirement"]
-            threshold = achievement["threshold"]
-            
-            if requirement in user_progress and user_progress[requirement] >= threshold:
-                # Award achievement if not already earned (logic to check earned achievements needed)
-                # For now, just print that it would be awarded
-                print(f"Awarding achievement: {achievement['name']} to {username}")
-                # In a real scenario, you would call a method like:
-                # self.db.award_achievement(username, key) 
-                # and potentially add reward points
-                # self.add_points(username, achievement["reward_points"], f"Achievement: {achievement['name']}")
-                pass # Placeholder for actual award logic
+    def update_progress(self, username: str, requirement: str, value: float) -> List[str]:
+        """Award the advanced achievements a changed counter has reached; returns their names
+
+        Called with the counter's new value by whatever changed it, so the
+        earned list is only read once a threshold is actually reached.
+        """
+        reached = [achievement for achievement in self.advanced_achievements.values()
+                   if achievement["requirement"] == requirement and value >= achievement["threshold"]]
+        if not reached:
+            return []
+
+        known = self.earned.get(username, set())
+        reached = [achievement for achievement in reached if achievement["name"] not in known]
+        if not reached:
+            return []
+
+        earned = self.db.get_achievement_names(username)
+        awarded = []
+        for achievement in reached:
+            if achievement["name"] in earned:
+                continue
+            if self.db.award_achievement(username, achievement["name"], achievement["description"],
+                                         achievement["reward_points"]):
+                logger.info(f"Awarding achievement: {achievement['name']} to {username}")
+                awarded.append(achievement["name"])
+            earned.add(achievement["name"])
+        # Inside a caller's transaction the awards could still be rolled back
+        if not self.db.pool.in_transaction():
+            self.earned.set(username, earned)
+        return awarded
 
     def can_watch_full_match(self, username: str) -> bool:
         """Check if user completed enough tasks to watch full match"""
@@ -250,4 +283,5 @@ class Gamification:
             "subject_master": f"📚 Konu uzmanı bonusu! +{points} puan!"
         }
 
-        self.add_points(username, points, bonus_messages.get(bonus_type, "Özel bonus!"))
\ No newline at end of file
+        self.add_points(username, points, f"bonus:{bonus_type}")
+        return bonus_messages.get(bonus_type, "Özel bonus!")
\ No newline at end of file
@@ -3,25 +3,25 @@
 Health check script for TunaMentor application
 """
 import sys
-import sqlite3
 import requests
 from pathlib import Path
 from config import config
+from storage import SQLiteFileBackend, backend_from_url
 from logger import get_logger
 
 def check_database():
     """Check database connectivity"""
     try:
-        db_path = config.DATABASE_URL.replace('sqlite:///', '')
-        if Path(db_path).exists():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = cursor.fetchall()
-            conn.close()
-            return True, f"Database OK ({len(tables)} tables)"
-        else:
+        backend = backend_from_url(config.DATABASE_URL)
+        # In-memory backends subclass SQLiteFileBackend but have no file to look for
+        if type(backend) is SQLiteFileBackend and not Path(backend.path).exists():
             return False, "Database file not found"
+        conn = backend.connect()
+        try:
+            tables = conn.execute("SELECT name FROM sqlite_master WHERE type='table';").fetchall()
+        finally:
+            conn.close()
+        return True, f"Database OK ({backend.name}, {len(tables)} tables)"
     except Exception as e:
         return False, f"Database error: {e}"
 
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Question bank ingestion for TunaMentor
+
+Usage:
+    python ingest_questions.py validate [data/questions]
+    python ingest_questions.py compile [data/questions] [--output data/question_bank.pack]
+        (also builds the search index, data/question_bank.search)
+    python ingest_questions.py info [data/question_bank.pack]
+"""
+import argparse
+import os
+import sys
+import time
+
+from config import config
+from curriculum import Curriculum
+from logger import get_logger
+from question_bank import DIFFICULTIES, QuestionPack, compile_pack, ingest, read_source, source_files
+
+
+def _read(sources: str):
+    files = source_files(sources)
+    if not files:
+        print(f"❌ No .json or .csv question files at {sources}")
+        return None
+    questions, problems = ingest(question for file in files for question in read_source(file))
+    for problem in problems:
+        print(f"⚠️ {problem}")
+    print(f"📚 {len(files)} source files: {len(questions)} questions kept, {len(problems)} skipped")
+    return questions, problems
+
+
+def cmd_validate(args) -> int:
+    """Check source files without writing a pack"""
+    result = _read(args.sources)
+    if result is None:
+        return 1
+    _, problems = result
+    return 1 if problems else 0
+
+
+def cmd_compile(args) -> int:
+    """Validate, deduplicate and compile source files into a pack and its search index"""
+    started = time.perf_counter()
+    result = _read(args.sources)
+    if result is None:
+        return 1
+    questions, problems = result
+    if problems and args.strict:
+        print("❌ Not compiled: fix the skipped questions or drop --strict")
+        return 1
+    stats = compile_pack(questions, args.output)
+    print(f"✅ {stats['questions']} questions in {stats['topics']} topics ({stats['blocks']} blocks, "
+          f"{stats['bytes'] / 1024:.0f} KB) → {args.output}")
+
+    # Opening the curriculum on the new pack builds its search index (with the lessons)
+    index = Curriculum(bank_path=args.output, sources="").search_index
+    print(f"✅ Search index: {index.documents} documents, {index.terms} terms → {index.path} "
+          f"in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+def cmd_info(args) -> int:
+    """Summarize a compiled pack"""
+    if not os.path.exists(args.pack):
+        print(f"❌ No pack at {args.pack}")
+        return 1
+    pack = QuestionPack(args.pack)
+    print(f"📦 {args.pack}: {len(pack)} questions, {len(pack.blocks)} blocks, "
+          f"{os.path.getsize(args.pack) / 1024:.0f} KB")
+    for subject in pack.subjects():
+        by_difficulty = " ".join(
+            f"{d}:{pack.count_questions(subject, difficulty=d)}" for d in DIFFICULTIES
+        )
+        print(f"  {subject}: {pack.count_questions(subject)} questions, "
+              f"{len(pack.topics(subject))} topics (difficulty {by_difficulty})")
+    pack.close()
+    return 0
+
+
+COMMANDS = {
+    "validate": (cmd_validate, "Check question source files"),
+    "compile": (cmd_compile, "Compile question source files into a pack"),
+    "info": (cmd_info, "Summarize a compiled question pack"),
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="TunaMentor question bank ingestion")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text)
+    for name in ("validate", "compile"):
+        subparsers.choices[name].add_argument(
+            "sources", nargs="?", default=config.QUESTION_BANK_SOURCES,
+            help="source file or directory (default: QUESTION_BANK_SOURCES)"
+        )
+    subparsers.choices["compile"].add_argument(
+        "--output", default=config.QUESTION_BANK_PATH, help="pack file (default: QUESTION_BANK_PATH)"
+    )
+    subparsers.choices["compile"].add_argument(
+        "--strict", action="store_true", help="do not write the pack when any question is skipped"
+    )
+    subparsers.choices["info"].add_argument(
+        "pack", nargs="?", default=config.QUESTION_BANK_PATH, help="pack file (default: QUESTION_BANK_PATH)"
+    )
+    args = parser.parse_args(argv)
+
+    logger = get_logger(__name__)
+    logger.info(f"Running question bank command: {args.command}")
+
+    handler, _ = COMMANDS[args.command]
+    return handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,763 @@
+"""
+Versioned schema migrations for the Alex LGS database
+
+The schema version is stored in ``PRAGMA user_version`` (a header field that
+is free to read) and every applied step is recorded in the ``schema_version``
+table. ``ensure_schema`` runs at most once per database per process and does
+no DDL at all when the schema is already current.
+"""
+import sqlite3
+import threading
+from typing import Callable, Dict, List, NamedTuple
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    upgrade: Callable[[sqlite3.Cursor], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+_checked: Dict[str, int] = {}
+_checked_lock = threading.Lock()
+
+
+def migration(version: int, description: str):
+    """Register an upgrade step; versions must be added in increasing order"""
+    def register(func: Callable[[sqlite3.Cursor], None]):
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration {version} registered out of order")
+        MIGRATIONS.append(Migration(version, description, func))
+        return func
+    return register
+
+
+def latest_version() -> int:
+    """Schema version the code expects"""
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """Schema version stored in the database header"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply every pending migration, each in its own transaction.
+    
+    ``conn`` must be in autocommit mode (``isolation_level=None``).
+    Returns the resulting schema version.
+    """
+    version = current_version(conn)
+    if version >= latest_version():
+        return version
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    for step in MIGRATIONS:
+        if step.version <= version:
+            continue
+
+        # BEGIN IMMEDIATE serialises concurrent migrators; re-check under the lock
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if current_version(conn) >= step.version:
+                conn.rollback()
+                version = current_version(conn)
+                continue
+            step.upgrade(conn.cursor())
+            conn.execute(
+                "INSERT OR REPLACE INTO schema_version (version, description) VALUES (?, ?)",
+                (step.version, step.description)
+            )
+            conn.execute(f"PRAGMA user_version = {int(step.version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.error(f"Schema migration {step.version} failed: {step.description}")
+            raise
+
+        version = step.version
+        logger.info(f"Applied schema migration {step.version}: {step.description}")
+
+    return version
+
+
+def ensure_schema(pool) -> int:
+    """Migrate the pool's database once per process"""
+    with _checked_lock:
+        if _checked.get(pool.key, -1) >= latest_version():
+            return _checked[pool.key]
+        with pool.connection() as conn:
+            version = migrate(conn)
+        _checked[pool.key] = version
+        return version
+
+
+@migration(1, "Initial schema")
+def _initial_schema(cursor: sqlite3.Cursor):
+    # Users table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            total_points INTEGER DEFAULT 0,
+            level INTEGER DEFAULT 1,
+            streak INTEGER DEFAULT 0
+        )
+    ''')
+    
+    # Study sessions table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS study_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            topic TEXT,
+            duration_minutes INTEGER NOT NULL,
+            session_date DATE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (username) REFERENCES users (username)
+        )
+    ''')
+    
+    # Questions and answers table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS question_attempts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            question_id TEXT NOT NULL,
+            user_answer TEXT,
+            correct_answer TEXT,
+            is_correct BOOLEAN NOT NULL,
+            attempt_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (username) REFERENCES users (username)
+        )
+    ''')
+    
+    # Mistakes tracking table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mistakes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            question_id TEXT NOT NULL,
+            mistake_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            reviewed BOOLEAN DEFAULT FALSE,
+            FOREIGN KEY (username) REFERENCES users (username)
+        )
+    ''')
+    
+    # Spaced repetition table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS spaced_repetition (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            next_review_date DATE NOT NULL,
+            review_count INTEGER DEFAULT 0,
+            difficulty_level INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (username) REFERENCES users (username)
+        )
+    ''')
+    
+    # Achievements table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS achievements (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            achievement_name TEXT NOT NULL,
+            achievement_description TEXT,
+            points_awarded INTEGER DEFAULT 0,
+            achieved_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (username) REFERENCES users (username)
+        )
+    ''')
+    
+    # Daily goals table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_goals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            goal_date DATE NOT NULL,
+            subject TEXT NOT NULL,
+            target_minutes INTEGER NOT NULL,
+            completed_minutes INTEGER DEFAULT 0,
+            completed BOOLEAN DEFAULT FALSE,
+            FOREIGN KEY (username) REFERENCES users (username)
+        )
+    ''')
+    
+    # Future lessons progress
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS future_lessons (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            lesson_title TEXT NOT NULL,
+            lesson_type TEXT NOT NULL,
+            completion_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (username) REFERENCES users (username)
+        )
+    ''')
+
+
+@migration(2, "Composite (username, date) indexes and indexed attempt_day column")
+def _analytics_indexes(cursor: sqlite3.Cursor):
+    # ALTER TABLE cannot add a STORED column; a VIRTUAL one costs nothing to add on a
+    # live table and the index below stores its value, which is what the range scans read.
+    cursor.execute('''
+        ALTER TABLE question_attempts
+        ADD COLUMN attempt_day TEXT GENERATED ALWAYS AS (DATE(attempt_date)) VIRTUAL
+    ''')
+    
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_question_attempts_user_day
+        ON question_attempts (username, attempt_day, is_correct)
+    ''')
+    
+    # Covers both the total and the per-subject breakdown in get_study_stats
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_study_sessions_user_date
+        ON study_sessions (username, session_date, subject, duration_minutes)
+    ''')
+    
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_mistakes_user_date
+        ON mistakes (username, mistake_date)
+    ''')
+    
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_spaced_repetition_user_review
+        ON spaced_repetition (username, next_review_date)
+    ''')
+
+
+@migration(3, "Per-user, per-day, per-subject rollups maintained by triggers")
+def _daily_rollups(cursor: sqlite3.Cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_study_stats (
+            username TEXT NOT NULL,
+            stat_date DATE NOT NULL,
+            subject TEXT NOT NULL,
+            study_minutes INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (username, stat_date, subject)
+        ) WITHOUT ROWID
+    ''')
+    
+    # Triggers run inside the inserting transaction, including write-behind batches
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_study_sessions_rollup
+        AFTER INSERT ON study_sessions
+        BEGIN
+            INSERT INTO daily_study_stats (username, stat_date, subject, study_minutes)
+            VALUES (NEW.username, NEW.session_date, NEW.subject, NEW.duration_minutes)
+            ON CONFLICT (username, stat_date, subject)
+            DO UPDATE SET study_minutes = study_minutes + excluded.study_minutes;
+        END
+    ''')
+    
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_question_attempts_rollup
+        AFTER INSERT ON question_attempts
+        BEGIN
+            INSERT INTO daily_study_stats (username, stat_date, subject, attempts, correct)
+            VALUES (NEW.username, NEW.attempt_day, NEW.subject, 1, CASE WHEN NEW.is_correct THEN 1 ELSE 0 END)
+            ON CONFLICT (username, stat_date, subject)
+            DO UPDATE SET attempts = attempts + 1, correct = correct + excluded.correct;
+        END
+    ''')
+    
+    # Fold in the rows written before the triggers existed
+    cursor.execute('DELETE FROM daily_study_stats')
+    cursor.execute('''
+        INSERT INTO daily_study_stats (username, stat_date, subject, study_minutes, attempts, correct)
+        SELECT username, stat_date, subject, SUM(minutes), SUM(attempts), SUM(correct)
+        FROM (
+            SELECT username, session_date AS stat_date, subject,
+                   duration_minutes AS minutes, 0 AS attempts, 0 AS correct
+            FROM study_sessions
+            UNION ALL
+            SELECT username, attempt_day, subject,
+                   0, 1, CASE WHEN is_correct THEN 1 ELSE 0 END
+            FROM question_attempts
+        )
+        GROUP BY username, stat_date, subject
+    ''')
+
+
+@migration(4, "Append-only points ledger")
+def _points_ledger(cursor: sqlite3.Cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS points_ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            points INTEGER NOT NULL,
+            reason TEXT NOT NULL,
+            balance_after INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (username) REFERENCES users (username)
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_points_ledger_user_date
+        ON points_ledger (username, created_at)
+    ''')
+    
+    # Seed the ledger so that balances can always be rebuilt from it
+    cursor.execute('''
+        INSERT INTO points_ledger (username, points, reason, balance_after)
+        SELECT username, total_points, 'opening_balance', total_points
+        FROM users WHERE total_points != 0
+    ''')
+
+
+@migration(5, "Learning technique usage counters")
+def _technique_usage(cursor: sqlite3.Cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS technique_usage (
+            username TEXT NOT NULL,
+            technique TEXT NOT NULL,
+            uses INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            last_used TIMESTAMP,
+            PRIMARY KEY (username, technique)
+        ) WITHOUT ROWID
+    ''')
+
+
+# Event tables that are archived into monthly partitions, with their columns
+# (archive tables store attempt_day as a plain column)
+ARCHIVED_COLUMNS = {
+    "question_attempts": ("id", "user_id", "subject_id", "topic_id", "question_id", "user_answer",
+                          "correct_answer", "is_correct", "attempt_date", "attempt_day"),
+    "mistakes": ("id", "user_id", "subject_id", "topic_id", "question_id", "mistake_date", "reviewed"),
+}
+
+# Archived columns as of migration 6, before the integer key rebuild
+_V6_ARCHIVED_COLUMNS = {
+    "question_attempts": ("id", "username", "subject", "topic", "question_id", "user_answer",
+                          "correct_answer", "is_correct", "attempt_date", "attempt_day"),
+    "mistakes": ("id", "username", "subject", "topic", "question_id", "mistake_date", "reviewed"),
+}
+
+
+def rebuild_history_views(cursor: sqlite3.Cursor, archived_columns: Dict[str, tuple] = None):
+    """(Re)create ``<table>_history`` views: the hot table UNION ALL its archive partitions"""
+    for table, columns in (archived_columns or ARCHIVED_COLUMNS).items():
+        column_list = ", ".join(columns)
+        partitions = [row[0] for row in cursor.execute(
+            "SELECT table_name FROM archive_partitions WHERE source_table = ? ORDER BY month",
+            (table,)
+        ).fetchall()]
+        selects = [f"SELECT {column_list} FROM {name}" for name in [table] + partitions]
+        cursor.execute(f"DROP VIEW IF EXISTS {table}_history")
+        cursor.execute(f"CREATE VIEW {table}_history AS " + " UNION ALL ".join(selects))
+
+
+@migration(6, "Monthly archive partitions and history views for attempts and mistakes")
+def _archive_partitions(cursor: sqlite3.Cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS archive_partitions (
+            table_name TEXT PRIMARY KEY,
+            source_table TEXT NOT NULL,
+            month TEXT NOT NULL,
+            row_count INTEGER NOT NULL DEFAULT 0,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    rebuild_history_views(cursor, _V6_ARCHIVED_COLUMNS)
+
+
+# Tables rebuilt by migration 7: new definition and the SELECT that fills it from
+# the old table (aliased ``o``) joined to users ``u``, subjects ``s`` and topics ``t``
+_V7_TABLES = {
+    "study_sessions": ('''
+        CREATE TABLE study_sessions_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            subject_id INTEGER NOT NULL REFERENCES subjects (id),
+            topic_id INTEGER REFERENCES topics (id),
+            duration_minutes INTEGER NOT NULL,
+            session_date DATE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''', '''
+        SELECT o.id, u.id, s.id, t.id, o.duration_minutes, o.session_date, o.created_at
+    '''),
+    "question_attempts": ('''
+        CREATE TABLE question_attempts_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            subject_id INTEGER NOT NULL REFERENCES subjects (id),
+            topic_id INTEGER NOT NULL REFERENCES topics (id),
+            question_id TEXT NOT NULL,
+            user_answer TEXT,
+            correct_answer TEXT,
+            is_correct BOOLEAN NOT NULL,
+            attempt_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            attempt_day TEXT GENERATED ALWAYS AS (DATE(attempt_date)) VIRTUAL
+        )
+    ''', '''
+        SELECT o.id, u.id, s.id, t.id, o.question_id, o.user_answer, o.correct_answer,
+               o.is_correct, o.attempt_date
+    '''),
+    "mistakes": ('''
+        CREATE TABLE mistakes_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            subject_id INTEGER NOT NULL REFERENCES subjects (id),
+            topic_id INTEGER NOT NULL REFERENCES topics (id),
+            question_id TEXT NOT NULL,
+            mistake_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            reviewed BOOLEAN DEFAULT FALSE
+        )
+    ''', '''
+        SELECT o.id, u.id, s.id, t.id, o.question_id, o.mistake_date, o.reviewed
+    '''),
+    "spaced_repetition": ('''
+        CREATE TABLE spaced_repetition_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            subject_id INTEGER NOT NULL REFERENCES subjects (id),
+            topic_id INTEGER NOT NULL REFERENCES topics (id),
+            next_review_date DATE NOT NULL,
+            review_count INTEGER DEFAULT 0,
+            difficulty_level INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''', '''
+        SELECT o.id, u.id, s.id, t.id, o.next_review_date, o.review_count, o.difficulty_level, o.created_at
+    '''),
+    "daily_goals": ('''
+        CREATE TABLE daily_goals_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            goal_date DATE NOT NULL,
+            subject_id INTEGER NOT NULL REFERENCES subjects (id),
+            target_minutes INTEGER NOT NULL,
+            completed_minutes INTEGER DEFAULT 0,
+            completed BOOLEAN DEFAULT FALSE
+        )
+    ''', '''
+        SELECT o.id, u.id, o.goal_date, s.id, o.target_minutes, o.completed_minutes, o.completed
+    '''),
+    "daily_study_stats": ('''
+        CREATE TABLE daily_study_stats_new (
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            stat_date DATE NOT NULL,
+            subject_id INTEGER NOT NULL REFERENCES subjects (id),
+            study_minutes INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, stat_date, subject_id)
+        ) WITHOUT ROWID
+    ''', '''
+        SELECT u.id, o.stat_date, s.id, o.study_minutes, o.attempts, o.correct
+    '''),
+    "achievements": ('''
+        CREATE TABLE achievements_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            achievement_name TEXT NOT NULL,
+            achievement_description TEXT,
+            points_awarded INTEGER DEFAULT 0,
+            achieved_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''', '''
+        SELECT o.id, u.id, o.achievement_name, o.achievement_description, o.points_awarded, o.achieved_date
+    '''),
+    "future_lessons": ('''
+        CREATE TABLE future_lessons_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            lesson_title TEXT NOT NULL,
+            lesson_type TEXT NOT NULL,
+            completion_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''', '''
+        SELECT o.id, u.id, o.lesson_title, o.lesson_type, o.completion_date
+    '''),
+    "points_ledger": ('''
+        CREATE TABLE points_ledger_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            points INTEGER NOT NULL,
+            reason TEXT NOT NULL,
+            balance_after INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''', '''
+        SELECT o.id, u.id, o.points, o.reason, o.balance_after, o.created_at
+    '''),
+    "technique_usage": ('''
+        CREATE TABLE technique_usage_new (
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            technique TEXT NOT NULL,
+            uses INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            last_used TIMESTAMP,
+            PRIMARY KEY (user_id, technique)
+        ) WITHOUT ROWID
+    ''', '''
+        SELECT u.id, o.technique, o.uses, o.correct, o.last_used
+    '''),
+}
+
+
+def _lookup_joins(cursor: sqlite3.Cursor, table: str) -> str:
+    """JOIN clauses resolving the text columns ``table`` actually has to ids"""
+    columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    joins = "JOIN users u ON u.username = o.username"
+    if "subject" in columns:
+        joins += " JOIN subjects s ON s.name = o.subject"
+    if "topic" in columns:
+        joins += " LEFT JOIN topics t ON t.subject_id = s.id AND t.name = o.topic"
+    return joins
+
+
+@migration(7, "Integer user_id foreign keys and subject/topic lookup tables")
+def _integer_keys(cursor: sqlite3.Cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS subjects (
+            id INTEGER PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS topics (
+            id INTEGER PRIMARY KEY,
+            subject_id INTEGER NOT NULL REFERENCES subjects (id),
+            name TEXT NOT NULL,
+            UNIQUE (subject_id, name)
+        )
+    ''')
+    
+    partitions = cursor.execute(
+        "SELECT table_name, source_table FROM archive_partitions ORDER BY table_name"
+    ).fetchall()
+    for table in _V6_ARCHIVED_COLUMNS:
+        cursor.execute(f"DROP VIEW IF EXISTS {table}_history")
+    
+    # Every name referenced anywhere gets an id before the tables are rebuilt
+    all_tables = list(_V7_TABLES) + [name for name, _ in partitions]
+    for table in all_tables:
+        columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        cursor.execute(f"INSERT OR IGNORE INTO users (username) SELECT DISTINCT username FROM {table}")
+        if "subject" in columns:
+            cursor.execute(f"INSERT OR IGNORE INTO subjects (name) SELECT DISTINCT subject FROM {table}")
+        if "topic" in columns:
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO topics (subject_id, name)
+                SELECT DISTINCT s.id, o.topic FROM {table} o JOIN subjects s ON s.name = o.subject
+                WHERE o.topic IS NOT NULL
+            ''')
+    
+    for table, (create_sql, select_sql) in _V7_TABLES.items():
+        cursor.execute(create_sql)
+        new_columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table}_new)")
+                       if row[1] != "attempt_day"]
+        cursor.execute(f'''
+            INSERT INTO {table}_new ({", ".join(new_columns)})
+            {select_sql} FROM {table} o {_lookup_joins(cursor, table)}
+        ''')
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    
+    # Archive partitions are plain tables; rebuild them with the new archived columns
+    for name, source_table in partitions:
+        day_column = "attempt_day" if source_table == "question_attempts" else "mistake_date"
+        columns = ", ".join(ARCHIVED_COLUMNS[source_table])
+        select_sql = _V7_TABLES[source_table][1].replace(", o.attempt_date", ", o.attempt_date, o.attempt_day")
+        cursor.execute(f"CREATE TABLE {name}_new AS SELECT {columns} FROM {source_table} WHERE 0")
+        cursor.execute(f'''
+            INSERT INTO {name}_new ({columns})
+            {select_sql} FROM {name} o {_lookup_joins(cursor, name)}
+        ''')
+        cursor.execute(f"DROP TABLE {name}")
+        cursor.execute(f"ALTER TABLE {name}_new RENAME TO {name}")
+        cursor.execute(f"CREATE INDEX idx_{name}_user ON {name} (user_id, {day_column})")
+    
+    cursor.execute('''
+        CREATE INDEX idx_question_attempts_user_day
+        ON question_attempts (user_id, attempt_day, is_correct)
+    ''')
+    cursor.execute('''
+        CREATE INDEX idx_study_sessions_user_date
+        ON study_sessions (user_id, session_date, subject_id, duration_minutes)
+    ''')
+    cursor.execute('CREATE INDEX idx_mistakes_user_date ON mistakes (user_id, mistake_date)')
+    cursor.execute('CREATE INDEX idx_spaced_repetition_user_review ON spaced_repetition (user_id, next_review_date)')
+    cursor.execute('CREATE INDEX idx_points_ledger_user_date ON points_ledger (user_id, created_at)')
+    
+    cursor.execute('''
+        CREATE TRIGGER trg_study_sessions_rollup
+        AFTER INSERT ON study_sessions
+        BEGIN
+            INSERT INTO daily_study_stats (user_id, stat_date, subject_id, study_minutes)
+            VALUES (NEW.user_id, NEW.session_date, NEW.subject_id, NEW.duration_minutes)
+            ON CONFLICT (user_id, stat_date, subject_id)
+            DO UPDATE SET study_minutes = study_minutes + excluded.study_minutes;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER trg_question_attempts_rollup
+        AFTER INSERT ON question_attempts
+        BEGIN
+            INSERT INTO daily_study_stats (user_id, stat_date, subject_id, attempts, correct)
+            VALUES (NEW.user_id, NEW.attempt_day, NEW.subject_id, 1, CASE WHEN NEW.is_correct THEN 1 ELSE 0 END)
+            ON CONFLICT (user_id, stat_date, subject_id)
+            DO UPDATE SET attempts = attempts + 1, correct = correct + excluded.correct;
+        END
+    ''')
+    
+    rebuild_history_views(cursor)
+
+
+@migration(8, "One spaced repetition card per user and topic")
+def _unique_spaced_repetition(cursor: sqlite3.Cursor):
+    # Collapse duplicates left by INSERT OR REPLACE without a unique key: keep the
+    # most-reviewed row per (user, topic), due on the earliest of the duplicates' dates
+    cursor.execute('''
+        UPDATE spaced_repetition AS r
+        SET next_review_date = d.first_due
+        FROM (
+            SELECT user_id, topic_id, MIN(next_review_date) AS first_due
+            FROM spaced_repetition GROUP BY user_id, topic_id HAVING COUNT(*) > 1
+        ) AS d
+        WHERE r.user_id = d.user_id AND r.topic_id = d.topic_id
+    ''')
+    cursor.execute('''
+        DELETE FROM spaced_repetition
+        WHERE id NOT IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY user_id, topic_id ORDER BY review_count DESC, id
+                ) AS rank
+                FROM spaced_repetition
+            ) WHERE rank = 1
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_spaced_repetition_user_topic
+        ON spaced_repetition (user_id, topic_id)
+    ''')
+    # idx_spaced_repetition_user_review (user_id, next_review_date) serves the due queue
+
+
+@migration(9, "FSRS card state and per-user scheduler parameters")
+def _fsrs_state(cursor: sqlite3.Cursor):
+    # NULL stability marks a card that has not been reviewed under FSRS yet
+    for column in (
+        "stability REAL",
+        "difficulty REAL",
+        "interval_days INTEGER NOT NULL DEFAULT 0",
+        "last_review_date DATE",
+        "lapses INTEGER NOT NULL DEFAULT 0",
+    ):
+        cursor.execute(f"ALTER TABLE spaced_repetition ADD COLUMN {column}")
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS srs_parameters (
+            user_id INTEGER PRIMARY KEY REFERENCES users (id),
+            weights TEXT NOT NULL,
+            desired_retention REAL NOT NULL DEFAULT 0.9,
+            log_loss REAL,
+            review_count INTEGER NOT NULL DEFAULT 0,
+            fitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+@migration(10, "Item response parameters of questions and per-subject abilities")
+def _item_response(cursor: sqlite3.Cursor):
+    # A question gets a row on its first answer; until then its difficulty comes from the question bank
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS question_stats (
+            question_id TEXT PRIMARY KEY,
+            subject_id INTEGER NOT NULL REFERENCES subjects (id),
+            topic_id INTEGER REFERENCES topics (id),
+            difficulty REAL NOT NULL,
+            discrimination REAL NOT NULL DEFAULT 1.0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX idx_question_stats_topic ON question_stats (subject_id, topic_id)')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_ability (
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            subject_id INTEGER NOT NULL REFERENCES subjects (id),
+            ability REAL NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, subject_id)
+        )
+    ''')
+
+
+@migration(11, "Batch item calibration runs and estimate precision")
+def _item_calibration(cursor: sqlite3.Cursor):
+    # information: precision of the last batch estimate, the weight it carries into the next incremental fit
+    cursor.execute("ALTER TABLE question_stats ADD COLUMN information REAL NOT NULL DEFAULT 0")
+    cursor.execute("ALTER TABLE question_stats ADD COLUMN calibrated_at TIMESTAMP")
+    cursor.execute("ALTER TABLE user_ability ADD COLUMN information REAL NOT NULL DEFAULT 0")
+    
+    # Each run records the last attempt id it read; the next incremental run starts after it
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS calibration_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            watermark INTEGER NOT NULL,
+            full_refit BOOLEAN NOT NULL,
+            attempts INTEGER NOT NULL,
+            questions INTEGER NOT NULL,
+            abilities INTEGER NOT NULL,
+            log_likelihood REAL,
+            iterations INTEGER,
+            finished_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+@migration(12, "Covering index for recent question history and stored mock exams")
+def _mock_exams(cursor: sqlite3.Cursor):
+    # Mock exams read which questions whole cohorts answered recently. attempt_day is a
+    # virtual column, which SQLite never reads from an index alone, so this index is on
+    # attempt_date: the reads then never touch the table
+    cursor.execute('''
+        CREATE INDEX idx_question_attempts_user_recent
+        ON question_attempts (user_id, attempt_date, question_id)
+    ''')
+    
+    # The paper a student was given for an exam day (question ids per subject, as JSON)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mock_exams (
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            exam_date DATE NOT NULL,
+            exam TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, exam_date)
+        )
+    ''')
@@ -0,0 +1,322 @@
+"""
+LGS mock exam (deneme) assembly for Alex LGS
+
+An exam follows a blueprint: the LGS sessions, their durations and the
+number of questions each subject gets. Within a subject the questions are
+spread over the topics in proportion to Curriculum.get_topic_priority
+(every topic with questions gets at least one while the count allows), and
+the subject as a whole follows DIFFICULTY_MIX over the 1-5 levels. Both are
+met at once by filling a (topic, level) quota matrix, never asking a cell
+for more questions than the bank holds. One matrix is drawn per batch, so a
+cohort sits comparable papers.
+
+Each cell is then filled for every student at once. The cell's questions are
+shuffled, each student reads its quota from a random offset and skips the
+questions it answered in the last ``exclude_days`` days. This costs
+O(students × (quota + recently answered)) per cell, not students × questions.
+A student only gets a repeat when a cell has run out of fresh questions for
+them, and then gets the questions it answered longest ago.
+"""
+import datetime
+import itertools
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from question_bank import DIFFICULTIES, Question
+
+if TYPE_CHECKING:
+    from curriculum import Curriculum
+    from database import Database
+
+# LGS: a verbal and a numerical session, 90 questions in 155 minutes
+LGS_BLUEPRINT = {
+    "Sözel Bölüm": {
+        "duration": 75,
+        "subjects": {"Türkçe": 20, "T.C. İnkılap Tarihi": 10, "Din Kültürü": 10, "İngilizce": 10}
+    },
+    "Sayısal Bölüm": {
+        "duration": 80,
+        "subjects": {"Matematik": 20, "Fen Bilimleri": 20}
+    }
+}
+
+# Share of questions at each difficulty level (1 easiest - 5 hardest)
+DIFFICULTY_MIX = {1: 0.1, 2: 0.2, 3: 0.4, 4: 0.2, 5: 0.1}
+
+EXCLUDE_DAYS = 30  # Questions answered this recently are not repeated while fresh ones remain
+STUDENT_CHUNK = 256  # Students sampled together (bounds the seen matrix)
+
+
+def exam_duration(blueprint: Dict[str, Any] = LGS_BLUEPRINT) -> int:
+    """Total minutes of a blueprint's sessions"""
+    return sum(section["duration"] for section in blueprint.values())
+
+
+def exam_size(blueprint: Dict[str, Any] = LGS_BLUEPRINT) -> int:
+    """Total questions of a blueprint"""
+    return sum(sum(section["subjects"].values()) for section in blueprint.values())
+
+
+def apportion(total: int, weights: Sequence[float], caps: Sequence[int]) -> np.ndarray:
+    """Split total into integers proportional to weights, none above its cap (largest remainder)
+
+    When the weighted parts are all full, the rest goes to parts with room
+    left regardless of weight; the sum is less than total only when the
+    caps add up to less.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    caps = np.asarray(caps, dtype=np.int64)
+    quotas = np.zeros(len(caps), dtype=np.int64)
+    remaining = min(int(total), int(caps.sum()))
+    while remaining > 0:
+        room = quotas < caps
+        share = np.where(room, weights, 0.0)
+        if share.sum() <= 0:
+            share = room.astype(np.float64)
+        share *= remaining / share.sum()
+        added = np.floor(share + 1e-9).astype(np.int64)
+        # Largest remainders take the units lost to rounding
+        leftover = remaining - int(added.sum())
+        if leftover > 0:
+            order = np.argsort(-np.where(room, share - added, -1.0), kind="stable")
+            added[order[:leftover]] += 1
+        added = np.minimum(added, caps - quotas)
+        quotas += added
+        remaining -= int(added.sum())
+    return quotas
+
+
+def fill_quotas(row_totals: np.ndarray, column_totals: np.ndarray, caps: np.ndarray,
+                rng: np.random.Generator) -> np.ndarray:
+    """Integer matrix with the given row sums and, as far as the caps allow, column sums
+
+    Units go one at a time to the allowed cell furthest below its share of
+    the outer product, with random tie-breaking so that the same topics do
+    not always get the same levels. Rows must fit their caps; a column total
+    is exceeded only when a row has no room left in any other column.
+    """
+    target = np.outer(row_totals, column_totals) / max(int(column_totals.sum()), 1)
+    quotas = np.zeros(caps.shape, dtype=np.int64)
+    rows_left, columns_left = row_totals.astype(np.int64), column_totals.astype(np.int64)
+    for _ in range(int(row_totals.sum())):
+        room = (quotas < caps) & (rows_left[:, None] > 0)
+        allowed = room & (columns_left[None, :] > 0)
+        if not allowed.any():
+            allowed = room
+            if not allowed.any():
+                break
+        score = np.where(allowed, target - quotas + rng.random(caps.shape) * 0.5, -np.inf)
+        row, column = np.unravel_index(int(np.argmax(score)), caps.shape)
+        quotas[row, column] += 1
+        rows_left[row] -= 1
+        columns_left[column] -= 1
+    return quotas
+
+
+class SubjectPool:
+    """A subject's questions in bank order, grouped into (topic, level) cells"""
+
+    __slots__ = ("ids", "levels", "columns", "priority", "available", "cell_columns", "cell_of")
+
+    def __init__(self, ids: List[str], levels: np.ndarray, topic_of: np.ndarray, priority: np.ndarray):
+        self.ids = ids
+        self.levels = levels
+        self.columns = {question_id: column for column, question_id in enumerate(ids)}
+        self.priority = priority
+        # Cell of a question: topic × number of levels + level index
+        self.cell_of = topic_of * len(DIFFICULTIES) + (levels - DIFFICULTIES[0])
+        cells = len(priority) * len(DIFFICULTIES)
+        self.available = np.bincount(self.cell_of, minlength=cells).reshape(len(priority), len(DIFFICULTIES))
+        order = np.argsort(self.cell_of, kind="stable")
+        self.cell_columns = np.split(order, np.cumsum(self.available.ravel())[:-1])
+
+
+class MockExamGenerator:
+    """Assembles blueprint-shaped mock exams, for one student or a whole cohort at once"""
+
+    def __init__(self, database: "Database", curriculum: "Curriculum",
+                 blueprint: Optional[Dict[str, Any]] = None, difficulty_mix: Optional[Dict[int, float]] = None):
+        self.db = database
+        self.curriculum = curriculum
+        self.blueprint = blueprint or LGS_BLUEPRINT
+        self.difficulty_mix = difficulty_mix or DIFFICULTY_MIX
+        # The question bank does not change while the app runs
+        self._pools: Dict[str, SubjectPool] = {}
+        # (question id → position, subject number, pool column), published in one assignment
+        self._locations: Optional[Tuple[Dict[str, int], np.ndarray, np.ndarray]] = None
+        self._locations_lock = threading.Lock()
+
+    def generate(self, username: str, seed: Optional[int] = None,
+                 exclude_days: int = EXCLUDE_DAYS) -> Dict[str, Any]:
+        """One mock exam for a student"""
+        return self.generate_batch([username], seed, exclude_days)[0]
+
+    def generate_batch(self, usernames: Sequence[str], seed: Optional[int] = None,
+                       exclude_days: int = EXCLUDE_DAYS) -> List[Dict[str, Any]]:
+        """A mock exam per student, each avoiding what that student answered recently
+
+        Exams hold question ids per subject (see ``questions`` to load them),
+        with how many questions are repeats and how many the bank could not
+        supply.
+        """
+        rng = np.random.default_rng(seed)
+        subjects = {subject: count for section in self.blueprint.values()
+                    for subject, count in section['subjects'].items()}
+        quotas = {subject: self._quotas(self._pool(subject), count, rng) for subject, count in subjects.items()}
+        seen = self._recently_seen(usernames, exclude_days)
+
+        exams = [{
+            'username': username,
+            'title': "LGS Deneme",
+            'created_at': datetime.datetime.now().isoformat(timespec="seconds"),
+            'duration': exam_duration(self.blueprint),
+            'sections': [
+                {'name': name, 'duration': section['duration'], 'subjects': list(section['subjects'])}
+                for name, section in self.blueprint.items()
+            ],
+            'questions': {},
+            'difficulty': dict.fromkeys(DIFFICULTIES, 0),
+            'repeats': 0,
+            'missing': {subject: count - int(quotas[subject].sum()) for subject, count in subjects.items()
+                        if quotas[subject].sum() < count}
+        } for username in usernames]
+
+        for subject, subject_quotas in quotas.items():
+            pool = self._pool(subject)
+            seen_rows, seen_columns, seen_recency = seen[subject]
+            for start in range(0, len(exams), STUDENT_CHUNK):
+                chunk = exams[start:start + STUDENT_CHUNK]
+                in_chunk = (seen_rows >= start) & (seen_rows < start + len(chunk))
+                picks, repeats = self._sample(
+                    pool, subject_quotas.ravel(), len(chunk),
+                    seen_rows[in_chunk] - start, seen_columns[in_chunk], seen_recency[in_chunk], rng
+                )
+                levels = pool.levels[picks]
+                level_counts = np.stack([(levels == level).sum(axis=1) for level in DIFFICULTIES], axis=1)
+                for exam, row, counts, repeated in zip(chunk, picks, level_counts, repeats):
+                    exam['questions'][subject] = [pool.ids[column] for column in row]
+                    for level, level_count in zip(DIFFICULTIES, counts):
+                        exam['difficulty'][level] += int(level_count)
+                    exam['repeats'] += int(repeated)
+        return exams
+
+    def questions(self, exam: Dict[str, Any]) -> Dict[str, List[Question]]:
+        """The exam's questions per subject, in paper order"""
+        return {
+            subject: [question for question in map(self.curriculum.get_question_by_id, question_ids) if question]
+            for subject, question_ids in exam['questions'].items()
+        }
+
+    def _quotas(self, pool: SubjectPool, count: int, rng: np.random.Generator) -> np.ndarray:
+        """(topic, level) quota matrix for one exam of ``count`` questions"""
+        topic_available = pool.available.sum(axis=1)
+        # One question per topic first (highest priority first when there are too few), then by priority
+        covered = np.zeros(len(topic_available), dtype=np.int64)
+        for topic in np.argsort(-pool.priority, kind="stable")[:count]:
+            covered[topic] = 1 if topic_available[topic] else 0
+        topic_quotas = covered + apportion(count - covered.sum(), pool.priority, topic_available - covered)
+
+        mix = [self.difficulty_mix.get(level, 0.0) for level in DIFFICULTIES]
+        level_quotas = apportion(topic_quotas.sum(), mix, pool.available.sum(axis=0))
+        return fill_quotas(topic_quotas, level_quotas, pool.available, rng)
+
+    def _sample(self, pool: SubjectPool, quotas: np.ndarray, students: int, seen_rows: np.ndarray,
+                seen_columns: np.ndarray, seen_recency: np.ndarray, rng: np.random.Generator):
+        """(chosen columns per student in bank order, repeats per student) for a chunk of students
+
+        ``seen_recency`` ranks each recently answered question from 1 (longest
+        ago) up; unanswered ones are 0, so sorting a window by it puts fresh
+        questions first and then the oldest repeats.
+        """
+        seen = np.zeros((students, len(pool.ids)), dtype=np.int16)
+        seen[seen_rows, seen_columns] = seen_recency
+        seen_per_cell = np.bincount(
+            seen_rows * len(quotas) + pool.cell_of[seen_columns], minlength=students * len(quotas)
+        ).reshape(students, len(quotas))
+
+        rows = np.arange(students)[:, None]
+        picks, repeats = [], np.zeros(students, dtype=np.int64)
+        for cell in np.flatnonzero(quotas):
+            columns, quota = pool.cell_columns[cell], int(quotas[cell])
+            size = len(columns)
+            # Wide enough to pass every recently answered question of the cell: a window
+            # short of fresh questions is the whole cell, so repeats are the oldest there are
+            width = min(size, quota + int(seen_per_cell[:, cell].max()))
+            shuffled = columns[rng.permutation(size)]
+            window = shuffled[(rng.integers(0, size, (students, 1)) + np.arange(width)) % size]
+            window_seen = seen[rows, window]
+            fresh_first = np.argsort(window_seen, axis=1, kind="stable")[:, :quota]
+            picks.append(np.take_along_axis(window, fresh_first, axis=1))
+            repeats += (np.take_along_axis(window_seen, fresh_first, axis=1) > 0).sum(axis=1)
+        if not picks:
+            return np.zeros((students, 0), dtype=np.int64), repeats
+        return np.sort(np.concatenate(picks, axis=1), axis=1), repeats
+
+    def _recently_seen(self, usernames: Sequence[str], exclude_days: int) -> Dict[str, tuple]:
+        """Per subject, (student rows, pool columns, recency) of the questions answered in the last days"""
+        subjects = [subject for section in self.blueprint.values() for subject in section['subjects']]
+        locations, location_subject, location_column = self._location_index(subjects)
+
+        recent = self.db.get_recent_questions(usernames, exclude_days)
+        answered = [recent[username] for username in usernames]
+        rows = np.repeat(np.arange(len(usernames)), [len(questions) for questions in answered])
+        positions = np.fromiter(
+            map(locations.get, itertools.chain.from_iterable(answered), itertools.repeat(-1)),
+            dtype=np.int64, count=len(rows)
+        )
+        # Recency of a day: 1 for the first day of the window, up to exclude_days + 1 for today
+        since = datetime.date.today() - datetime.timedelta(days=exclude_days)
+        recency = {(since + datetime.timedelta(days=offset)).isoformat(): offset + 1
+                   for offset in range(exclude_days + 1)}
+        days = np.fromiter(
+            map(recency.get, itertools.chain.from_iterable(questions.values() for questions in answered),
+                itertools.repeat(1)),
+            dtype=np.int16, count=len(rows)
+        )
+
+        # Questions outside the blueprint's subjects (or no longer in the bank) are dropped
+        known = positions >= 0
+        rows, positions, days = rows[known], positions[known], days[known]
+        subject_of = location_subject[positions]
+        return {subject: (rows[subject_of == number], location_column[positions[subject_of == number]],
+                          days[subject_of == number])
+                for number, subject in enumerate(subjects)}
+
+    def _location_index(self, subjects: List[str]) -> Tuple[Dict[str, int], np.ndarray, np.ndarray]:
+        """Every blueprint question numbered across the subjects' pools, in blueprint order
+
+        Built once under a lock, since the generator is shared by every session.
+        """
+        index = self._locations
+        if index is None:
+            with self._locations_lock:
+                index = self._locations
+                if index is None:
+                    pools = [self._pool(subject) for subject in subjects]
+                    positions = {question_id: position for position, question_id in
+                                 enumerate(question_id for pool in pools for question_id in pool.ids)}
+                    subject_of = np.repeat(np.arange(len(pools)), [len(pool.ids) for pool in pools])
+                    column_of = np.concatenate([np.arange(len(pool.ids)) for pool in pools])
+                    index = self._locations = (positions, subject_of, column_of)
+        return index
+
+    def _pool(self, subject: str) -> SubjectPool:
+        pool = self._pools.get(subject)
+        if pool is None:
+            pool = self._pools[subject] = self._build_pool(subject)
+        return pool
+
+    def _build_pool(self, subject: str) -> SubjectPool:
+        bank = self.curriculum.question_bank
+        topics = bank.topics(subject)
+        ids, levels, topic_of = [], [], []
+        for number, topic in enumerate(topics):
+            for question_id, level in bank.items(subject, topic):
+                ids.append(question_id)
+                levels.append(level)
+                topic_of.append(number)
+        priority = [self.curriculum.get_topic_priority(subject, topic) for topic in topics]
+        return SubjectPool(ids, np.array(levels, dtype=np.int64), np.array(topic_of, dtype=np.int64),
+                           np.array(priority, dtype=np.float64))
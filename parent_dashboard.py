@@ -9,6 +9,14 @@ class ParentDashboard:
     
     def get_weekly_report(self, username: str) -> Dict[str, Any]:
         """Generate comprehensive weekly report for parents"""
+        # Built once per day and data change, shared by every worker process
+        return self.db.cached_shared(
+            username, ("weekly_report", datetime.date.today()),
+            lambda: self._build_weekly_report(username)
+        )
+    
+    def _build_weekly_report(self, username: str) -> Dict[str, Any]:
+        """Compute the weekly report from the database"""
         
         # Get basic study statistics
         stats = self.db.get_study_stats(username, "week")
@@ -36,36 +44,14 @@ class ParentDashboard:
     
     def _get_daily_study_breakdown(self, username: str) -> Dict[str, int]:
         """Get daily study minutes for the past week"""
-        # This would query the study_sessions table
-        # For demo, generate realistic daily study data
         days = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
-        daily_data = {}
-        
-        for i, day in enumerate(days):
-            # Simulate more study time on weekends, less on weekdays
-            if day in ["Cumartesi", "Pazar"]:
-                base_time = 120  # 2 hours
-            else:
-                base_time = 90   # 1.5 hours
-            
-            # Add some variation
-            variation = (-20 + (i * 5)) if i < 4 else (10 + (i * 5))
-            daily_data[day] = max(0, base_time + variation)
+        daily_minutes = self.db.get_daily_study_minutes(username, days=7)
         
-        return daily_data
+        return {days[date.weekday()]: minutes for date, minutes in daily_minutes.items()}
     
     def _get_subject_performance(self, username: str) -> Dict[str, float]:
         """Get accuracy percentage by subject"""
-        # This would analyze question_attempts table
-        # For demo, return realistic performance data
-        return {
-            "Matematik": 76.5,
-            "Türkçe": 82.0,
-            "Fen Bilimleri": 68.8,
-            "T.C. İnkılap Tarihi": 88.2,
-            "Din Kültürü": 91.5,
-            "İngilizce": 74.3
-        }
+        return self.db.get_subject_accuracy(username, "week")
     
     def _analyze_mistakes(self, username: str) -> List[Dict[str, Any]]:
         """Analyze common mistake patterns"""
@@ -198,8 +184,7 @@ class ParentDashboard:
     
     def _calculate_weekly_points(self, username: str) -> int:
         """Calculate points earned this week"""
-        # This would query achievements and point transactions
-        return 340
+        return self.db.get_points_earned(username, "week")
     
     def get_monthly_overview(self, username: str) -> Dict[str, Any]:
         """Get monthly overview for deeper analysis"""
@@ -1,7 +1,7 @@
 import datetime
-import pandas as pd
 from typing import Dict, List, Any
 from database import Database
+from spaced_repetition import FSRS
 
 class ProgressTracker:
     def __init__(self, database: Database):
@@ -14,17 +14,23 @@ class ProgressTracker:
         }
 
     def get_user_stats(self, username: str) -> Dict[str, Any]:
-        """Get comprehensive user statistics"""
+        """Get comprehensive user statistics (cached until the user's data changes)"""
+        # The streak depends on today's date as well as the user's data
+        return self.db.cached(username, ("user_stats", datetime.date.today()),
+                              lambda: self._compute_user_stats(username))
+
+    def _compute_user_stats(self, username: str) -> Dict[str, Any]:
         stats = self.db.get_study_stats(username, "all")
 
         # Calculate additional metrics
         total_points = self.db.get_user_points(username)
-        level = max(1, total_points // 100)
+        user_data = self.db.get_user_data(username)
 
         return {
             'total_points': total_points,
-            'level': level,
-            'streak': self._calculate_streak(username),
+            'level': self.level_for(total_points),
+            'streak': user_data['study_streak'],
+            'studied_today': user_data['studied_today'],
             'total_study_hours': stats['total_study_time'],
             'questions_solved': stats['questions_solved'],
             'accuracy': stats['accuracy']
@@ -33,7 +39,7 @@ class ProgressTracker:
     def get_progress_data(self, username: str, period: str) -> Dict[str, Any]:
         """Get comprehensive progress data with advanced analytics"""
         stats = self.db.get_study_stats(username, period)
-        user_data = self.db.get_user_data(username) # Assuming this retrieves all relevant user data for analytics
+        user_data = self.db.get_user_data(username)
 
         # Estimate LGS score based on performance
         estimated_score = self._estimate_lgs_score(username, stats)
@@ -48,7 +54,7 @@ class ProgressTracker:
         spaced_repetition_intervals = self.learning_algorithms["spaced_repetition"](stats)
         forgetting_pattern_analysis = self.learning_algorithms["forgetting_curve"](user_data)
         optimal_difficulty_level = self.learning_algorithms["optimal_difficulty"](stats) # Assuming stats contains performance_history equivalent
-        learning_speed_data = self.learning_algorithms["learning_velocity"](user_data.get("recent_sessions", [])) # Assuming user_data contains recent_sessions
+        learning_speed_data = self.learning_algorithms["learning_velocity"](user_data["recent_sessions"])
 
 
         return {
@@ -69,11 +75,14 @@ class ProgressTracker:
             }
         }
 
+    @staticmethod
+    def level_for(total_points: int) -> int:
+        """Level shown for a points total"""
+        return max(1, total_points // 100)
+
     def _calculate_streak(self, username: str) -> int:
         """Calculate current study streak in days"""
-        # This would query the database for consecutive study days
-        # For demo, return a reasonable value
-        return 5
+        return self.db.get_user_data(username)['study_streak']
 
     def _estimate_lgs_score(self, username: str, stats: Dict[str, Any]) -> int:
         """Estimate LGS score based on current performance"""
@@ -128,53 +137,18 @@ class ProgressTracker:
 
     def _calculate_subject_accuracy(self, username: str, period: str) -> Dict[str, float]:
         """Calculate accuracy percentage for each subject"""
-        # This would query question_attempts table
-        # For demo, return sample data
-        return {
-            "Matematik": 78.5,
-            "Türkçe": 82.0,
-            "Fen Bilimleri": 71.2,
-            "T.C. İnkılap Tarihi": 85.5,
-            "Din Kültürü": 88.0,
-            "İngilizce": 76.8
-        }
+        return self.db.get_subject_accuracy(username, period)
 
     def _calculate_points_earned(self, username: str, period: str) -> int:
         """Calculate points earned in specified period"""
-        # This would sum points from achievements table
-        # For demo, return reasonable value based on period
-        if period == "bu_hafta":
-            return 245
-        elif period == "bu_ay":
-            return 980
-        else:
-            return 2450
+        return self.db.get_points_earned(username, period)
 
     def _get_daily_breakdown(self, username: str, period: str) -> Dict[str, int]:
-        """Get daily study time breakdown"""
-        # Generate sample daily data for the last 7 days
-        daily_data = {}
-        for i in range(7):
-            date = datetime.date.today() - datetime.timedelta(days=i)
-            day_name = date.strftime("%A")
-            # Convert to Turkish day names
-            day_turkish = {
-                "Monday": "Pazartesi",
-                "Tuesday": "Salı", 
-                "Wednesday": "Çarşamba",
-                "Thursday": "Perşembe",
-                "Friday": "Cuma",
-                "Saturday": "Cumartesi",
-                "Sunday": "Pazar"
-            }.get(day_name, day_name)
-
-            # Sample study minutes (higher on weekends)
-            if day_name in ["Saturday", "Sunday"]:
-                daily_data[day_turkish] = 90 + (i * 10)
-            else:
-                daily_data[day_turkish] = 60 + (i * 5)
-
-        return daily_data
+        """Get daily study time breakdown for the last 7 days"""
+        day_turkish = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
+
+        daily_minutes = self.db.get_daily_study_minutes(username, days=7)
+        return {day_turkish[date.weekday()]: minutes for date, minutes in daily_minutes.items()}
 
     def _calculate_progress_trend(self, username: str) -> str:
         """Calculate overall progress trend"""
@@ -266,13 +240,11 @@ class ProgressTracker:
             return "3-4 ay sistemli çalışma"
 
     def _calculate_spaced_intervals(self, performance_data):
-        """Performansa göre aralıklı tekrar hesapla"""
-        if performance_data['accuracy'] >= 90:
-            return [1, 4, 10, 20, 40, 90]  # Daha uzun aralıklar
-        elif performance_data['accuracy'] >= 70:
-            return [1, 2, 5, 10, 20, 45]  # Orta aralıklar  
-        else:
-            return [1, 1, 2, 4, 8, 15]   # Kısa aralıklar
+        """Performansa göre aralıklı tekrar hesapla (FSRS)"""
+        # Başarı yüksekse konu kolay sayılır, aralıklar uzar
+        accuracy = performance_data.get('accuracy', 0)
+        difficulty = 10 - 9 * min(max(accuracy, 0), 100) / 100
+        return FSRS().projected_intervals(6, difficulty)
 
     def _analyze_forgetting_pattern(self, user_data):
         """Unutma eğrisi analizi"""
@@ -290,6 +262,13 @@ class ProgressTracker:
                 })
         return retention_rates
 
+    def get_difficulty_mode(self, username: str, subject: str) -> str:
+        """Difficulty mode for the next questions of a subject, from this week's accuracy there"""
+        accuracy = self.db.get_subject_accuracy(username, "week").get(subject)
+        if accuracy is None:
+            return "optimal_zone"  # Henüz veri yok
+        return self._find_optimal_difficulty({'accuracy': accuracy})
+
     def _find_optimal_difficulty(self, performance_history):
         """Optimal zorluk seviyesi bul"""
         # Vygotsky'nin Yakınsal Gelişim Alanı teorisine göre
@@ -0,0 +1,382 @@
+"""
+File-backed question bank for Alex LGS
+
+Questions are written as JSON or CSV source files (``data/questions``) and
+compiled by ``ingest_questions.py`` into one binary pack that ``Curriculum``
+memory-maps. Opening a pack reads only its header and block directory; a
+block (up to BLOCK_SIZE questions of one topic) is decompressed the first
+time one of its questions is needed and kept in a bounded cache (questions
+are built from its rows on access), so startup time and resident memory stay
+flat as the bank grows.
+
+Pack layout (little endian):
+
+    header     magic "ALXQ", format version, question count,
+               directory offset and length, id index offset
+    blocks     zlib-compressed JSON rows of one subject and topic,
+               sorted by difficulty
+    directory  zlib-compressed JSON, one entry per block: subject, topic,
+               offset, length, question count, questions per difficulty
+    id index   sorted 64-bit id hashes, then the (block, row) of each,
+               binary searched in place
+"""
+import csv
+import hashlib
+import json
+import mmap
+import os
+import random
+import re
+import struct
+import tempfile
+import zlib
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from cache import TTLCache
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+MAGIC = b"ALXQ"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHIQIQ")
+BLOCK_SIZE = 64  # Questions per block; a block is the unit of decompression
+DIFFICULTIES = (1, 2, 3, 4, 5)
+DEFAULT_DIFFICULTY = 3  # Questions without a difficulty are medium (1 easiest - 5 hardest)
+SOURCE_EXTENSIONS = (".json", ".csv")
+CSV_OPTION_SEPARATOR = "|"
+
+
+class Question:
+    """One question of the bank
+
+    A compact record (no per-instance dict) that still reads like the dicts
+    it replaced: ``question['text']`` and ``question.get('topic')`` work.
+    """
+    __slots__ = ("id", "subject", "topic", "text", "options", "correct_answer", "explanation", "difficulty")
+
+    def __init__(self, id: str, subject: str, topic: str, text: str, options: Iterable[str],
+                 correct_answer: str, explanation: str = "", difficulty: int = DEFAULT_DIFFICULTY):
+        self.id = id
+        self.subject = subject
+        self.topic = topic
+        self.text = text
+        self.options = tuple(options)
+        self.correct_answer = correct_answer
+        self.explanation = explanation
+        self.difficulty = difficulty
+
+    @classmethod
+    def from_dict(cls, subject: str, data: Dict[str, Any]) -> "Question":
+        return cls(
+            data['id'], data.get('subject', subject), data.get('topic', ""), data['text'],
+            data['options'], data['correct_answer'], data.get('explanation', ""),
+            int(data.get('difficulty', DEFAULT_DIFFICULTY))
+        )
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.__slots__
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"Question({self.id!r}, {self.subject!r}, {self.topic!r})"
+
+
+# Source files
+
+def source_files(path: str) -> List[str]:
+    """JSON and CSV source files at path (a file or a directory, searched recursively)"""
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for root, _, names in os.walk(path):
+        files.extend(os.path.join(root, name) for name in names if name.endswith(SOURCE_EXTENSIONS))
+    return sorted(files)
+
+
+def read_source(path: str) -> Iterator[Dict[str, Any]]:
+    """Questions of one source file, as dicts with a subject field
+
+    JSON is either ``{subject: [question, ...]}`` or a list of questions
+    with a ``subject`` field. CSV has a header row (id, subject, topic,
+    text, options, correct_answer, explanation, difficulty) and options
+    separated by ``|``.
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                row = {key: (value or "").strip() for key, value in row.items() if key}
+                row['options'] = [option.strip() for option in row.get('options', "").split(CSV_OPTION_SEPARATOR) if option.strip()]
+                if not row.get('difficulty'):
+                    row.pop('difficulty', None)
+                yield row
+        return
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        for subject, questions in data.items():
+            for question in questions:
+                yield {'subject': subject, **question}
+    else:
+        yield from data
+
+
+def validate_question(data: Dict[str, Any]) -> List[str]:
+    """Problems that keep a source question out of a pack (empty when it is valid)"""
+    errors = []
+    for field in ("id", "subject", "topic", "text", "correct_answer"):
+        if not str(data.get(field) or "").strip():
+            errors.append(f"missing {field}")
+    options = data.get('options')
+    if not isinstance(options, (list, tuple)) or len(options) < 2:
+        errors.append("needs at least two options")
+    elif data.get('correct_answer') not in options:
+        errors.append("correct_answer is not one of the options")
+    try:
+        if int(data.get('difficulty', DEFAULT_DIFFICULTY)) not in DIFFICULTIES:
+            errors.append("difficulty must be 1-5")
+    except (TypeError, ValueError):
+        errors.append("difficulty must be 1-5")
+    return errors
+
+
+def _content_key(data: Dict[str, Any]) -> Tuple[str, ...]:
+    # Same subject, text and options (ignoring case and spacing) is the same question
+    normalize = lambda value: re.sub(r"\s+", " ", str(value)).strip().casefold()
+    return (normalize(data['subject']), normalize(data['text'])) + tuple(normalize(o) for o in data['options'])
+
+
+def ingest(questions: Iterable[Dict[str, Any]]) -> Tuple[List[Question], List[str]]:
+    """Validate and deduplicate source questions
+
+    Returns the questions to compile and one line per skipped question. The
+    first occurrence of a duplicated id or content wins.
+    """
+    kept: List[Question] = []
+    problems: List[str] = []
+    ids = set()
+    contents = set()
+    for number, data in enumerate(questions, 1):
+        label = data.get('id') or f"#{number}"
+        errors = validate_question(data)
+        if errors:
+            problems.append(f"{label}: {', '.join(errors)}")
+            continue
+        if data['id'] in ids:
+            problems.append(f"{label}: duplicate id")
+            continue
+        content = _content_key(data)
+        if content in contents:
+            problems.append(f"{label}: duplicate of an earlier question")
+            continue
+        ids.add(data['id'])
+        contents.add(content)
+        kept.append(Question.from_dict(data['subject'], data))
+    return kept, problems
+
+
+# Packs
+
+def _id_hash(question_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(question_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def compile_pack(questions: Iterable[Question], path: str) -> Dict[str, Any]:
+    """Write questions to a pack file (atomically replacing any existing one)"""
+    topics: Dict[Tuple[str, str], List[Question]] = {}
+    for question in questions:
+        topics.setdefault((question.subject, question.topic), []).append(question)
+
+    directory = []
+    ids = []
+    directory_dir = os.path.dirname(path) or "."
+    os.makedirs(directory_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"\0" * HEADER.size)
+            for (subject, topic), topic_questions in topics.items():
+                # Sorted by difficulty, so a difficulty bucket is a slice of each block
+                topic_questions.sort(key=lambda q: q.difficulty)
+                for start in range(0, len(topic_questions), BLOCK_SIZE):
+                    chunk = topic_questions[start:start + BLOCK_SIZE]
+                    rows = [[q.id, q.text, list(q.options), q.correct_answer, q.explanation, q.difficulty] for q in chunk]
+                    blob = zlib.compress(json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 9)
+                    counts = [sum(1 for q in chunk if q.difficulty == d) for d in DIFFICULTIES]
+                    ids.extend((_id_hash(q.id), len(directory), row) for row, q in enumerate(chunk))
+                    directory.append([subject, topic, f.tell(), len(blob), len(chunk), counts])
+                    f.write(blob)
+
+            directory_blob = zlib.compress(json.dumps(directory, ensure_ascii=False).encode("utf-8"), 9)
+            directory_offset = f.tell()
+            f.write(directory_blob)
+            f.write(b"\0" * (-f.tell() % 8))  # Align the id index
+            index_offset = f.tell()
+            ids.sort()
+            f.write(np.array([entry[0] for entry in ids], dtype="<u8").tobytes())
+            f.write(np.array([entry[1:] for entry in ids], dtype="<u4").reshape(-1, 2).tobytes())
+
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(ids), directory_offset, len(directory_blob), index_offset))
+        os.chmod(tmp_path, 0o644)
+        # Processes that still map the old pack keep reading it until they reopen
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    return {'questions': len(ids), 'topics': len(topics), 'blocks': len(directory), 'bytes': os.path.getsize(path)}
+
+
+class QuestionPack:
+    """Read-only, memory-mapped question pack; blocks are decoded on first use"""
+
+    def __init__(self, path: str, cache_blocks: int = 256):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.count, directory_offset, directory_length, index_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} question pack")
+
+        # [subject, topic, offset, length, count, questions per difficulty] per block
+        self.blocks: List[list] = json.loads(
+            zlib.decompress(self._mm[directory_offset:directory_offset + directory_length])
+        )
+        self._hashes = np.frombuffer(self._mm, dtype="<u8", count=self.count, offset=index_offset)
+        self._locations = np.frombuffer(
+            self._mm, dtype="<u4", count=2 * self.count, offset=index_offset + 8 * self.count
+        ).reshape(-1, 2)
+        self._by_subject: Dict[str, List[int]] = {}
+        self._by_topic: Dict[Tuple[str, str], List[int]] = {}
+        for number, (subject, topic, *_) in enumerate(self.blocks):
+            self._by_subject.setdefault(subject, []).append(number)
+            self._by_topic.setdefault((subject, topic), []).append(number)
+        self._strata: Dict[tuple, Tuple[List[int], List[int], List[int]]] = {}
+        self._decoded = TTLCache(f"question_pack:{path}", max_entries=cache_blocks)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Question]:
+        """Every question, block by block (for building derived indexes; bypasses the block cache)"""
+        for number, (subject, topic, *_) in enumerate(self.blocks):
+            for question_id, text, options, correct_answer, explanation, difficulty in self._decode(number):
+                yield Question(question_id, subject, topic, text, options, correct_answer, explanation, difficulty)
+
+    def subjects(self) -> List[str]:
+        return list(self._by_subject)
+
+    def topics(self, subject: str) -> List[str]:
+        return [topic for (s, topic) in self._by_topic if s == subject]
+
+    def get(self, question_id: str) -> Optional[Question]:
+        """The question with this id, or None"""
+        target = _id_hash(question_id)
+        position = int(np.searchsorted(self._hashes, np.uint64(target)))
+        # Different ids can share a hash: check every record with it
+        while position < self.count and int(self._hashes[position]) == target:
+            block, row = self._locations[position]
+            question = self._question(int(block), int(row))
+            if question.id == question_id:
+                return question
+            position += 1
+        return None
+
+    def count_questions(self, subject: str, topic: Optional[str] = None, difficulty: Optional[int] = None) -> int:
+        cumulative = self._stratum(subject, topic, difficulty)[2]
+        return cumulative[-1] if cumulative else 0
+
+    def sample(self, subject: str, count: int, topic: Optional[str] = None,
+               difficulty: Optional[int] = None) -> List[Question]:
+        """Up to ``count`` distinct random questions, decoding only the blocks they fall in"""
+        blocks, starts, cumulative = self._stratum(subject, topic, difficulty)
+        total = cumulative[-1] if cumulative else 0
+        questions = []
+        for position in random.sample(range(total), min(count, total)):
+            k = bisect_right(cumulative, position)
+            offset = position - (cumulative[k - 1] if k else 0)
+            questions.append(self._question(blocks[k], starts[k] + offset))
+        return questions
+
+    def items(self, subject: str, topic: Optional[str] = None) -> List[Tuple[str, int]]:
+        """(id, difficulty) of every question of a subject or topic, without building records"""
+        blocks, _, _ = self._stratum(subject, topic, None)
+        return [(row[0], row[5]) for number in blocks for row in self._rows(number)]
+
+    def choice(self, subject: str, topic: Optional[str] = None, difficulty: Optional[int] = None) -> Optional[Question]:
+        questions = self.sample(subject, 1, topic, difficulty)
+        return questions[0] if questions else None
+
+    def close(self):
+        self._decoded.clear()
+        self._hashes = self._locations = None  # Release the buffers before unmapping
+        self._mm.close()
+
+    def _stratum(self, subject: str, topic: Optional[str], difficulty: Optional[int]):
+        """Blocks holding the matching questions, where they start in each block and running totals"""
+        key = (subject, topic, difficulty)
+        stratum = self._strata.get(key)
+        if stratum is None:
+            candidates = self._by_subject.get(subject, []) if topic is None else self._by_topic.get((subject, topic), [])
+            blocks, starts, sizes = [], [], []
+            for number in candidates:
+                counts = self.blocks[number][5]
+                if difficulty is None:
+                    start, size = 0, self.blocks[number][4]
+                elif difficulty in DIFFICULTIES:
+                    start, size = sum(counts[:difficulty - 1]), counts[difficulty - 1]
+                else:
+                    continue
+                if size:
+                    blocks.append(number)
+                    starts.append(start)
+                    sizes.append(size)
+            stratum = self._strata[key] = (blocks, starts, list(accumulate(sizes)))
+        return stratum
+
+    def _question(self, number: int, row: int) -> Question:
+        subject, topic = self.blocks[number][:2]
+        question_id, text, options, correct_answer, explanation, difficulty = self._rows(number)[row]
+        return Question(question_id, subject, topic, text, options, correct_answer, explanation, difficulty)
+
+    def _rows(self, number: int) -> List[list]:
+        return self._decoded.get_or_set(number, lambda: self._decode(number))
+
+    def _decode(self, number: int) -> List[list]:
+        offset, length = self.blocks[number][2:4]
+        return json.loads(zlib.decompress(self._mm[offset:offset + length]))
+
+
+def open_question_bank(path: str, sources: Optional[str] = None, cache_blocks: int = 256) -> QuestionPack:
+    """Open the pack at path, compiling it first when a source file is newer"""
+    files = source_files(sources) if sources and os.path.exists(sources) else []
+    if files and (not os.path.exists(path) or max(map(os.path.getmtime, files)) > os.path.getmtime(path)):
+        questions, problems = ingest(question for file in files for question in read_source(file))
+        for problem in problems:
+            logger.warning(f"Question skipped: {problem}")
+        stats = compile_pack(questions, path)
+        logger.info(f"Question bank compiled: {stats['questions']} questions, {stats['blocks']} blocks → {path}")
+    elif not os.path.exists(path):
+        logger.warning(f"No question bank at {path} and no sources at {sources}; starting empty")
+        compile_pack([], path)
+    return QuestionPack(path, cache_blocks)
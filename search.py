@@ -0,0 +1,371 @@
+"""
+Turkish full-text search over lessons and questions
+
+The index is built when the question pack is compiled (or found out of date
+at startup) and saved next to it as ``<pack>.search``. Queries run on a
+memory map of the file, so opening it only reads its table of contents.
+
+Matching is Turkish-aware: ``I`` lowercases to ``ı`` and ``İ`` to ``i``
+(``str.lower`` gets both wrong), then accents are dropped, so ``SAYISI``,
+``sayısı`` and ``sayisi`` are the same word. A light stemmer strips common
+inflectional suffixes (``denklemlerin`` -> ``denklem``). Documents are
+ranked with BM25; each posting stores its precomputed BM25 weight, so a
+query only sums weights, and the character spans of its occurrences, so
+results are highlighted without tokenizing them again.
+Topic names have a prefix index for autocomplete.
+"""
+import functools
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+from bisect import bisect_left
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from logger import get_logger
+from question_bank import QuestionPack
+
+logger = get_logger(__name__)
+
+MAGIC = b"ALXS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHQI")  # magic, version, reserved, table of contents offset and length
+KINDS = ("question", "lesson")
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TURKISH_UPPER = str.maketrans({"I": "ı", "İ": "i"})
+_ASCII_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+# A suffix after an apostrophe (Atatürk'ün, 12'nin) belongs to the word
+_WORD = re.compile(r"(\w+)(?:['’]\w+)?")
+_MARKDOWN = re.compile(r"[#*_`>|]+")
+_SPACES = re.compile(r"\s+")
+
+STOPWORDS = frozenset({
+    "ve", "veya", "ile", "bir", "bu", "su", "o", "da", "de", "ki", "mi", "mu", "ne", "icin",
+    "gibi", "daha", "cok", "en", "her", "hangi", "hangisi", "olan", "olarak", "ya", "ama",
+})
+# Inflectional suffixes after folding (ı/i and u/ü merge), longest first
+SUFFIXES = tuple(sorted({
+    "ler", "lar",                                        # plural
+    "nin", "nun", "in", "un",                            # genitive
+    "yi", "yu", "ni", "nu", "i", "u",                    # accusative
+    "ye", "ya", "ne", "na", "e", "a",                    # dative
+    "nde", "nda", "de", "da", "te", "ta",                # locative
+    "nden", "ndan", "den", "dan", "ten", "tan",          # ablative
+    "yle", "yla", "le", "la",                            # instrumental
+    "si", "su", "im", "um", "imiz", "umuz", "iniz", "unuz",  # possessive
+    "dir", "dur", "tir", "tur",                          # copula
+}, key=len, reverse=True))
+MIN_STEM = 3
+
+
+def fold(text: str) -> str:
+    """Turkish lowercase without accents"""
+    return text.translate(_TURKISH_UPPER).lower().translate(_ASCII_FOLD)
+
+
+def stem(word: str) -> str:
+    """Strip up to two inflectional suffixes from a folded word, keeping MIN_STEM letters"""
+    for _ in range(2):
+        for suffix in SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+                word = word[:-len(suffix)]
+                break
+        else:
+            break
+    return word
+
+
+@functools.lru_cache(maxsize=65536)
+def _term(word: str) -> Optional[str]:
+    # Folding and stemming a word is the bulk of indexing time, and words repeat
+    word = fold(word)
+    return None if word in STOPWORDS else stem(word)
+
+
+def tokenize(text: str) -> Iterator[Tuple[str, int, int]]:
+    """(term, start, end) of every indexed word; spans point into the original text"""
+    for match in _WORD.finditer(text):
+        term = _term(match.group(1))
+        if term is not None:
+            yield term, match.start(), match.end()
+
+
+def query_terms(query: str) -> List[str]:
+    return list(dict.fromkeys(term for term, _, _ in tokenize(query)))
+
+
+def highlight(text: str, spans: Iterable[Tuple[int, int]], width: int = 200) -> str:
+    """Markdown snippet of text around the first span, with the spans in bold"""
+    spans = sorted(set(spans))
+    if not spans:
+        return _plain(text[:width]) + ("…" if len(text) > width else "")
+    start = max(0, spans[0][0] - width // 4)
+    end = min(len(text), start + width)
+    parts = ["…" if start else ""]
+    cursor = start
+    for span_start, span_end in spans:
+        if span_start < cursor or span_end > end:
+            continue
+        parts.append(_plain(text[cursor:span_start]))
+        parts.append(f"**{text[span_start:span_end]}**")
+        cursor = span_end
+    parts.append(_plain(text[cursor:end]))
+    parts.append("…" if end < len(text) else "")
+    return "".join(parts).strip()
+
+
+def _plain(text: str) -> str:
+    # Markdown in lesson text would break the snippet's own formatting
+    return _SPACES.sub(" ", _MARKDOWN.sub("", text))
+
+
+def _topic_keys(subject: str, topic: str) -> Iterator[Tuple[str, int, str, str]]:
+    # One key per word of the name, so "denk" also finds "Doğrusal Denklemler"
+    name = fold(topic)
+    for rank, match in enumerate(re.finditer(r"\w+", name)):
+        yield name[match.start():], rank, subject, topic
+
+
+def build_search_index(path: str, documents: Iterable[Dict[str, str]], topics: Iterable[Tuple[str, str]],
+                       meta: Dict[str, Any]) -> Dict[str, int]:
+    """Write the index of documents (kind, ref, subject, topic, title, text) to path"""
+    postings: Dict[str, Dict[int, List[Tuple[int, int]]]] = {}
+    lengths, kinds, blobs = [], [], []
+    for doc_id, document in enumerate(documents):
+        length = 0
+        for term, start, end in tokenize(document['text']):
+            postings.setdefault(term, {}).setdefault(doc_id, []).append((start, end))
+            length += 1
+        lengths.append(length)
+        kinds.append(KINDS.index(document['kind']))
+        blobs.append(json.dumps(
+            [document['kind'], document['ref'], document['subject'], document['topic'], document['title'], document['text']],
+            ensure_ascii=False
+        ).encode("utf-8"))
+
+    terms = sorted(postings)
+    term_bytes = [term.encode("utf-8") for term in terms]
+    average_length = sum(lengths) / len(lengths) if lengths else 1.0
+    term_postings, post_docs, post_weights, post_spans, spans = [0], [], [], [0], []
+    for term in terms:
+        documents_with_term = postings[term]
+        idf = math.log(1 + (len(lengths) - len(documents_with_term) + 0.5) / (len(documents_with_term) + 0.5))
+        for doc_id, occurrences in sorted(documents_with_term.items()):
+            tf = len(occurrences)
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc_id] / average_length)
+            post_docs.append(doc_id)
+            post_weights.append(idf * tf * (BM25_K1 + 1) / (tf + norm))
+            spans.extend(chain.from_iterable(occurrences))
+            post_spans.append(len(spans) // 2)
+        term_postings.append(len(post_docs))
+
+    sections = {
+        'term_offsets': np.cumsum([0] + [len(b) for b in term_bytes], dtype="<u8"),
+        'terms': b"".join(term_bytes),
+        'term_postings': np.array(term_postings, dtype="<u4"),
+        'post_docs': np.array(post_docs, dtype="<u4"),
+        'post_weights': np.array(post_weights, dtype="<f4"),
+        'post_spans': np.array(post_spans, dtype="<u4"),
+        'spans': np.array(spans, dtype="<u4"),
+        'doc_kinds': np.array(kinds, dtype="<u1"),
+        'doc_offsets': np.cumsum([0] + [len(b) for b in blobs], dtype="<u8"),
+        'docs': b"".join(blobs),
+    }
+    topic_keys = sorted({key for subject, topic in topics for key in _topic_keys(subject, topic)})
+    toc = {
+        'meta': meta,
+        'documents': len(lengths),
+        'terms': len(terms),
+        'topics': topic_keys,
+        'sections': {},
+    }
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"\0" * HEADER.size)
+            for name, data in sections.items():
+                f.write(b"\0" * (-f.tell() % 8))  # numpy views need aligned offsets
+                raw = data if isinstance(data, bytes) else data.tobytes()
+                toc['sections'][name] = [f.tell(), len(raw)]
+                f.write(raw)
+            toc_blob = json.dumps(toc, ensure_ascii=False).encode("utf-8")
+            toc_offset = f.tell()
+            f.write(toc_blob)
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, toc_offset, len(toc_blob)))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return {'documents': toc['documents'], 'terms': toc['terms'], 'bytes': os.path.getsize(path)}
+
+
+class SearchIndex:
+    """Memory-mapped BM25 index built by build_search_index"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, toc_offset, toc_length = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} search index")
+        toc = json.loads(self._mm[toc_offset:toc_offset + toc_length])
+        self.meta = toc['meta']
+        self.documents = toc['documents']
+        self.terms = toc['terms']
+        self.topics = toc['topics']
+        self._topic_keys = [entry[0] for entry in self.topics]
+
+        def section(name, dtype):
+            offset, length = toc['sections'][name]
+            return np.frombuffer(self._mm, dtype=dtype, count=length // np.dtype(dtype).itemsize, offset=offset)
+
+        self._term_offsets = section('term_offsets', "<u8")
+        self._terms_offset = toc['sections']['terms'][0]
+        self._term_postings = section('term_postings', "<u4")
+        self._post_docs = section('post_docs', "<u4")
+        self._post_weights = section('post_weights', "<f4")
+        self._post_spans = section('post_spans', "<u4")
+        self._spans = section('spans', "<u4").reshape(-1, 2)
+        self._doc_kinds = section('doc_kinds', "<u1")
+        self._doc_offsets = section('doc_offsets', "<u8")
+        self._docs_offset = toc['sections']['docs'][0]
+
+    def search(self, query: str, limit: int = 10, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Best matching documents for the query, with highlighted snippets"""
+        term_ids = [term_id for term_id in map(self._term_id, query_terms(query)) if term_id is not None]
+        if not term_ids or not self.documents:
+            return []
+
+        scores = np.zeros(self.documents, dtype=np.float32)
+        candidates = []
+        for term_id in term_ids:
+            first, last = int(self._term_postings[term_id]), int(self._term_postings[term_id + 1])
+            docs = self._post_docs[first:last]
+            # Doc ids are unique within a posting list, so fancy-index addition is safe
+            scores[docs] += self._post_weights[first:last]
+            candidates.append(docs)
+        candidates = candidates[0] if len(candidates) == 1 else np.concatenate(candidates)
+        if kind is not None:
+            candidates = candidates[self._doc_kinds[candidates] == KINDS.index(kind)]
+
+        # Rank only the matching documents (a document matching n terms is listed n times)
+        keep = limit * len(term_ids)
+        if len(candidates) > keep:
+            candidates = candidates[np.argpartition(scores[candidates], -keep)[-keep:]]
+        matches = sorted(set(candidates.tolist()), key=lambda doc_id: (-scores[doc_id], doc_id))[:limit]
+
+        results = []
+        for doc_id in matches:
+            kind_name, ref, subject, topic, title, text = self._document(doc_id)
+            results.append({
+                'kind': kind_name,
+                'ref': ref,
+                'subject': subject,
+                'topic': topic,
+                'title': title,
+                'score': round(float(scores[doc_id]), 3),
+                'snippet': highlight(text, self._occurrences(doc_id, term_ids)),
+            })
+        return results
+
+    def suggest_topics(self, prefix: str, limit: int = 8) -> List[Dict[str, str]]:
+        """Topics with a word starting with prefix (name starts first)"""
+        key = fold(prefix).strip()
+        if not key:
+            return []
+        found = {}
+        position = bisect_left(self._topic_keys, key)
+        while position < len(self.topics) and self._topic_keys[position].startswith(key):
+            _, rank, subject, topic = self.topics[position]
+            found[(subject, topic)] = min(rank, found.get((subject, topic), rank))
+            position += 1
+        ordered = sorted(found, key=lambda pair: (found[pair], pair[1]))
+        return [{'subject': subject, 'topic': topic} for subject, topic in ordered[:limit]]
+
+    def close(self):
+        for name in ("_term_offsets", "_term_postings", "_post_docs", "_post_weights", "_post_spans",
+                     "_spans", "_doc_kinds", "_doc_offsets"):
+            setattr(self, name, None)  # Release the buffers before unmapping
+        self._mm.close()
+
+    def _term(self, term_id: int) -> bytes:
+        start = self._terms_offset + int(self._term_offsets[term_id])
+        return self._mm[start:self._terms_offset + int(self._term_offsets[term_id + 1])]
+
+    def _term_id(self, term: str) -> Optional[int]:
+        """Binary search of the sorted term table (UTF-8 bytes sort like the strings)"""
+        target = term.encode("utf-8")
+        low, high = 0, self.terms
+        while low < high:
+            middle = (low + high) // 2
+            if self._term(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < self.terms and self._term(low) == target else None
+
+    def _occurrences(self, doc_id: int, term_ids: List[int]) -> List[Tuple[int, int]]:
+        spans = []
+        for term_id in term_ids:
+            first, last = int(self._term_postings[term_id]), int(self._term_postings[term_id + 1])
+            position = first + int(np.searchsorted(self._post_docs[first:last], doc_id))
+            if position < last and self._post_docs[position] == doc_id:
+                start, end = int(self._post_spans[position]), int(self._post_spans[position + 1])
+                spans.extend(map(tuple, self._spans[start:end].tolist()))
+        return spans
+
+    def _document(self, doc_id: int) -> list:
+        start = self._docs_offset + int(self._doc_offsets[doc_id])
+        return json.loads(self._mm[start:self._docs_offset + int(self._doc_offsets[doc_id + 1])])
+
+
+def search_index_path(pack_path: str) -> str:
+    """Where the search index of a question pack lives"""
+    return os.path.splitext(pack_path)[0] + ".search"
+
+
+def open_search_index(path: str, pack: QuestionPack, lessons: Dict[str, Dict[str, str]],
+                      topics: Dict[str, List[str]]) -> SearchIndex:
+    """Open the index at path, rebuilding it when the pack or the lessons changed"""
+    stat = os.stat(pack.path)
+    meta = {
+        'pack': [stat.st_size, stat.st_mtime_ns],
+        'lessons': hashlib.blake2b(json.dumps(lessons, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest(),
+    }
+    if os.path.exists(path):
+        try:
+            index = SearchIndex(path)
+            if index.meta == meta:
+                return index
+            index.close()
+        except ValueError as e:
+            logger.warning(f"Rebuilding search index: {e}")
+
+    documents = chain(
+        ({'kind': "question", 'ref': q.id, 'subject': q.subject, 'topic': q.topic,
+          'title': f"{q.subject} · {q.topic}", 'text': "\n".join((q.text,) + q.options)} for q in pack),
+        ({'kind': "lesson", 'ref': f"{subject}/{topic}", 'subject': subject, 'topic': topic,
+          'title': topic, 'text': content}
+         for subject, subject_lessons in lessons.items() for topic, content in subject_lessons.items())
+    )
+    topic_names = {(subject, topic) for subject, names in topics.items() for topic in names}
+    topic_names.update((subject, topic) for subject in pack.subjects() for topic in pack.topics(subject))
+    stats = build_search_index(path, documents, topic_names, meta)
+    logger.info(f"Search index built: {stats['documents']} documents, {stats['terms']} terms → {path}")
+    return SearchIndex(path)
@@ -0,0 +1,100 @@
+"""
+Process-wide shared services for the Streamlit app
+
+Streamlit reruns app.py for every browser session, so services built in
+session state were rebuilt per session (a database pool, an OpenAI client,
+the curriculum...). The services here hold no per-user state; each is
+created once per process with ``st.cache_resource`` and shared by every
+session. Per-user state (login, mind maps, memory palaces) stays in
+``st.session_state``.
+
+Service modules are imported inside their getters, so a page only loads
+the dependencies (openai, requests...) of the services it uses.
+"""
+from typing import TYPE_CHECKING
+
+import streamlit as st
+
+if TYPE_CHECKING:
+    from adaptive import AdaptiveSelector
+    from alex_ai import AlexAI
+    from curriculum import Curriculum
+    from database import Database
+    from fenerbahce_integration import FenerbahceIntegration
+    from gamification import Gamification
+    from mock_exam import MockExamGenerator
+    from parent_dashboard import ParentDashboard
+    from progress_tracker import ProgressTracker
+    from study_planner import StudyPlanner
+    from voice_synthesis import VoiceSynthesis
+
+
+@st.cache_resource
+def get_database() -> "Database":
+    from backup import start_backup_scheduler
+    from config import config
+    from database import Database
+
+    db = Database(write_behind=config.DATABASE_WRITE_BEHIND)
+    start_backup_scheduler()
+    return db
+
+
+@st.cache_resource
+def get_alex() -> "AlexAI":
+    from alex_ai import AlexAI
+    return AlexAI()
+
+
+@st.cache_resource
+def get_curriculum() -> "Curriculum":
+    from curriculum import Curriculum
+    return Curriculum()
+
+
+@st.cache_resource
+def get_gamification() -> "Gamification":
+    from gamification import Gamification
+    return Gamification(get_database())
+
+
+@st.cache_resource
+def get_fenerbahce() -> "FenerbahceIntegration":
+    from fenerbahce_integration import FenerbahceIntegration
+    return FenerbahceIntegration()
+
+
+@st.cache_resource
+def get_progress_tracker() -> "ProgressTracker":
+    from progress_tracker import ProgressTracker
+    return ProgressTracker(get_database())
+
+
+@st.cache_resource
+def get_parent_dashboard() -> "ParentDashboard":
+    from parent_dashboard import ParentDashboard
+    return ParentDashboard(get_database())
+
+
+@st.cache_resource
+def get_study_planner() -> "StudyPlanner":
+    from study_planner import StudyPlanner
+    return StudyPlanner(get_database(), get_mock_exam_generator())
+
+
+@st.cache_resource
+def get_voice() -> "VoiceSynthesis":
+    from voice_synthesis import VoiceSynthesis
+    return VoiceSynthesis()
+
+
+@st.cache_resource
+def get_adaptive_selector() -> "AdaptiveSelector":
+    from adaptive import AdaptiveSelector
+    return AdaptiveSelector(get_database(), get_curriculum())
+
+
+@st.cache_resource
+def get_mock_exam_generator() -> "MockExamGenerator":
+    from mock_exam import MockExamGenerator
+    return MockExamGenerator(get_database(), get_curriculum())
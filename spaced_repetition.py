@@ -0,0 +1,230 @@
+"""
+FSRS spaced repetition scheduling for Alex LGS
+
+Implements the FSRS-4.5 memory model: every card (a user's topic) carries a
+stability S (days until recall probability falls to 90%) and a difficulty D
+in [1, 10]. A review updates both in constant time from the answer grade and
+the retrievability at review time, and the next interval is the time at which
+recall probability reaches the desired retention.
+
+Answers in the app are right or wrong, so they map to the grades Good (3) and
+Again (1). ``fit_weights`` tunes the weights that matter for those two grades
+on a user's own review history; ``replay_states`` and ``batch_due_dates``
+recompute card state and due dates for many cards at once after re-tuning.
+"""
+import datetime
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+AGAIN, HARD, GOOD, EASY = 1, 2, 3, 4
+
+DECAY = -0.5
+FACTOR = 19 / 81  # Makes R(t = S) = 0.9
+
+# FSRS-4.5 default weights
+DEFAULT_WEIGHTS: Tuple[float, ...] = (
+    0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474,
+    0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755
+)
+DEFAULT_RETENTION = 0.9
+MAX_INTERVAL_DAYS = 365
+
+MIN_STABILITY = 0.01
+MAX_STABILITY = 36500.0
+
+# Weights a right/wrong history can inform: initial stability for Again/Good,
+# recall growth (w8-w10) and post-lapse stability (w11, w14)
+TUNABLE_WEIGHTS = (0, 2, 8, 9, 10, 11, 14)
+
+
+class CardState(NamedTuple):
+    stability: float
+    difficulty: float
+    interval_days: int
+    due_date: datetime.date
+
+
+def grade_from_answer(is_correct: bool) -> int:
+    """Map a right/wrong answer to an FSRS grade"""
+    return GOOD if is_correct else AGAIN
+
+
+class FSRS:
+    """FSRS-4.5 scheduler for one set of weights and a desired retention"""
+
+    def __init__(self, weights: Optional[Sequence[float]] = None,
+                 desired_retention: float = DEFAULT_RETENTION, max_interval: int = MAX_INTERVAL_DAYS):
+        self.w = tuple(weights or DEFAULT_WEIGHTS)
+        self.desired_retention = desired_retention
+        self.max_interval = max_interval
+
+    def retrievability(self, elapsed_days: float, stability: float) -> float:
+        """Probability of recall ``elapsed_days`` after the last review"""
+        return (1 + FACTOR * elapsed_days / stability) ** DECAY
+
+    def next_interval(self, stability: float) -> int:
+        """Days until retrievability drops to the desired retention"""
+        interval = stability / FACTOR * (self.desired_retention ** (1 / DECAY) - 1)
+        return int(min(max(round(interval), 1), self.max_interval))
+
+    def initial_difficulty(self, grade: int) -> float:
+        return _clamp(self.w[4] - (grade - 3) * self.w[5], 1.0, 10.0)
+
+    def initial_state(self, grade: int) -> Tuple[float, float]:
+        """(stability, difficulty) after the first review of a new card"""
+        return max(self.w[grade - 1], MIN_STABILITY), self.initial_difficulty(grade)
+
+    def next_difficulty(self, difficulty: float, grade: int) -> float:
+        # Mean reversion towards the initial difficulty of a Good answer
+        updated = difficulty - self.w[6] * (grade - 3)
+        return _clamp(self.w[7] * self.initial_difficulty(GOOD) + (1 - self.w[7]) * updated, 1.0, 10.0)
+
+    def next_stability(self, stability: float, difficulty: float, retrievability: float, grade: int) -> float:
+        w = self.w
+        if grade == AGAIN:
+            forgotten = (w[11] * difficulty ** -w[12] * ((stability + 1) ** w[13] - 1)
+                         * np.exp(w[14] * (1 - retrievability)))
+            return _clamp(min(forgotten, stability), MIN_STABILITY, MAX_STABILITY)
+        hard_penalty = w[15] if grade == HARD else 1.0
+        easy_bonus = w[16] if grade == EASY else 1.0
+        growth = (np.exp(w[8]) * (11 - difficulty) * stability ** -w[9]
+                  * (np.exp(w[10] * (1 - retrievability)) - 1) * hard_penalty * easy_bonus)
+        return _clamp(stability * (1 + growth), MIN_STABILITY, MAX_STABILITY)
+
+    def review(self, stability: Optional[float], difficulty: Optional[float],
+               last_review: Optional[datetime.date], grade: int,
+               today: Optional[datetime.date] = None) -> CardState:
+        """New card state after one review; O(1), no history needed"""
+        today = today or datetime.date.today()
+        if stability is None or difficulty is None or last_review is None:
+            stability, difficulty = self.initial_state(grade)
+        else:
+            elapsed = max((today - last_review).days, 0)
+            retrievability = self.retrievability(elapsed, stability)
+            stability = self.next_stability(stability, difficulty, retrievability, grade)
+            difficulty = self.next_difficulty(difficulty, grade)
+
+        interval = self.next_interval(stability)
+        return CardState(float(stability), float(difficulty), interval, today + datetime.timedelta(days=interval))
+
+    def projected_intervals(self, reviews: int = 6, difficulty: Optional[float] = None) -> List[int]:
+        """Intervals for a card answered correctly every time it comes due"""
+        stability, initial_difficulty = self.initial_state(GOOD)
+        difficulty = initial_difficulty if difficulty is None else difficulty
+        intervals = []
+        for _ in range(reviews):
+            interval = self.next_interval(stability)
+            intervals.append(interval)
+            retrievability = self.retrievability(interval, stability)
+            stability = self.next_stability(stability, difficulty, retrievability, GOOD)
+        return intervals
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return float(min(max(value, low), high))
+
+
+def batch_due_dates(stability: np.ndarray, last_review_ordinal: np.ndarray,
+                    desired_retention: float = DEFAULT_RETENTION,
+                    max_interval: int = MAX_INTERVAL_DAYS) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorised next_interval for many cards; returns (interval days, due date ordinals)"""
+    intervals = np.rint(np.asarray(stability, dtype=float) / FACTOR * (desired_retention ** (1 / DECAY) - 1))
+    intervals = np.clip(intervals, 1, max_interval).astype(np.int64)
+    return intervals, np.asarray(last_review_ordinal, dtype=np.int64) + intervals
+
+
+def _pack(histories: Sequence[Sequence[Tuple[int, int]]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pad histories into (elapsed, grades, mask) arrays of shape (n, longest history)"""
+    length = max(len(history) for history in histories)
+    elapsed = np.zeros((len(histories), length))
+    grades = np.full((len(histories), length), GOOD, dtype=np.int64)
+    mask = np.zeros((len(histories), length), dtype=bool)
+    for row, history in enumerate(histories):
+        days, marks = zip(*history)
+        elapsed[row, :len(history)] = days
+        grades[row, :len(history)] = marks
+        mask[row, :len(history)] = True
+    return elapsed, grades, mask
+
+
+def _replay(weights: np.ndarray, elapsed: np.ndarray, grades: np.ndarray,
+            mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Replay n review sequences under k weight vectors at once
+
+    weights: (k, 17); elapsed, grades, mask: (n, L). Returns the mean log loss
+    of the recall predictions per weight vector (k,) and the final stability
+    and difficulty of every sequence (k, n).
+    """
+    w = weights[:, :, None]  # (k, 17, 1) so that w[:, i] broadcasts over sequences
+    first = grades[:, 0]
+    stability = np.maximum(weights[:, first - 1], MIN_STABILITY)
+    difficulty = np.clip(w[:, 4] - (first - 3) * w[:, 5], 1, 10)
+    good_difficulty = np.clip(w[:, 4], 1, 10)
+
+    total = np.zeros(weights.shape[0])
+    count = 0
+    for i in range(1, grades.shape[1]):
+        active = mask[:, i]
+        grade = grades[:, i]
+        recalled = grade > AGAIN
+        retrievability = np.clip((1 + FACTOR * elapsed[:, i] / stability) ** DECAY, 1e-6, 1 - 1e-6)
+        loss = -np.where(recalled, np.log(retrievability), np.log(1 - retrievability))
+        total += (loss * active).sum(axis=1)
+        count += active.sum()
+
+        growth = (np.exp(w[:, 8]) * (11 - difficulty) * stability ** -w[:, 9]
+                  * (np.exp(w[:, 10] * (1 - retrievability)) - 1))
+        recall_stability = stability * (1 + growth)
+        lapse_stability = np.minimum(
+            w[:, 11] * difficulty ** -w[:, 12] * ((stability + 1) ** w[:, 13] - 1)
+            * np.exp(w[:, 14] * (1 - retrievability)),
+            stability
+        )
+        new_stability = np.clip(np.where(recalled, recall_stability, lapse_stability), MIN_STABILITY, MAX_STABILITY)
+        new_difficulty = np.clip(
+            w[:, 7] * good_difficulty + (1 - w[:, 7]) * (difficulty - w[:, 6] * (grade - 3)), 1, 10
+        )
+        stability = np.where(active, new_stability, stability)
+        difficulty = np.where(active, new_difficulty, difficulty)
+
+    return total / max(count, 1), stability, difficulty
+
+
+def replay_states(histories: Sequence[Sequence[Tuple[int, int]]],
+                  weights: Optional[Sequence[float]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Final (stability, difficulty) of each history under one set of weights"""
+    if not histories:
+        return np.zeros(0), np.zeros(0)
+    weights = np.array(weights or DEFAULT_WEIGHTS, dtype=float)[None, :]
+    _, stability, difficulty = _replay(weights, *_pack(histories))
+    return stability[0], difficulty[0]
+
+
+def fit_weights(histories: Sequence[Sequence[Tuple[int, int]]],
+                weights: Optional[Sequence[float]] = None,
+                rounds: int = 3, max_length: int = 64) -> Tuple[Tuple[float, ...], float, float]:
+    """Tune TUNABLE_WEIGHTS to a user's review histories by coordinate search
+
+    Each history is a list of (days since previous review, grade), oldest
+    first. Returns (weights, log loss before, log loss after).
+    """
+    histories = [history[-max_length:] for history in histories if len(history) >= 2]
+    current = np.array(weights or DEFAULT_WEIGHTS, dtype=float)
+    if not histories:
+        return tuple(float(value) for value in current), 0.0, 0.0
+
+    elapsed, grades, mask = _pack(histories)
+    initial_loss = best_loss = float(_replay(current[None, :], elapsed, grades, mask)[0][0])
+    scales = np.array([0.5, 0.7, 0.85, 1.0, 1.2, 1.5, 2.0])
+    for _ in range(rounds):
+        for index in TUNABLE_WEIGHTS:
+            candidates = np.repeat(current[None, :], len(scales), axis=0)
+            candidates[:, index] = current[index] * scales
+            losses = _replay(candidates, elapsed, grades, mask)[0]
+            best = int(np.argmin(losses))
+            if losses[best] < best_loss:
+                best_loss = float(losses[best])
+                current = candidates[best]
+
+    return tuple(float(value) for value in current), initial_loss, best_loss
@@ -0,0 +1,183 @@
+"""
+Storage backends for the Alex LGS database
+
+``backend_from_url`` maps ``DATABASE_URL`` to a backend that opens
+sqlite3-compatible DB-API connections. ``database.ConnectionPool`` pools
+those connections, so pooling, transactions and write-behind batching work
+the same on every backend.
+
+Supported URLs:
+    sqlite:///alex_lgs.db          file database (relative path)
+    sqlite:////data/alex_lgs.db    file database (absolute path)
+    sqlite:// or sqlite:///:memory:  in-memory database shared by all connections
+    memory://<name>                named shared in-memory database
+    libsql://host, http(s)://host  networked libSQL/sqld server
+"""
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from config import config
+
+# Connection tuning applied to every pooled SQLite connection
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",        # Readers never block the single writer
+    "synchronous": "NORMAL",      # Safe with WAL, one fsync per checkpoint instead of per commit
+    "cache_size": -20000,         # ~20 MB page cache per connection
+    "mmap_size": 268435456,       # 256 MB memory-mapped I/O
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000          # Wait up to 5 s for a lock instead of failing with "database is locked"
+}
+
+
+class StorageBackend:
+    """Opens connections for one database; ``key`` identifies it process-wide"""
+
+    name = "base"
+    key: str
+    max_connections = 8  # Pool size
+
+    def connect(self) -> Any:
+        """Open a new connection in autocommit mode"""
+        raise NotImplementedError
+
+    def configure(self, conn: Any):
+        """Per-connection setup run once after connect()"""
+
+    def describe(self) -> str:
+        return f"{self.name}:{self.key}"
+
+
+class SQLiteFileBackend(StorageBackend):
+    """Local SQLite file tuned for concurrent readers (WAL)"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.key = os.path.abspath(path)
+
+    def connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(
+            self.path,
+            timeout=SQLITE_PRAGMAS["busy_timeout"] / 1000,
+            check_same_thread=False,
+            isolation_level=None  # Transactions are managed by the pool
+        )
+
+    def configure(self, conn: sqlite3.Connection):
+        for pragma, value in SQLITE_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+
+
+class SQLiteMemoryBackend(SQLiteFileBackend):
+    """Shared in-memory SQLite for tests and benchmarks
+
+    Every connection with the same name sees the same database. It uses the
+    ``memdb`` VFS rather than ``cache=shared``: shared-cache table locks fail
+    at once instead of honouring the busy timeout, while memdb uses ordinary
+    database locking. A keeper connection holds the database open for the
+    lifetime of the backend.
+    """
+
+    name = "memory"
+
+    def __init__(self, memory_name: str = "alex_lgs"):
+        self.memory_name = memory_name
+        self.path = f"file:/{memory_name}?vfs=memdb"
+        self.key = f"memory:{memory_name}"
+        self._keeper = self.connect()
+
+    def describe(self) -> str:
+        return self.key
+
+    def connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(
+            self.path,
+            uri=True,
+            timeout=SQLITE_PRAGMAS["busy_timeout"] / 1000,
+            check_same_thread=False,
+            isolation_level=None
+        )
+
+    def configure(self, conn: sqlite3.Connection):
+        # WAL and mmap do not apply to memory databases
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute(f"PRAGMA busy_timeout = {SQLITE_PRAGMAS['busy_timeout']}")
+
+
+class LibSQLBackend(StorageBackend):
+    """Networked libSQL (sqld) server, e.g. the ``libsql`` docker-compose service
+
+    Uses the optional ``libsql-experimental`` package, whose connections follow
+    the sqlite3 API and SQL dialect, so queries and migrations are shared with
+    the SQLite backends. With ``replica_path`` set, reads are served from a
+    local embedded replica that is synced with the server.
+    """
+
+    name = "libsql"
+
+    def __init__(self, url: str, auth_token: str = "", replica_path: Optional[str] = None):
+        self.url = url
+        self.auth_token = auth_token
+        self.replica_path = replica_path
+        self.key = url
+
+    def connect(self) -> Any:
+        try:
+            import libsql_experimental as libsql
+        except ImportError as e:
+            raise RuntimeError(
+                "DATABASE_URL points to a libSQL server but libsql-experimental is not installed "
+                "(pip install libsql-experimental)"
+            ) from e
+
+        if self.replica_path:
+            conn = libsql.connect(self.replica_path, sync_url=self.url, auth_token=self.auth_token,
+                                  isolation_level=None)
+            conn.sync()
+            return conn
+        return libsql.connect(self.url, auth_token=self.auth_token, isolation_level=None)
+
+
+_memory_backends: Dict[str, SQLiteMemoryBackend] = {}
+_memory_lock = threading.Lock()
+
+
+def memory_backend(name: str) -> SQLiteMemoryBackend:
+    """Return the process-wide in-memory backend with this name"""
+    with _memory_lock:
+        backend = _memory_backends.get(name)
+        if backend is None:
+            backend = _memory_backends[name] = SQLiteMemoryBackend(name)
+        return backend
+
+
+def backend_from_url(url: str) -> StorageBackend:
+    """Build the storage backend described by a DATABASE_URL"""
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+
+    if scheme == "sqlite":
+        path = url[len("sqlite://"):]
+        if path in ("", "/", "/:memory:"):
+            return memory_backend("alex_lgs")
+        # sqlite:///relative.db -> relative.db, sqlite:////abs.db -> /abs.db
+        return SQLiteFileBackend(path[1:] if path.startswith("/") else path)
+
+    if scheme == "memory":
+        return memory_backend(parsed.netloc or parsed.path.strip("/") or "alex_lgs")
+
+    if scheme in ("libsql", "http", "https", "ws", "wss"):
+        return LibSQLBackend(
+            url,
+            auth_token=config.DATABASE_AUTH_TOKEN,
+            replica_path=config.DATABASE_REPLICA_PATH or None
+        )
+
+    if not scheme:
+        return SQLiteFileBackend(url)
+
+    raise ValueError(f"Unsupported DATABASE_URL scheme: {scheme}")
@@ -1,11 +1,14 @@
 import datetime
 import json
+import zlib
 from typing import Dict, List, Any, Optional
 from database import Database
+from mock_exam import MockExamGenerator, exam_duration, exam_size
 
 class StudyPlanner:
-    def __init__(self, database: Database):
+    def __init__(self, database: Database, exam_generator: Optional[MockExamGenerator] = None):
         self.db = database
+        self.exam_generator = exam_generator
         self.pomodoro_duration = 25  # minutes
         self.short_break = 5  # minutes
         self.long_break = 15  # minutes
@@ -305,7 +308,7 @@ class StudyPlanner:
             "daily_plans": {},
             "weekly_goals": self._set_weekly_goals(),
             "spaced_repetition": self._schedule_spaced_repetition(username),
-            "exam_preparation": self._schedule_exam_prep(),
+            "exam_preparation": self._schedule_exam_prep(username),
             "fenerbahce_integration": self._plan_fenerbahce_week()
         }
         
@@ -333,23 +336,49 @@ class StudyPlanner:
             "future_lessons": {"target": 1, "minimum": 1}
         }
     
-    def _schedule_spaced_repetition(self, username: str) -> List[Dict[str, Any]]:
-        """Schedule spaced repetition sessions"""
-        # This would query the spaced_repetition table
+    def _schedule_spaced_repetition(self, username: str, days: int = 7, limit: int = 20) -> List[Dict[str, Any]]:
+        """Spaced repetition reviews falling due within the planning window"""
+        today = datetime.date.today()
+        due_reviews = self.db.get_due_reviews(
+            username, limit=limit, as_of=today + datetime.timedelta(days=days - 1)
+        )
+        
+        # Overdue topics are scheduled for today rather than in the past
         return [
-            {"subject": "Matematik", "topic": "Üslü İfadeler", "due_date": "2025-08-30"},
-            {"subject": "Türkçe", "topic": "Cümle Öğeleri", "due_date": "2025-08-31"},
-            {"subject": "Fen Bilimleri", "topic": "Basınç", "due_date": "2025-09-01"}
+            {
+                "subject": review["subject"],
+                "topic": review["topic"],
+                "due_date": max(review["due_date"], today.isoformat())
+            }
+            for review in due_reviews
         ]
     
-    def _schedule_exam_prep(self) -> Dict[str, Any]:
-        """Schedule exam preparation sessions"""
+    def _schedule_exam_prep(self, username: str) -> Dict[str, Any]:
+        """Schedule exam preparation: a full LGS mock exam every Saturday, reviewed the day before"""
+        today = datetime.date.today()
+        exam_day = today + datetime.timedelta(days=(5 - today.weekday()) % 7)
+        mock_exam = {
+            "date": exam_day.strftime("%Y-%m-%d"),
+            "type": "LGS Deneme",
+            "duration": exam_duration(),
+            "questions": exam_size()
+        }
+        if self.exam_generator is not None:
+            # Generated once per exam day and stored: later answers change what counts as
+            # recently seen, so regenerating would give the student a different paper
+            exam = self.db.get_mock_exam(username, exam_day)
+            if exam is None:
+                exam = self.exam_generator.generate(
+                    username, seed=zlib.crc32(f"{username}|{exam_day}".encode("utf-8"))
+                )
+                self.db.save_mock_exam(username, exam_day, exam)
+            mock_exam["exam"] = exam
+        
         return {
-            "mock_exams": [
-                {"date": "2025-09-01", "type": "LGS Deneme", "duration": 180}
-            ],
+            "mock_exams": [mock_exam],
             "intensive_reviews": [
-                {"date": "2025-08-30", "subjects": ["Matematik", "Türkçe"], "duration": 120}
+                {"date": (exam_day - datetime.timedelta(days=1)).strftime("%Y-%m-%d"),
+                 "subjects": ["Matematik", "Türkçe"], "duration": 120}
             ]
         }
     
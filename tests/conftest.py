@@ -0,0 +1,9 @@
+"""Shared fixtures: every test gets its own database file, migrated to the latest schema"""
+import pytest
+
+from database import Database
+
+
+@pytest.fixture
+def db(tmp_path) -> Database:
+    return Database(str(tmp_path / "alex_lgs.db"))
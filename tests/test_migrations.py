@@ -0,0 +1,144 @@
+"""Upgrading a baseline (schema version 1) database through every migration"""
+import sqlite3
+from typing import Dict
+
+import pytest
+
+import migrations
+
+# Users appear many times and across tables; "misafir" and "eski" only appear
+# in event tables, never in users
+BASELINE_ROWS = {
+    "users": ("username, total_points", [("tuna", 50), ("ayse", 0)]),
+    "question_attempts": ("username, subject, topic, question_id, is_correct, attempt_date", [
+        ("tuna", "Matematik", "Üslü İfadeler", "mat_002", 1, "2025-01-01 10:00:00"),
+        ("tuna", "Matematik", "Üslü İfadeler", "mat_002", 0, "2025-01-02 10:00:00"),
+        ("tuna", "Türkçe", "Sözcükte Anlam", "tur_001", 1, "2025-01-02 11:00:00"),
+        ("misafir", "Matematik", "Çarpanlar ve Katlar", "mat_001", 0, "2025-01-03 10:00:00"),
+        ("misafir", "Fen Bilimleri", "DNA ve Genetik Kod", "fen_001", 1, "2025-01-03 10:05:00"),
+        ("ayse", "Türkçe", "Cümlenin Öğeleri", "tur_002", 1, "2025-01-04 09:00:00"),
+    ]),
+    "mistakes": ("username, subject, topic, question_id", [
+        ("tuna", "Matematik", "Üslü İfadeler", "mat_002"),
+        ("misafir", "Matematik", "Çarpanlar ve Katlar", "mat_001"),
+    ]),
+    "study_sessions": ("username, subject, topic, duration_minutes, session_date", [
+        ("tuna", "Matematik", "Üslü İfadeler", 25, "2025-01-01"),
+        ("tuna", "Matematik", None, 40, "2025-01-02"),
+        ("eski", "Türkçe", "Sözcükte Anlam", 30, "2024-12-30"),
+    ]),
+    "spaced_repetition": ("username, subject, topic, next_review_date", [
+        ("tuna", "Matematik", "Üslü İfadeler", "2025-01-05"),
+        ("tuna", "Matematik", "Üslü İfadeler", "2025-01-09"),  # Same topic twice: merged into one card
+        ("misafir", "Matematik", "Çarpanlar ve Katlar", "2025-01-06"),
+    ]),
+    "achievements": ("username, achievement_name", [("misafir", "İlk Soru"), ("tuna", "İlk Soru")]),
+    "future_lessons": ("username, lesson_title, lesson_type", [("tuna", "Yapay Zeka", "ai")]),
+    "daily_goals": ("username, goal_date, subject, target_minutes", [("eski", "2024-12-30", "Türkçe", 60)]),
+}
+EVENT_TABLES = [table for table in BASELINE_ROWS if table != "users"]
+
+
+def rows_per_user(conn: sqlite3.Connection, keyed_by_id: bool) -> Dict[tuple, int]:
+    """{(table, username): rows} of the event tables, before (username) or after (user_id) migration 7"""
+    counts = {}
+    for table in EVENT_TABLES:
+        if table == "spaced_repetition":
+            # One card per user and topic since migration 8
+            if keyed_by_id:
+                sql = (f"SELECT u.username, COUNT(DISTINCT o.topic_id) FROM {table} o "
+                       f"LEFT JOIN users u ON u.id = o.user_id GROUP BY o.user_id")
+            else:
+                sql = f"SELECT username, COUNT(DISTINCT subject || '|' || topic) FROM {table} GROUP BY username"
+        elif keyed_by_id:
+            sql = f"SELECT u.username, COUNT(*) FROM {table} o LEFT JOIN users u ON u.id = o.user_id GROUP BY o.user_id"
+        else:
+            sql = f"SELECT username, COUNT(*) FROM {table} GROUP BY username"
+        counts.update({(table, username): count for username, count in conn.execute(sql)})
+    return counts
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    conn = sqlite3.connect(tmp_path / "baseline.db", isolation_level=None)
+    migrations.MIGRATIONS[0].upgrade(conn.cursor())
+    conn.execute("PRAGMA user_version = 1")
+    for table, (columns, rows) in BASELINE_ROWS.items():
+        conn.executemany(f"INSERT INTO {table} ({columns}) VALUES ({', '.join('?' * len(rows[0]))})", rows)
+    yield conn
+    conn.close()
+
+
+def test_baseline_upgrades_to_latest_version(baseline):
+    assert migrations.migrate(baseline) == migrations.latest_version()
+    assert migrations.current_version(baseline) == migrations.latest_version()
+
+
+def test_migrate_is_a_no_op_when_current(baseline):
+    migrations.migrate(baseline)
+    applied = baseline.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0]
+
+    assert migrations.migrate(baseline) == migrations.latest_version()
+    assert baseline.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0] == applied
+
+
+def test_every_event_row_keeps_its_user(baseline):
+    before = rows_per_user(baseline, keyed_by_id=False)
+    migrations.migrate(baseline)
+
+    assert rows_per_user(baseline, keyed_by_id=True) == before
+
+
+def test_registered_users_keep_their_ids(baseline):
+    registered = dict(baseline.execute("SELECT username, id FROM users"))
+    migrations.migrate(baseline)
+
+    users = dict(baseline.execute("SELECT username, id FROM users"))
+    assert {username: users.get(username) for username in registered} == registered
+
+
+def test_unregistered_users_get_one_users_row_each(baseline):
+    migrations.migrate(baseline)
+
+    usernames = [username for username, in baseline.execute("SELECT username FROM users")]
+    assert sorted(usernames) == ["ayse", "eski", "misafir", "tuna"]
+
+
+def test_upgrade_leaves_no_foreign_key_violations(baseline):
+    migrations.migrate(baseline)
+
+    assert baseline.execute("PRAGMA foreign_key_check").fetchall() == []
+
+
+def test_rollups_are_backfilled_from_existing_rows(baseline):
+    migrations.migrate(baseline)
+
+    rollups = baseline.execute('''
+        SELECT u.username, d.stat_date, s.name, d.study_minutes, d.attempts, d.correct
+        FROM daily_study_stats d
+        JOIN users u ON u.id = d.user_id
+        JOIN subjects s ON s.id = d.subject_id
+        ORDER BY u.username, d.stat_date, s.name
+    ''').fetchall()
+    assert rollups == [
+        ("ayse", "2025-01-04", "Türkçe", 0, 1, 1),
+        ("eski", "2024-12-30", "Türkçe", 30, 0, 0),
+        ("misafir", "2025-01-03", "Fen Bilimleri", 0, 1, 1),
+        ("misafir", "2025-01-03", "Matematik", 0, 1, 0),
+        ("tuna", "2025-01-01", "Matematik", 25, 1, 1),
+        ("tuna", "2025-01-02", "Matematik", 40, 1, 0),
+        ("tuna", "2025-01-02", "Türkçe", 0, 1, 1),
+    ]
+
+
+def test_rollups_follow_new_events(db):
+    db.log_study_time("tuna", "Matematik", 30, "Üslü İfadeler")
+    db.log_question_attempt("tuna", "Matematik", "Üslü İfadeler", "mat_002", "B", "B", True)
+    db.log_question_attempt("tuna", "Matematik", "Üslü İfadeler", "mat_003", "A", "C", False)
+
+    stats = db.get_study_stats("tuna", "all")
+    assert (stats['total_minutes'], stats['questions_solved'], stats['accuracy']) == (30, 2, 50.0)
+
+    # Rebuilding from the raw events gives the same totals
+    db.rebuild_daily_stats()
+    assert db.get_study_stats("tuna", "all") == stats
@@ -0,0 +1,106 @@
+"""FSRS scheduling and the review cards stored by Database.record_review"""
+import datetime
+
+import numpy as np
+import pytest
+
+from spaced_repetition import AGAIN, GOOD, FSRS, batch_due_dates, fit_weights, replay_states
+
+TODAY = datetime.date(2025, 3, 1)
+
+
+def test_interval_is_the_stability_at_90_percent_retention():
+    fsrs = FSRS()
+
+    assert fsrs.retrievability(10, 10) == pytest.approx(0.9)
+    assert fsrs.next_interval(10.0) == 10
+
+
+def test_interval_is_clamped():
+    fsrs = FSRS(max_interval=30)
+
+    assert fsrs.next_interval(0.01) == 1
+    assert fsrs.next_interval(1000.0) == 30
+
+
+def test_correct_answers_space_reviews_further_apart():
+    intervals = FSRS().projected_intervals(6)
+
+    assert intervals == sorted(intervals)
+    assert intervals[-1] > intervals[0]
+
+
+def test_wrong_answer_shortens_the_interval_and_raises_difficulty():
+    fsrs = FSRS()
+    first = fsrs.review(None, None, None, GOOD, TODAY)
+    due = first.due_date
+
+    recalled = fsrs.review(first.stability, first.difficulty, TODAY, GOOD, due)
+    lapsed = fsrs.review(first.stability, first.difficulty, TODAY, AGAIN, due)
+
+    assert recalled.interval_days > first.interval_days
+    assert lapsed.stability <= first.stability
+    assert lapsed.difficulty > first.difficulty
+    assert lapsed.due_date == due + datetime.timedelta(days=lapsed.interval_days)
+
+
+def test_replay_matches_reviewing_one_answer_at_a_time():
+    history = [(0, GOOD), (3, GOOD), (9, AGAIN), (1, GOOD), (4, GOOD)]
+    fsrs = FSRS()
+    stability = difficulty = last = None
+    day = TODAY
+    for elapsed, grade in history:
+        day += datetime.timedelta(days=elapsed)
+        stability, difficulty, _, _ = fsrs.review(stability, difficulty, last, grade, day)
+        last = day
+
+    replayed_stability, replayed_difficulty = replay_states([history])
+
+    assert replayed_stability[0] == pytest.approx(stability)
+    assert replayed_difficulty[0] == pytest.approx(difficulty)
+
+
+def test_batch_due_dates_match_next_interval():
+    fsrs = FSRS()
+    stability = np.array([0.3, 2.5, 14.0, 900.0])
+    last_review = np.full(4, TODAY.toordinal())
+
+    intervals, due = batch_due_dates(stability, last_review)
+
+    assert list(intervals) == [fsrs.next_interval(s) for s in stability]
+    assert list(due) == [TODAY.toordinal() + i for i in intervals]
+
+
+def test_fitting_never_makes_the_fit_worse():
+    # Reviews that are mostly remembered well past the default intervals
+    histories = [[(0, GOOD), (5, GOOD), (20, GOOD), (60, GOOD)]] * 5 + [[(0, AGAIN), (1, GOOD), (3, AGAIN)]]
+
+    weights, loss_before, loss_after = fit_weights(histories)
+
+    assert loss_after <= loss_before
+    assert len(weights) == len(FSRS().w)
+
+
+def test_record_review_creates_then_updates_the_card(db):
+    first = db.record_review("tuna", "Matematik", "Üslü İfadeler", True, reviewed_on=TODAY)
+    assert first['review_count'] == 1
+    assert first['due_date'] == (TODAY + datetime.timedelta(days=first['interval_days'])).isoformat()
+
+    review_day = datetime.date.fromisoformat(first['due_date'])
+    second = db.record_review("tuna", "Matematik", "Üslü İfadeler", False, reviewed_on=review_day)
+    assert second['review_count'] == 2
+    assert second['stability'] <= first['stability']
+
+    with db.connection() as conn:
+        assert conn.execute("SELECT COUNT(*), SUM(lapses) FROM spaced_repetition").fetchone() == (1, 1)
+
+
+def test_due_reviews_follow_the_recorded_schedule(db):
+    review = db.record_review("tuna", "Matematik", "Üslü İfadeler", True, reviewed_on=TODAY)
+    due_date = datetime.date.fromisoformat(review['due_date'])
+
+    assert db.get_due_reviews("tuna", as_of=due_date - datetime.timedelta(days=1)) == []
+    due = db.get_due_reviews("tuna", as_of=due_date)
+    assert [(row['subject'], row['topic'], row['review_count']) for row in due] == [
+        ("Matematik", "Üslü İfadeler", 1)
+    ]
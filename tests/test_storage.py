@@ -0,0 +1,77 @@
+"""DATABASE_URL parsing and the health check's database probe"""
+import pytest
+
+import health_check
+from config import config
+from storage import LibSQLBackend, SQLiteFileBackend, SQLiteMemoryBackend, backend_from_url, memory_backend
+
+
+@pytest.mark.parametrize("url, path", [
+    ("sqlite:///alex_lgs.db", "alex_lgs.db"),
+    ("sqlite:////var/lib/alex/alex_lgs.db", "/var/lib/alex/alex_lgs.db"),
+    ("data/alex_lgs.db", "data/alex_lgs.db"),
+])
+def test_file_urls(url, path):
+    backend = backend_from_url(url)
+
+    assert type(backend) is SQLiteFileBackend
+    assert backend.path == path
+
+
+@pytest.mark.parametrize("url", ["sqlite://", "sqlite:///:memory:", "memory://"])
+def test_default_memory_urls(url):
+    assert backend_from_url(url) is memory_backend("alex_lgs")
+
+
+def test_named_memory_url_is_shared_per_name():
+    backend = backend_from_url("memory://storage-test")
+
+    assert isinstance(backend, SQLiteMemoryBackend)
+    assert backend is backend_from_url("memory://storage-test")
+    assert backend is not memory_backend("alex_lgs")
+
+
+def test_memory_backend_connections_share_one_database():
+    backend = backend_from_url("memory://storage-shared")
+    keeper, other = backend.connect(), backend.connect()
+    try:
+        keeper.execute("CREATE TABLE t (v INTEGER)")
+        keeper.execute("INSERT INTO t VALUES (1)")
+        keeper.commit()
+
+        assert other.execute("SELECT v FROM t").fetchall() == [(1,)]
+    finally:
+        keeper.close()
+        other.close()
+
+
+def test_remote_urls_use_libsql():
+    assert isinstance(backend_from_url("libsql://alex.turso.io"), LibSQLBackend)
+
+
+def test_unknown_scheme_is_rejected():
+    with pytest.raises(ValueError, match="postgres"):
+        backend_from_url("postgres://localhost/alex")
+
+
+@pytest.mark.parametrize("url", ["sqlite://", "memory://health"])
+def test_health_check_accepts_memory_databases(monkeypatch, url):
+    monkeypatch.setattr(config, "DATABASE_URL", url)
+
+    ok, message = health_check.check_database()
+
+    assert ok, message
+
+
+def test_health_check_reports_a_missing_database_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "DATABASE_URL", f"sqlite:///{tmp_path}/missing.db")
+
+    assert health_check.check_database() == (False, "Database file not found")
+
+
+def test_health_check_accepts_an_existing_database_file(monkeypatch, db):
+    monkeypatch.setattr(config, "DATABASE_URL", f"sqlite:///{db.db_path}")
+
+    ok, message = health_check.check_database()
+
+    assert ok, message
@@ -0,0 +1,124 @@
+"""Write-behind batching: ordering, failure isolation and flush"""
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from write_behind import WriteBehindQueue
+
+INSERT = "INSERT INTO t (k, v) VALUES (?, ?)"
+ADD_TEN = ("UPDATE t SET v = v + 10", ())
+
+
+@pytest.fixture
+def pool(db):
+    with db.transaction() as conn:
+        conn.execute("CREATE TABLE t (k TEXT PRIMARY KEY, v INTEGER)")
+    return db.pool
+
+
+@pytest.fixture
+def writer(pool):
+    # A long interval, so the test decides when a batch is committed
+    writer = WriteBehindQueue(pool, flush_interval_ms=10_000)
+    yield writer
+    writer.close()
+
+
+def rows(pool):
+    with pool.connection() as conn:
+        return conn.execute("SELECT k, v FROM t ORDER BY k").fetchall()
+
+
+def test_flush_makes_queued_writes_visible(pool, writer):
+    writer.submit((INSERT, ("a", 1)))
+    assert rows(pool) == []
+
+    assert writer.flush(timeout=5)
+    assert rows(pool) == [("a", 1)]
+
+
+def test_batch_keeps_submission_order(pool, writer):
+    # The update must see the first insert but not the second
+    writer.submit((INSERT, ("a", 1)))
+    writer.submit(ADD_TEN)
+    writer.submit((INSERT, ("b", 4)))
+    writer.flush(timeout=5)
+
+    assert rows(pool) == [("a", 11), ("b", 4)]
+    assert writer.stats["batches"] == 1
+    assert writer.stats["committed"] == 3
+
+
+def test_failing_group_is_dropped_without_losing_the_rest(pool, writer):
+    writer.submit((INSERT, ("a", 1)))
+    # Second statement violates the primary key: the whole group is rolled back
+    writer.submit((INSERT, ("b", 2)), (INSERT, ("a", 3)))
+    writer.submit((INSERT, ("c", 5)))
+    writer.flush(timeout=5)
+
+    assert rows(pool) == [("a", 1), ("c", 5)]
+    assert writer.stats["failed"] == 1
+
+
+def test_close_commits_what_is_still_queued(pool, writer):
+    writer.submit((INSERT, ("a", 1)))
+    writer.close()
+
+    assert rows(pool) == [("a", 1)]
+    # After close, submissions are written synchronously
+    writer.submit((INSERT, ("b", 2)))
+    assert rows(pool) == [("a", 1), ("b", 2)]
+
+
+class StalledPool:
+    """Pool whose transactions block until released, to hold the writer thread"""
+    key = "stalled"
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    @contextmanager
+    def transaction(self, immediate=False):
+        self.entered.set()
+        self.release.wait()
+        yield self
+
+    def executemany(self, sql, params):
+        pass
+
+    def execute(self, sql, params):
+        pass
+
+
+def test_flush_gives_up_after_its_timeout_when_the_queue_is_full():
+    pool = StalledPool()
+    writer = WriteBehindQueue(pool, flush_interval_ms=0, batch_size=1, max_queue=1)
+    try:
+        writer.submit(("INSERT", ()))
+        assert pool.entered.wait(5)
+        writer.submit(("INSERT", ()))  # Fills the queue while the writer is stuck
+
+        started = time.monotonic()
+        assert writer.flush(timeout=0.2) is False
+        assert time.monotonic() - started < 2
+    finally:
+        pool.release.set()
+        writer.close()
+
+
+def test_flush_gives_up_after_its_timeout_while_a_batch_is_committing():
+    pool = StalledPool()
+    writer = WriteBehindQueue(pool, flush_interval_ms=0, batch_size=1)
+    try:
+        writer.submit(("INSERT", ()))
+        assert pool.entered.wait(5)
+
+        assert writer.flush(timeout=0.2) is False
+        pool.release.set()
+        assert writer.flush(timeout=5) is True
+    finally:
+        pool.release.set()
+        writer.close()
@@ -1,10 +1,13 @@
 import datetime
+import functools
 import hashlib
 import json
 import re
 from typing import Any, Dict, List, Optional, Union
 import streamlit as st
 
+from cache import TTLCache, cached
+
 class DateUtils:
     """Utility functions for date and time operations"""
     
@@ -95,15 +98,19 @@ class TextUtils:
     @staticmethod
     def highlight_keywords(text: str, keywords: List[str]) -> str:
         """Highlight keywords in text with HTML"""
-        for keyword in keywords:
-            text = re.sub(
-                f'({re.escape(keyword)})',
-                r'<mark style="background-color: #FFDC00; color: #1F2A44;">\1</mark>',
-                text,
-                flags=re.IGNORECASE
-            )
+        if not any(keywords):
+            return text
         
-        return text
+        return _keyword_pattern(tuple(keywords)).sub(
+            r'<mark style="background-color: #FFDC00; color: #1F2A44;">\1</mark>',
+            text
+        )
+
+@functools.lru_cache(maxsize=256)
+def _keyword_pattern(keywords: tuple) -> "re.Pattern":
+    """One compiled alternation per keyword set (longest first, so overlapping keywords match whole)"""
+    alternatives = "|".join(re.escape(keyword) for keyword in sorted(set(keywords), key=len, reverse=True) if keyword)
+    return re.compile(f'({alternatives})', flags=re.IGNORECASE)
 
 class MathUtils:
     """Utility functions for mathematical operations and formatting"""
@@ -144,6 +151,15 @@ class MathUtils:
 class UIUtils:
     """Utility functions for UI components and styling"""
     
+    @staticmethod
+    def show_sidebar_totals():
+        """Draw the session's points, streak and level into the sidebar slot reserved by app.py"""
+        totals = st.session_state.sidebar_totals
+        with st.session_state.sidebar_totals_slot.container():
+            st.metric("📊 Toplam Puan", totals['total_points'])
+            st.metric("🔥 Seri", totals['streak'])
+            st.metric("⭐ Seviye", totals['level'])
+    
     @staticmethod
     def create_metric_card(title: str, value: str, delta: str = None, delta_color: str = "normal") -> str:
         """Create a metric card with Fenerbahçe styling"""
@@ -266,30 +282,17 @@ class CacheUtils:
     """Utility functions for caching and performance"""
     
     @staticmethod
-    def generate_cache_key(*args) -> str:
+    def generate_cache_key(*args, **kwargs) -> str:
         """Generate cache key from arguments"""
         key_string = "_".join(str(arg) for arg in args)
+        if kwargs:
+            key_string += "_" + "_".join(f"{name}={value}" for name, value in sorted(kwargs.items()))
         return hashlib.md5(key_string.encode()).hexdigest()[:10]
     
     @staticmethod
-    def cache_with_ttl(func, ttl_seconds: int = 300):
-        """Simple cache decorator with TTL"""
-        cache = {}
-        
-        def wrapper(*args, **kwargs):
-            key = CacheUtils.generate_cache_key(*args, **kwargs)
-            now = datetime.datetime.now()
-            
-            if key in cache:
-                result, timestamp = cache[key]
-                if (now - timestamp).seconds < ttl_seconds:
-                    return result
-            
-            result = func(*args, **kwargs)
-            cache[key] = (result, now)
-            return result
-        
-        return wrapper
+    def cache_with_ttl(func, ttl_seconds: int = 300, max_entries: int = 256):
+        """Cache decorator with TTL (a bounded, thread-safe cache.TTLCache per function)"""
+        return cached(TTLCache(func.__qualname__, max_entries=max_entries), ttl=ttl_seconds)(func)
 
 class NotificationUtils:
     """Utility functions for notifications and alerts"""
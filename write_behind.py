@@ -0,0 +1,172 @@
+"""
+Write-behind batching for high-frequency event inserts
+
+Events are queued in-process and a background thread commits them in
+multi-row transactions, either every ``flush_interval_ms`` or as soon as
+``batch_size`` events are waiting. Call ``flush()`` before reading data that
+must include the caller's own writes.
+"""
+import itertools
+import operator
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+Statement = Tuple[str, Sequence[Any]]
+
+
+class _Barrier:
+    """Queue marker that is released once everything before it is committed"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class WriteBehindQueue:
+    """Bounded queue of SQL statements drained by a background writer thread"""
+
+    def __init__(self, pool, flush_interval_ms: int = 200, batch_size: int = 200,
+                 max_queue: int = 10000, enqueue_timeout: float = 1.0):
+        self.pool = pool
+        self.flush_interval = flush_interval_ms / 1000
+        self.batch_size = batch_size
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._lock = threading.Lock()
+        self.stats = {"enqueued": 0, "committed": 0, "batches": 0, "failed": 0, "sync_fallbacks": 0}
+        self._thread = threading.Thread(target=self._run, name=f"write-behind:{pool.key}", daemon=True)
+        self._thread.start()
+
+    def submit(self, *statements: Statement):
+        """Queue statements that must be committed together"""
+        if self._closed:
+            self._write_now(list(statements))
+            return
+        try:
+            self._queue.put(tuple(statements), timeout=self.enqueue_timeout)
+            self.stats["enqueued"] += len(statements)
+        except queue.Full:
+            # Backpressure: the writer is behind, so pay the commit on this thread
+            self.stats["sync_fallbacks"] += 1
+            self._write_now(list(statements))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every event queued before this call is committed"""
+        if self._closed or not self._thread.is_alive():
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        barrier = _Barrier()
+        try:
+            self._queue.put(barrier, timeout=timeout)
+        except queue.Full:
+            return False
+        return barrier.done.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def close(self, timeout: float = 10.0):
+        """Drain the queue and stop the writer thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        # Anything still queued (writer died or timed out) is written synchronously
+        leftovers: List[Statement] = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, tuple):
+                leftovers.extend(item)
+            elif isinstance(item, _Barrier):
+                item.done.set()
+        if leftovers:
+            self._write_now(leftovers)
+
+    def _run(self):
+        pending: List[Tuple[Statement, ...]] = []
+        barriers: List[_Barrier] = []
+        deadline = None
+        stop = False
+
+        while not stop:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False  # Interval elapsed
+
+            if item is None:
+                stop = True
+            elif isinstance(item, _Barrier):
+                barriers.append(item)
+            elif item is not False:
+                pending.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            due = deadline is not None and time.monotonic() >= deadline
+            if pending and (stop or barriers or due or len(pending) >= self.batch_size):
+                self._commit(pending)
+                pending = []
+            if not pending:
+                deadline = None
+            for barrier in barriers:
+                barrier.done.set()
+            barriers = []
+
+    def _commit(self, groups: List[Tuple[Statement, ...]]):
+        """Commit a batch in one transaction, in submission order
+
+        Consecutive runs of the same statement go through one executemany.
+        """
+        statements = itertools.chain.from_iterable(groups)
+        try:
+            with self.pool.transaction(immediate=True) as conn:
+                for sql, run in itertools.groupby(statements, key=operator.itemgetter(0)):
+                    conn.executemany(sql, [params for _, params in run])
+        except Exception as e:
+            logger.error(f"Write-behind batch of {len(groups)} events failed, retrying one by one: {e}")
+            for group in groups:
+                try:
+                    self._write_now(list(group))
+                except Exception as row_error:
+                    self.stats["failed"] += 1
+                    logger.error(f"Dropping write-behind event {group!r}: {row_error}")
+            return
+        self.stats["batches"] += 1
+        self.stats["committed"] += sum(len(group) for group in groups)
+
+    def _write_now(self, statements: List[Statement]):
+        with self.pool.transaction(immediate=True) as conn:
+            for sql, params in statements:
+                conn.execute(sql, params)
+
+
+_writers: Dict[str, WriteBehindQueue] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(pool, **options) -> WriteBehindQueue:
+    """Return the process-wide writer for a pool, starting it on first use"""
+    with _writers_lock:
+        writer = _writers.get(pool.key)
+        if writer is None or writer._closed:
+            writer = _writers[pool.key] = WriteBehindQueue(pool, **options)
+        return writer
+
+
+def close_all_writers():
+    """Drain and stop every writer (called on interpreter shutdown by database.py)"""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()